@@ -0,0 +1,238 @@
+"""
+Reproducible benchmarks of the performance work (run from the root of the repository, e.g., `make benchmark`).
+
+Each benchmark builds synthetic CVs, made of the example CV (`json_example/`) with many distinct copies of its
+publications and talks, and prints what it measures along with the interpreter, the state of the GIL, and the
+number of CPUs available to the process: the thread and process modes of a batch only scale with several CPUs,
+and the thread mode only renders in parallel with a free-threaded interpreter.
+
+```
+python benchmarks/run.py                     # every benchmark
+python benchmarks/run.py batch fragments     # some of them
+```
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Callable
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+# pylint: disable = wrong-import-position
+from cvbuilder import Builder
+from cvbuilder.batch import BatchJob, build_batch, config_factory, gil_enabled
+from cvbuilder.config import load_config
+from cvbuilder.contexts.html import HTMLContext
+from cvbuilder.modules.contact import ContactModule
+from cvbuilder.modules.publication import PublicationModule
+from cvbuilder.modules.talk import TalkModule
+from cvbuilder.sinks import FileSystemSink, MemorySink, TarSink, ZipSink
+
+EXAMPLES = ROOT / "json_example"
+CONFIG = ROOT / "example.toml"
+
+
+def synthetic_cv(publications: int, talks: int, seed: int = 0) -> dict[str, Any]:
+    """The example CV, with `publications` distinct proceedings and `talks` distinct talks."""
+    cv = {}
+    for name in ("example.json", "summary.json", "publications.json"):
+        with (EXAMPLES / name).open(encoding="UTF8") as file:
+            cv.update(json.load(file))
+    cv["personal"] = dict(cv["personal"], name=f"Person {seed}")
+    proceedings = cv["publications"]["Proceedings"]
+    cv["publications"] = dict(
+        cv["publications"],
+        Proceedings=[
+            dict(proceedings[i % len(proceedings)], title=f"Title {seed}-{i}", year=str(1990 + i % 35))
+            for i in range(publications)
+        ],
+    )
+    cv["talks"] = [dict(cv["talks"][i % len(cv["talks"])], title=f"Talk {seed}-{i}") for i in range(talks)]
+    return cv
+
+
+def best_of(repeat: int, function: Callable[[], Any]) -> float:
+    """The shortest duration of `repeat` calls, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _page(output_path: Path, compact: bool = False) -> HTMLContext:
+    context = HTMLContext(output_path, compact=compact)
+    context.add_module("contact", ContactModule(), "sidebar")
+    context.add_module("publications", PublicationModule())
+    context.add_module("talks", TalkModule())
+    return context
+
+
+def _jobs(directory: Path, count: int, publications: int, talks: int) -> list[BatchJob]:
+    jobs = []
+    for seed in range(count):
+        path = directory / "in" / f"{seed}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(synthetic_cv(publications, talks, seed)), encoding="UTF8")
+        jobs.append(BatchJob([path], directory / "out" / str(seed)))
+    return jobs
+
+
+def bench_compact(directory: Path) -> None:
+    """user-032: size and render time of one HTML page, indented and compact."""
+    print("One HTML page (contact, 5000 publications, 1000 talks), best of 5 renders:")
+    cv = synthetic_cv(5000, 1000)
+    for compact in (False, True):
+        builder = Builder()
+        context = _page(directory / "index.html", compact)
+        builder.register_context(context)
+        personal = builder.load_documents([cv])
+        output = context.render(personal)
+        duration = best_of(5, lambda context=context: context.render(personal))
+        print(f"  compact={compact!s:5}  {len(output.encode()):>9} bytes  {duration * 1000:7.1f} ms")
+
+
+def bench_snapshots(directory: Path) -> None:
+    """user-035: loading the JSON file of a CV into the example configuration, without and with a snapshot."""
+    print("Loading one CV (5000 publications, 1000 talks) into the 4 contexts of example.toml:")
+    path = directory / "cv.json"
+    path.write_text(json.dumps(synthetic_cv(5000, 1000)), encoding="UTF8")
+    builder = load_config(CONFIG).builder
+    # pylint: disable = protected-access
+    print(f"  JSON            {best_of(3, lambda: builder._load([path])) * 1000:7.1f} ms")
+    builder.set_snapshot_cache(directory / "snapshots")
+    cold = best_of(1, lambda: builder._load([path]))
+    warm = best_of(3, lambda: builder._load([path]))
+    print(f"  snapshot, cold  {cold * 1000:7.1f} ms (loads the JSON file and stores the snapshot)")
+    print(f"  snapshot, warm  {warm * 1000:7.1f} ms")
+
+
+def bench_fragments(directory: Path) -> None:
+    """user-037: rendering with the fragment cache, when the fragments are shared and when they are not."""
+    config = load_config(CONFIG)
+    config.builder.build(config.inputs)
+    statistics = config.builder.fragment_cache.statistics
+    print(f"example.toml: {statistics.reused} fragments reused, {statistics.rendered} rendered")
+
+    print("One HTML page (5000 publications not shared with the other context), best of 7 renders:")
+    cv = synthetic_cv(5000, 0)
+    for share in (False, True):
+        builder = Builder()
+        page = _page(directory / "index.html")
+        builder.register_context(page)
+        other = HTMLContext(directory / "other.html")
+        other.add_module("contact", ContactModule(), "sidebar")
+        builder.register_context(other)
+        if share:
+            builder.share_fragments()
+        personal = builder.load_documents([cv])
+
+        def render(builder=builder, page=page):
+            if builder.fragment_cache is not None:
+                builder.fragment_cache.clear()
+            page.render(personal)
+
+        print(f"  share_fragments={share!s:5}  {best_of(7, render) * 1000:7.1f} ms")
+
+
+def bench_batch(directory: Path) -> None:
+    """user-040: throughput of a batch, with threads and with processes."""
+    jobs = _jobs(directory, 48, 120, 40)
+    factory = config_factory(CONFIG)
+    print("Batch of 48 CVs (120 publications, 40 talks) with example.toml, best of 3:")
+    # The Markdown cache of this process is warmed up, as the workers of the process mode warm theirs up
+    build_batch(factory, jobs, "thread", 1)
+    for mode in ("thread", "process"):
+        for workers in sorted({1, _cpus()}):
+            reports = [build_batch(factory, jobs, mode, workers) for _ in range(3)]
+            report = max(reports, key=lambda report: report.throughput)
+            print(f"  {mode:7} x{workers:<3} {report.throughput:6.1f} CV/s  ({len(report.failures)} failures)")
+
+
+def bench_workers(directory: Path) -> None:
+    """user-041: throughput of the process mode, per start method, with and without recycling the workers."""
+    jobs = _jobs(directory, 48, 60, 20)
+    factory = config_factory(CONFIG)
+    print("Batch of 48 CVs (60 publications, 20 talks) with example.toml, 2 processes, best of 3:")
+    methods = [method for method in ("spawn", "forkserver", "fork") if method in multiprocessing.get_all_start_methods()]
+    for method in methods:
+        for recycle in (None, 8):
+            reports = [build_batch(factory, jobs, "process", 2, recycle, method) for _ in range(3)]
+            report = max(reports, key=lambda report: report.throughput)
+            label = f"{method}, recycled after {recycle} jobs" if recycle else method
+            print(f"  {label:34} {report.throughput:6.1f} CV/s  ({len(report.failures)} failures)")
+
+
+def bench_sinks(directory: Path) -> None:
+    """user-048: duration of a batch, per output sink."""
+    jobs = _jobs(directory, 60, 60, 20)
+    factory = config_factory(CONFIG)
+    output = (directory / "out").resolve()
+    sinks = {
+        "no sink": lambda: None,
+        "filesystem": lambda: FileSystemSink(output),
+        "memory": lambda: MemorySink(output),
+        "zip": lambda: ZipSink(directory / "batch.zip", output),
+        "tar.gz": lambda: TarSink(directory / "batch.tar.gz", output),
+    }
+    print("Batch of 60 CVs (60 publications, 20 talks) with example.toml, 1 worker:")
+    for mode in ("thread", "process"):
+        for label, make_sink in sinks.items():
+            sink = make_sink()
+            start = time.perf_counter()
+            report = build_batch(factory, jobs, mode, 1, sink=sink)
+            if sink is not None:
+                sink.close()
+            duration = time.perf_counter() - start
+            print(f"  {mode:7} {label:10} {duration:6.2f} s  ({len(report.failures)} failures)")
+
+
+BENCHMARKS = {
+    "compact": bench_compact,
+    "snapshots": bench_snapshots,
+    "fragments": bench_fragments,
+    "batch": bench_batch,
+    "workers": bench_workers,
+    "sinks": bench_sinks,
+}
+
+
+def _cpus() -> int:
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Runs the benchmarks of cvbuilder.")
+    parser.add_argument(
+        "benchmarks", nargs="*", help=f"the benchmarks to run, among {', '.join(BENCHMARKS)} (all by default)"
+    )
+    args = parser.parse_args()
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    print(
+        f"{platform.python_implementation()} {platform.python_version()}, GIL {'enabled' if gil_enabled() else 'disabled'},"
+        f" {_cpus()} CPU(s) available, {platform.machine()}"
+    )
+    for name in args.benchmarks or BENCHMARKS:
+        function = BENCHMARKS[name]
+        print(f"\n== {name}: {function.__doc__}")
+        with tempfile.TemporaryDirectory(prefix=f"cvbuilder-{name}-") as directory:
+            function(Path(directory))
+
+
+if __name__ == "__main__":
+    main()
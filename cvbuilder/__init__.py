@@ -2,11 +2,48 @@
 The CV builder reads a JSON file and uses this file to produce new documents.
 """
 
-from dataclasses import dataclass
+from __future__ import annotations
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, TypeVar
+import importlib
+import os
 import sys
 import json
-from . import modules, contexts
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from . import contexts
+    from .contexts.fragments import FragmentCache
+    from .manifest import BuildManifest
+    from .sinks import OutputSink
+    from .snapshot import SnapshotCache
+    from .validation import Validator
+
+__version__ = "2.0.0"
+
+_T = TypeVar("_T")
+
+# The subpackages are only imported when they are first accessed (PEP 562).
+# This keeps the startup cheap for tools that do not need every context or module.
+_SUBMODULES = (
+    "aggregate",
+    "batch",
+    "contexts",
+    "directory",
+    "jobqueue",
+    "manifest",
+    "modules",
+    "server",
+    "sinks",
+    "snapshot",
+    "validation",
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class Builder:
@@ -28,6 +65,11 @@ class Builder:
 
     Note:
         The contexts are treated *in the order they are passed to the builder*.
+
+    Note:
+        The data loaded from the JSON file(s) are forgotten at the beginning of every build.
+        Thus, a configured builder can build the CVs of many persons, one after the other.
+        To build multiple CVs at the same time, use one fork of the builder per CV (see `fork`).
     """
 
     def __init__(self, personal_key: str = "personal") -> None:
@@ -38,6 +80,12 @@ class Builder:
         """
         self.contexts: list[contexts.Context] = []
         self.personal_key = personal_key
+        self.snapshot_cache: SnapshotCache = None
+        self.fragment_cache: FragmentCache = None
+        self.sink: OutputSink = None
+        self.manifest: BuildManifest = None
+        self.validator: Validator = None
+        self.validation_workers = 1
 
     def register_context(self, context: contexts.Context) -> None:
         """Registers a new context.
@@ -48,8 +96,146 @@ class Builder:
             context: the context to register.
         """
         self.contexts.append(context)
+        context.fragment_cache = self.fragment_cache
+        if self.fragment_cache is not None:
+            self.fragment_cache.register(context)
+        context.sink = self.sink
+        context.manifest = self.manifest
+
+    def share_fragments(self) -> None:
+        """Renders identical modules only once across the contexts (see `cvbuilder.contexts.fragments`).
+
+        For instance, the modules of the sidebar of multiple HTML pages are rendered once, and reused on every page.
+        The number of reused fragments is available in `self.fragment_cache.statistics`.
+        """
+        from .contexts.fragments import FragmentCache  # pylint: disable = import-outside-toplevel
+
+        self.fragment_cache = FragmentCache()
+        for context in self.contexts:
+            context.fragment_cache = self.fragment_cache
+            self.fragment_cache.register(context)
+
+    def set_sink(self, sink: OutputSink) -> None:
+        """Gives the output files of every context to a sink (e.g., a zip archive; see `cvbuilder.sinks`).
+
+        The sink is shared by the forks of the builder, and must be closed once every build is done.
+
+        Args:
+            sink: The sink, or None to write the files on the filesystem again.
+        """
+        self.sink = sink
+        for context in self.contexts:
+            context.sink = sink
+
+    def set_manifest(self, path: Path | str, build_id: str = None) -> None:
+        """Writes the manifest of the output files at the end of every build (see `cvbuilder.manifest`).
+
+        A fork writing in another output directory writes its own manifest, in this directory.
+
+        Args:
+            path: The path of the manifest.
+            build_id: The identifier of every build. If None, each build is identified by its starting time.
+        """
+        from .manifest import BuildManifest  # pylint: disable = import-outside-toplevel
+
+        self.manifest = BuildManifest(path, build_id)
+        for context in self.contexts:
+            context.manifest = self.manifest
+
+    def reset(self) -> None:
+        """Forgets the data loaded by the modules of every context, and the shared fragments."""
+        for context in self.contexts:
+            context.reset()
+        if self.fragment_cache is not None:
+            self.fragment_cache.clear()
+
+    def fork(self, output_directory: Path | str = None) -> Builder:
+        """Creates a builder with the same configuration, whose contexts are forked (see `contexts.Context.fork`).
 
-    def build(self, json_file_paths: Path | str | list[Path | str]) -> None:
+        Forking is much cheaper than configuring a new builder, and the fork can build another CV
+        at the same time as this builder.
+        The snapshot cache, the validator and the output sink are shared, while the fork has its own fragment cache
+        and its own manifest.
+
+        Args:
+            output_directory: If not None, the output files of the fork (and its assets, see `contexts.Context.relocate`)
+                are written in this directory instead, keeping their relative layout.
+
+        Returns:
+            The fork.
+        """
+        builder = Builder(self.personal_key)
+        builder.snapshot_cache = self.snapshot_cache
+        builder.sink = self.sink
+        builder.validator = self.validator
+        builder.validation_workers = self.validation_workers
+        if self.fragment_cache is not None:
+            builder.share_fragments()
+
+        output_paths = [None] * len(self.contexts)
+        base = None
+        if output_directory is not None and len(self.contexts) > 0:
+            base = os.path.commonpath(
+                [context.output_path.parent for context in self.contexts]
+            )
+            output_paths = [
+                Path(output_directory) / context.output_path.relative_to(base)
+                for context in self.contexts
+            ]
+
+        def relocate(path: Path) -> Path:
+            # Keeps the layout of the files in the common directory of the outputs
+            if base is not None and path.is_relative_to(base):
+                return Path(output_directory) / path.relative_to(base)
+            return Path(output_directory) / path.name
+
+        if self.manifest is not None:
+            manifest_path = self.manifest.path
+            if output_directory is not None:
+                manifest_path = relocate(manifest_path)
+            builder.set_manifest(manifest_path, self.manifest.fixed_build_id)
+
+        # The resources shared by the contexts (e.g., the asset pipelines) are relocated once
+        relocated = {}
+        for context, output_path in zip(self.contexts, output_paths):
+            fork = context.fork(output_path)
+            if output_directory is not None:
+                fork.relocate(relocate, relocated)
+            builder.register_context(fork)
+        return builder
+
+    def set_snapshot_cache(self, directory: Path | str) -> None:
+        """Stores the loaded data in snapshots, in the given directory (see `cvbuilder.snapshot`).
+
+        When the JSON file(s) and the contexts did not change since the previous build,
+        the data of the modules are restored from the snapshot instead of being loaded from the JSON file(s).
+
+        Args:
+            directory: The directory containing the snapshots.
+        """
+        from .snapshot import SnapshotCache  # pylint: disable = import-outside-toplevel
+
+        self.snapshot_cache = SnapshotCache(directory)
+
+    def set_schema(self, schema_path: Path | str, workers: int = 1) -> None:
+        """Validates the JSON documents against a JSON Schema before loading them (see `cvbuilder.validation`).
+
+        An invalid document stops the build before anything is loaded or written,
+        with an error (`validation.ValidationError`) listing every violation.
+        The schema is compiled once per process, and shared by the forks of the builder.
+
+        Args:
+            schema_path: The path to the schema (e.g., the `schema.json` of this repository).
+            workers: The number of threads checking the sections of a document.
+        """
+        from .validation import load_validator  # pylint: disable = import-outside-toplevel
+
+        self.validator = load_validator(schema_path)
+        self.validation_workers = workers
+
+    def build(
+        self, json_file_paths: Path | str | list[Path | str]
+    ) -> contexts.PersonalData:
         """Builds the documents from the JSON file(s) at the given location(s).
 
         The contents of the JSON file(s) are passed to each context, in the same order they were registered.
@@ -57,29 +243,250 @@ class Builder:
         Warning:
             Having the same key in more than one file is an undefined behavior.
 
+        With an output sink writing in the background (see `set_sink`), the build returns once its files are written.
+        With a manifest (see `set_manifest`), the manifest of the written files is updated at the end of the build.
+
         Args:
             json_file_paths: The path(s) to the JSON file(s)
+
+        Raises:
+            sinks.WriteError: if the sink could not write some files.
+
+        Returns:
+            The personal data found in the JSON file(s), or None.
         """
         if len(self.contexts) == 0:
             print("Builder: nothing to do, as there is no context", file=sys.stderr)
-            return
+            return None
 
         if not isinstance(json_file_paths, list):
             json_file_paths = [json_file_paths]
 
-        personal = None
-        for json_file_path in json_file_paths:
-            if isinstance(json_file_path, str):
-                json_file_path = Path(json_file_path)
+        personal = self._load(json_file_paths)
+        if self.manifest is not None:
+            self.manifest.start_build()
+        for context in self.contexts:
+            context.write_output(personal)
+        self._finish_build()
+        return personal
+
+    async def abuild(
+        self,
+        json_file_paths: Path | str | list[Path | str],
+        executor: Executor = None,
+    ) -> contexts.PersonalData:
+        """Asynchronous counterpart of `build`, that never blocks the event loop.
+
+        The JSON file(s) are read and loaded (or restored from a snapshot) in separate threads,
+        and the contexts are rendered in `executor` (by default, the event loop's default executor)
+        before being written in a separate thread.
 
-            with json_file_path.open(encoding="UTF8") as file:
-                content = json.load(file)
+        Warning:
+            A builder holds the data of the CV it is building.
+            Thus, concurrent calls to `abuild` must use different builders (see `fork` and `abuild_all`).
+
+        Args:
+            json_file_paths: The path(s) to the JSON file(s)
+            executor: The executor in which the contexts are rendered
+
+        Raises:
+            sinks.WriteError: if the sink could not write some files.
+
+        Returns:
+            The personal data found in the JSON file(s), or None.
+        """
+        if len(self.contexts) == 0:
+            print("Builder: nothing to do, as there is no context", file=sys.stderr)
+            return None
+
+        # pylint: disable = import-outside-toplevel
+        import asyncio
+        from .sinks import write_group
+
+        if not isinstance(json_file_paths, list):
+            json_file_paths = [json_file_paths]
+
+        contents = await asyncio.gather(
+            *(asyncio.to_thread(Path(path).read_bytes) for path in json_file_paths)
+        )
+        personal = await asyncio.to_thread(self._load, json_file_paths, contents)
+
+        # The files are written by other threads, which must all be waited for by the flush
+        with write_group():
+            if self.manifest is not None:
+                self.manifest.start_build()
+            await asyncio.gather(
+                *(context.awrite_output(personal, executor) for context in self.contexts)
+            )
+            await asyncio.to_thread(self._finish_build)
+        return personal
+
+    def render(
+        self,
+        json_documents: dict[str, Any] | list[dict[str, Any]],
+        names: list[str] = None,
+    ) -> dict[str, str]:
+        """Renders the documents from already parsed JSON document(s), without writing anything.
+
+        The data are loaded in a fork of this builder (see `fork`), such that multiple threads can render
+        different CVs with the same builder at the same time.
+        The resources linked by the outputs (e.g., the HTML assets) are kept in memory
+        (see `contexts.Context.keep_in_memory`): they are neither written, given to the sink, nor recorded.
+
+        Args:
+            json_documents: The JSON document(s), as produced by `json.load`.
+            names: If not None, only the contexts whose output path (or output file name) is in this list are rendered.
+
+        Returns:
+            A dictionary mapping the path of each output file of the rendered contexts to its contents.
+        """
+        if not isinstance(json_documents, list):
+            json_documents = [json_documents]
+
+        builder = self.fork()
+        for context in builder.contexts:
+            context.keep_in_memory()
+        json_documents = self._validate(range(len(json_documents)), json_documents)
+        personal = builder.load_documents(json_documents)
+
+        return {
+            str(path): output
+            for context in builder.select_contexts(names)
+            for path, output in context.render_outputs(personal)
+        }
+
+    def select_contexts(self, names: list[str] = None) -> list[contexts.Context]:
+        """Selects registered contexts by their output path, or by the name of their output file.
+
+        Args:
+            names: The output paths or file names. If None, every context is selected.
+
+        Returns:
+            The selected contexts, in the order they were registered.
+        """
+        if names is None:
+            return list(self.contexts)
+        return [
+            context
+            for context in self.contexts
+            if str(context.output_path) in names or context.output_path.name in names
+        ]
+
+    def _load(
+        self, json_file_paths: list[Path | str], contents: list[bytes] = None
+    ) -> contexts.PersonalData:
+        # Forgets the previous data, then loads (and validates) the JSON file(s), or restores them from a snapshot
+        self.reset()
+        if self.snapshot_cache is None:
+            if contents is None:
+                json_documents = map(read_json_file, json_file_paths)
+            else:
+                json_documents = map(json.loads, contents)
+            return self.load_documents(self._validate(json_file_paths, json_documents))
 
+        if contents is None:
+            contents = [Path(path).read_bytes() for path in json_file_paths]
+        restored, personal = self.snapshot_cache.restore(self, contents)
+        if not restored:
+            json_documents = map(json.loads, contents)
+            personal = self.load_documents(self._validate(json_file_paths, json_documents))
+            self.snapshot_cache.store(self, contents, personal)
+        return personal
+
+    def _finish_build(self) -> None:
+        if self.manifest is not None:
+            self.manifest.save(self.sink)
+        if self.sink is not None:
+            # Waits for the files written in the background, if any (see `sinks.BackgroundWriter`)
+            self.sink.flush()
+
+    def _validate(
+        self, sources: Iterable[Any], json_documents: Iterable[dict[str, Any]]
+    ) -> Iterable[dict[str, Any]]:
+        # Without a validator, the documents are passed through (and may be read lazily)
+        if self.validator is None:
+            return json_documents
+        json_documents = list(json_documents)
+        self.validator.validate(
+            [(str(source), document) for source, document in zip(sources, json_documents)],
+            self.validation_workers,
+        )
+        return json_documents
+
+    def load_documents(
+        self, json_documents: Iterable[dict[str, Any]]
+    ) -> contexts.PersonalData:
+        """Passes the contents of each JSON document to every context.
+
+        Args:
+            json_documents: The JSON documents.
+
+        Returns:
+            The personal data found in the documents, or None.
+        """
+        from .contexts import PersonalData  # pylint: disable = import-outside-toplevel
+
+        personal = None
+        for content in json_documents:
             if self.personal_key in content:
-                personal = contexts.PersonalData(**content[self.personal_key])
+                personal = PersonalData(**content[self.personal_key])
 
             for context in self.contexts:
                 context.load_data_from_document(content)
+        return personal
 
-        for context in self.contexts:
-            context.write_output(personal)
+
+async def abuild_all(
+    builds: Iterable[tuple[Builder, Path | str | list[Path | str]]],
+    max_concurrency: int = 8,
+    executor: Executor = None,
+) -> None:
+    """Runs many asynchronous builds, at most `max_concurrency` at the same time.
+
+    Args:
+        builds: Pairs of a builder and the JSON file path(s) it must build. Each builder must appear at most once.
+        max_concurrency: The maximal number of builds running at the same time.
+        executor: The executor in which the contexts are rendered
+    """
+    import asyncio  # pylint: disable = import-outside-toplevel
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(builder: Builder, json_file_paths) -> None:
+        async with semaphore:
+            await builder.abuild(json_file_paths, executor)
+
+    await asyncio.gather(*(run(builder, paths) for builder, paths in builds))
+
+
+def read_json_file(json_file_path: Path | str) -> dict[str, Any]:
+    """Reads and parses a JSON file.
+
+    Args:
+        json_file_path: The path to the JSON file.
+
+    Returns:
+        The parsed JSON document.
+    """
+    if isinstance(json_file_path, str):
+        json_file_path = Path(json_file_path)
+
+    with json_file_path.open(encoding="UTF8") as file:
+        return json.load(file)
+
+
+def shallow_copy(instance: _T) -> _T:
+    """Copies an object, sharing its attributes (e.g., for the forks of contexts and modules).
+
+    Unlike `copy.copy`, neither `__reduce_ex__` nor `copyreg` are involved, which matters for the forks
+    created for every render.
+
+    Args:
+        instance: The object, whose attributes are in its `__dict__`.
+
+    Returns:
+        The copy.
+    """
+    copy = object.__new__(type(instance))
+    copy.__dict__.update(vars(instance))
+    return copy
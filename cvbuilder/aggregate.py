@@ -0,0 +1,244 @@
+"""
+Aggregation of the publications of many CVs (e.g., every member of a department) into a single list.
+
+The publications of each CV are read and sorted by year, and spooled into a temporary file (one JSON object per line).
+The spooled lists are then merged line by line (a k-way merge), and written as they are merged (see `write_aggregated`).
+The memory thus holds one CV while spooling, then one publication per CV, the publications of the current year,
+and the identifiers of the publications already merged.
+A publication appearing in multiple CVs (e.g., co-authored by two members) is kept once: two publications are
+duplicates when they share a DOI, an arXiv identifier, or a normalized title.
+The first occurrence is kept, and its missing fields are completed by its duplicates of the same year
+(a duplicate listed with another year is dropped).
+
+The aggregated list is a JSON value following the schema of the publications (grouped per year),
+rendered by the usual `PublicationModule`. For instance,
+```
+python -m cvbuilder.aggregate output/department-publications.json people/*.json
+```
+writes a JSON file that can be given to a builder (or to a build configuration) with a publication module.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from itertools import groupby
+from typing import Any, Iterable, Iterator
+import argparse
+import hashlib
+import heapq
+import json
+import re
+import sys
+import tempfile
+
+from .contexts.search import tokenize
+
+
+def publication_keys(publication: dict[str, Any]) -> list[str]:
+    """The identifiers of a publication: its DOI, its arXiv identifier, and a hash of its normalized title.
+
+    Arguments:
+        publication -- The JSON object of the publication
+
+    Returns:
+        The identifiers, prefixed by their kind
+    """
+    keys = []
+    doi = publication.get("doi")
+    if doi:
+        doi = re.sub(r"^(https?://(dx\.)?doi\.org/|doi:)", "", doi.strip().lower())
+        keys.append(f"doi:{doi}")
+    arxiv = publication.get("arxiv")
+    if arxiv:
+        arxiv = re.sub(r"^(https?://arxiv\.org/abs/|arxiv:)", "", arxiv.strip().lower())
+        keys.append(f"arxiv:{re.sub(r'v[0-9]+$', '', arxiv)}")
+    title = publication.get("title")
+    if title:
+        normalized = " ".join(tokenize(title, min_length=1))
+        digest = hashlib.sha1(normalized.encode("UTF8"), usedforsecurity=False)
+        keys.append(f"title:{digest.hexdigest()}")
+    return keys
+
+
+def read_publications(
+    json_file_path: Path | str, key: str = "publications"
+) -> list[dict[str, Any]]:
+    """Reads the publications of a CV, sorted by decreasing year.
+
+    Arguments:
+        json_file_path -- The path to the JSON file of the CV
+        key -- The key holding the publications
+
+    Returns:
+        The JSON objects of the publications (with or without subsections in the file)
+    """
+    with Path(json_file_path).open(encoding="UTF8") as file:
+        value = json.load(file).get(key, [])
+    if isinstance(value, dict):
+        value = [
+            publication
+            for subsection in value.get("order", [])
+            for publication in value.get(subsection, [])
+        ]
+    # sorted is stable: the order of the file is kept within a year
+    return sorted(value, key=_year, reverse=True)
+
+
+def merge_publications(
+    json_file_paths: Iterable[Path | str], key: str = "publications"
+) -> Iterator[dict[str, Any]]:
+    """Merges the publications of multiple CVs, by decreasing year, without duplicates.
+
+    The CVs are read and spooled (see the documentation of the module) when the first publication is asked for.
+
+    Arguments:
+        json_file_paths -- The paths to the JSON files of the CVs
+        key -- The key holding the publications
+
+    Yields:
+        The JSON objects of the publications, completed by their duplicates of the same year
+    """
+    with tempfile.TemporaryDirectory(prefix="cvbuilder-aggregate-") as directory:
+        streams = [
+            _stream(_spool(path, key, Path(directory) / f"{position}.jsonl"))
+            for position, path in enumerate(json_file_paths)
+        ]
+        # The identifiers of the merged publications, with the year and the position of the kept occurrence
+        index: dict[str, tuple[str, int]] = {}
+        year, current = None, []
+        for publication in heapq.merge(*streams, key=_year, reverse=True):
+            if _year(publication) != year:
+                # The publications of the previous year can not be completed anymore
+                yield from current
+                year, current = _year(publication), []
+            keys = publication_keys(publication)
+            kept = next((index[k] for k in keys if k in index), None)
+            if kept is None:
+                kept = (year, len(current))
+                current.append(publication)
+            elif kept[0] == year:
+                for field, value in publication.items():
+                    current[kept[1]].setdefault(field, value)
+            for k in keys:
+                index.setdefault(k, kept)
+        yield from current
+
+
+def aggregate_publications(
+    json_file_paths: Iterable[Path | str],
+    key: str = "publications",
+    per_year: bool = True,
+) -> dict[str, Any] | list[dict[str, Any]]:
+    """Aggregates the publications of multiple CVs (see `merge_publications`).
+
+    The whole result is held in memory: to aggregate many CVs, prefer `write_aggregated`.
+
+    Arguments:
+        json_file_paths -- The paths to the JSON files of the CVs
+        key -- The key holding the publications
+        per_year -- Whether to group the publications in one subsection per year
+
+    Returns:
+        The JSON value of the aggregated publications: `{"order": [years], year: [publications], ...}`
+        if `per_year` is True, and a list of publications otherwise
+    """
+    publications = merge_publications(json_file_paths, key)
+    if not per_year:
+        return list(publications)
+
+    aggregated: dict[str, Any] = {"order": []}
+    for year, in_year in groupby(publications, key=_year):
+        aggregated["order"].append(year)
+        aggregated[year] = list(in_year)
+    return aggregated
+
+
+def write_aggregated(
+    json_file_paths: Iterable[Path | str],
+    output_path: Path | str,
+    key: str = "publications",
+    per_year: bool = True,
+) -> int:
+    """Writes the aggregated publications of multiple CVs (see `aggregate_publications`) in a JSON file.
+
+    Each publication is written as soon as it is merged, such that the result is never held in memory.
+
+    Arguments:
+        json_file_paths -- The paths to the JSON files of the CVs
+        output_path -- The JSON file receiving the publications, under `key`
+        key -- The key holding the publications
+        per_year -- Whether to group the publications in one subsection per year
+
+    Returns:
+        The number of written publications
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with output_path.open("w", encoding="UTF8") as file:
+
+        def write_list(publications: Iterable[dict[str, Any]], indent: str) -> None:
+            nonlocal count
+            file.write("[")
+            for position, publication in enumerate(publications):
+                file.write(",\n" if position > 0 else "\n")
+                file.write(indent + "  " + json.dumps(publication, ensure_ascii=False))
+                count += 1
+            file.write(f"\n{indent}]" if count > 0 else "]")
+
+        file.write(f"{{\n  {json.dumps(key)}: ")
+        publications = merge_publications(json_file_paths, key)
+        if not per_year:
+            write_list(publications, "  ")
+        else:
+            # The order is written last, once every year is known
+            order = []
+            file.write("{\n")
+            for year, in_year in groupby(publications, key=_year):
+                order.append(year)
+                file.write(f"    {json.dumps(year)}: ")
+                write_list(in_year, "    ")
+                file.write(",\n")
+            file.write(f'    "order": {json.dumps(order)}\n  }}')
+        file.write("\n}\n")
+    return count
+
+
+def _year(publication: dict[str, Any]) -> str:
+    return str(publication.get("year", ""))
+
+
+def _spool(json_file_path: Path | str, key: str, spool_path: Path) -> Path:
+    # Only the sorted publications of the CV are kept, one per line
+    with spool_path.open("w", encoding="UTF8") as file:
+        for publication in read_publications(json_file_path, key):
+            file.write(json.dumps(publication, ensure_ascii=False))
+            file.write("\n")
+    return spool_path
+
+
+def _stream(spool_path: Path) -> Iterator[dict[str, Any]]:
+    # The merge holds one line of each spooled file
+    with spool_path.open(encoding="UTF8") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m cvbuilder.aggregate",
+        description="Aggregates the publications of multiple CVs, without duplicates.",
+    )
+    parser.add_argument("output", help="the JSON file receiving the aggregated publications")
+    parser.add_argument("cvs", nargs="+", help="the JSON files of the CVs")
+    parser.add_argument(
+        "-k", "--key", default="publications", help="the key holding the publications (default: publications)"
+    )
+    args = parser.parse_args(argv)
+
+    count = write_aggregated(args.cvs, args.output, args.key)
+    print(f"{count} publications from {len(args.cvs)} CVs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
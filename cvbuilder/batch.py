@@ -0,0 +1,328 @@
+"""
+Batch builds: the CVs of many persons, built with the same configuration.
+
+The configuration is created once (per worker) by a *factory*, a function returning a configured `Builder`
+(for instance, `config_factory("department.toml")`). Each CV is then built by a fork of this builder,
+writing its documents in its own output directory (see `Builder.fork`).
+
+The builds run in one of two modes:
+
+  - `"thread"`: a pool of threads shares a single configured builder.
+    Under a free-threaded build of CPython (3.13t and later), the threads render in parallel.
+    With the GIL, only reading and writing the files overlap.
+  - `"process"`: a pool of processes, each creating its own builder with the factory.
+    The factory (and the jobs) must then be picklable; for instance, a module-level function.
+
+The mode `"auto"` selects threads when the GIL is disabled, and processes otherwise.
+
+By default, the worker processes are forked from a *forkserver* that imported Markdown, `dateutil`,
+and every context and module beforehand (see `PRELOADED_MODULES`), such that the workers do not import them again.
+Each worker then creates its Markdown converters and its builder once, before processing jobs.
+To bound the memory of long batches, a worker can be replaced by a new one after `max_jobs_per_worker` jobs.
+
+With an output sink (e.g., a zip archive; see `sinks`), the documents of every CV are given to the sink.
+Each job keeps its documents in memory (in a `MemorySink`) until it succeeds, such that a failed job leaves nothing
+in the sink. A worker thread then gives the documents to the shared sink, while a worker process sends them back to
+the main process, which gives them to the sink in the order of the jobs.
+
+While building a CV, a worker also collects its personal data and the number of its entries (see `directory`),
+such that the index page and the sitemap of the whole batch are written without reading the JSON files again.
+"""
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+import functools
+import importlib
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+from . import Builder
+from .config import CONTEXT_TYPES, MODULE_TYPES
+from .directory import DirectoryEntry, DirectoryIndex, collect_entry
+from .sinks import MemorySink, OutputSink
+
+MODES = ("auto", "thread", "process")
+
+# Imported by the forkserver, before forking the worker processes
+PRELOADED_MODULES = tuple(
+    dict.fromkeys(
+        [
+            "markdown",
+            "markdown.extensions.smarty",
+            "dateutil.parser",
+            "cvbuilder.modules.utils.etree_to_latex",
+        ]
+        + [qualified.partition(":")[0] for qualified in CONTEXT_TYPES.values()]
+        + [qualified.partition(":")[0] for qualified in MODULE_TYPES.values()]
+    )
+)
+
+
+@dataclass
+class BatchJob:
+    """A CV to build: its JSON file(s), the directory receiving its documents and,
+    optionally, the output paths (or output file names) of the contexts to build."""
+
+    inputs: list[Path]
+    output_directory: Path
+    contexts: list[str] = None
+
+
+@dataclass
+class WorkerStatistics:
+    """The jobs processed by one worker (thread or process) of a batch."""
+
+    jobs: int = 0
+    busy_time: float = 0
+
+    @property
+    def throughput(self) -> float:
+        """The number of CVs built per second spent building."""
+        return self.jobs / self.busy_time if self.busy_time > 0 else 0.0
+
+
+@dataclass
+class BatchReport:
+    """The result of a batch build."""
+
+    mode: str
+    workers: int
+    jobs: int = 0
+    total_time: float = 0
+    failures: list[tuple[BatchJob, str]] = field(default_factory=list)
+    per_worker: dict[str, WorkerStatistics] = field(default_factory=dict)
+    entries: list[DirectoryEntry] = field(default_factory=list)
+
+    @property
+    def throughput(self) -> float:
+        """The number of CVs built per second."""
+        return self.jobs / self.total_time if self.total_time > 0 else 0.0
+
+
+def gil_enabled() -> bool:
+    """Whether the interpreter runs with the GIL (always True before Python 3.13)."""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def config_factory(config_path: Path | str) -> Callable[[], Builder]:
+    """Creates a (picklable) factory, returning the builder described by a configuration file.
+
+    The outputs of the jobs are laid out like the outputs of the configuration.
+
+    Args:
+        config_path: The path to the configuration file (see `cvbuilder.config`).
+
+    Returns:
+        The factory.
+    """
+    return functools.partial(_load_config_builder, Path(config_path))
+
+
+def build_batch(
+    factory: Callable[[], Builder],
+    jobs: Iterable[BatchJob],
+    mode: str = "auto",
+    workers: int = None,
+    max_jobs_per_worker: int = None,
+    start_method: str = None,
+    index: DirectoryIndex = None,
+    sink: OutputSink = None,
+) -> BatchReport:
+    """Builds many CVs with the builder created by the factory.
+
+    A failing job does not stop the other ones; its error is recorded in the report.
+    The entries describing the built CVs (see `directory.DirectoryEntry`) are in the report, in the order of the jobs.
+
+    Args:
+        factory: The function creating the configured builder.
+        jobs: The CVs to build.
+        mode: `"thread"`, `"process"`, or `"auto"` (see the documentation of the module).
+        workers: The number of threads or processes. If None, the number of CPUs.
+        max_jobs_per_worker: If not None, a worker process is replaced after this number of jobs.
+            Ignored in the thread mode.
+        start_method: The multiprocessing start method of the worker processes.
+            If None, `"forkserver"` when available, and `"spawn"` otherwise.
+        index: If not None, the index page and the sitemap of the built CVs are written once every job is done.
+        sink: If not None, the documents (and the index) are given to this sink. The sink is not closed.
+
+    Raises:
+        ValueError: if the mode is unknown.
+        sinks.WriteError: if the sink could not write the documents sent back by the worker processes, or the index.
+
+    Returns:
+        The report of the batch.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Batch: unknown mode '{mode}' (expected one of {', '.join(MODES)})")
+    if mode == "auto":
+        mode = "process" if gil_enabled() else "thread"
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    jobs = list(jobs)
+    report = BatchReport(mode, workers, len(jobs))
+    start = time.perf_counter()
+    if mode == "thread":
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            template = factory()
+            run = functools.partial(_run_job_in_thread, template, sink)
+            _collect(report, jobs, executor.map(run, jobs))
+    else:
+        # multiprocessing.Pool, rather than ProcessPoolExecutor, as the latter may hang
+        # when replacing workers (max_tasks_per_child) before Python 3.12
+        mp_context = worker_context(start_method)
+        with mp_context.Pool(
+            workers, _initialize_worker, (factory,), max_jobs_per_worker
+        ) as pool:
+            run = functools.partial(
+                _run_job_in_worker, root=None if sink is None else sink.root
+            )
+            _collect(report, jobs, _forward_outputs(pool.imap(run, jobs), sink))
+    if index is not None:
+        index.write(report.entries, sink)
+    if sink is not None:
+        # The documents of the worker processes (and the index) are given to the sink by this thread
+        sink.flush()
+    report.total_time = time.perf_counter() - start
+    return report
+
+
+def _collect(
+    report: BatchReport,
+    jobs: list[BatchJob],
+    results: Iterable[tuple[str, float, str | None, DirectoryEntry | None]],
+) -> None:
+    for job, (worker, duration, error, entry) in zip(jobs, results):
+        statistics = report.per_worker.setdefault(worker, WorkerStatistics())
+        statistics.jobs += 1
+        statistics.busy_time += duration
+        if error is not None:
+            report.failures.append((job, error))
+        else:
+            report.entries.append(entry)
+
+
+def _forward_outputs(
+    results: Iterable[tuple[tuple, dict[str, bytes] | None]], sink: OutputSink
+) -> Iterable[tuple[str, float, str | None, DirectoryEntry | None]]:
+    # Gives the documents built by a worker process to the sink
+    for result, files in results:
+        # The documents of a failed job are dropped
+        if files is not None and result[2] is None:
+            _forward(files, sink)
+        yield result
+
+
+def _forward(files: dict[str, bytes], sink: OutputSink) -> None:
+    for name, data in files.items():
+        sink.write(sink.root / name, data)
+
+
+def worker_context(start_method: str = None) -> multiprocessing.context.BaseContext:
+    """The multiprocessing context starting the worker processes.
+
+    Args:
+        start_method: The start method. If None, `"forkserver"` (preloading `PRELOADED_MODULES`) when available,
+            and `"spawn"` otherwise.
+
+    Returns:
+        The context.
+    """
+    if start_method is None:
+        available = multiprocessing.get_all_start_methods()
+        start_method = "forkserver" if "forkserver" in available else "spawn"
+    mp_context = multiprocessing.get_context(start_method)
+    if start_method == "forkserver":
+        mp_context.set_forkserver_preload(list(PRELOADED_MODULES))
+    return mp_context
+
+
+def run_job(
+    template: Builder, job: BatchJob, worker: str = None, sink: OutputSink = None
+) -> tuple[str, float, str | None, DirectoryEntry | None]:
+    """Builds a job with a fork of the template.
+
+    Args:
+        template: The configured builder.
+        job: The job.
+        worker: The name of the worker. If None, the name of the current thread.
+        sink: If not None, the fork gives its documents to this sink, instead of the sink of the template.
+
+    Returns:
+        The name of the worker, the duration of the build, the error message (or None, if the build succeeded),
+        and the directory entry of the CV (or None, if the build failed).
+    """
+    if worker is None:
+        worker = threading.current_thread().name
+    start = time.perf_counter()
+    error = None
+    entry = None
+    try:
+        builder = template.fork(job.output_directory)
+        if sink is not None:
+            builder.set_sink(sink)
+        builder.contexts = builder.select_contexts(job.contexts)
+        personal = builder.build(list(job.inputs))
+        entry = collect_entry(builder, personal)
+    except Exception as exc:  # pylint: disable = broad-exception-caught
+        error = f"{exc.__class__.__name__}: {exc}"
+    return worker, time.perf_counter() - start, error, entry
+
+
+# The builder of a worker process, created once by `_initialize_worker`
+_worker_template: Builder = None
+
+
+def _initialize_worker(factory: Callable[[], Builder]) -> None:
+    # pylint: disable = global-statement, import-outside-toplevel
+    global _worker_template
+    from .modules import description
+
+    # Without a forkserver, the modules are imported here
+    for name in PRELOADED_MODULES:
+        importlib.import_module(name)
+    description.warm_up()
+    _worker_template = factory()
+
+
+def _run_job_in_worker(
+    job: BatchJob, root: Path = None
+) -> tuple[tuple[str, float, str | None, DirectoryEntry | None], dict[str, bytes] | None]:
+    # With a sink in the main process, the documents are kept in memory and sent back
+    sink = None if root is None else MemorySink(root)
+    result = run_job(_worker_template, job, f"process {os.getpid()}", sink)
+    return result, None if sink is None else sink.files
+
+
+def _run_job_in_thread(
+    template: Builder, sink: OutputSink, job: BatchJob
+) -> tuple[str, float, str | None, DirectoryEntry | None]:
+    if sink is None:
+        return run_job(template, job)
+    # The documents are kept in memory until the job succeeds, such that a failed job leaves nothing in the sink
+    buffer = MemorySink(sink.root)
+    worker, duration, error, entry = run_job(template, job, sink=buffer)
+    if error is None:
+        start = time.perf_counter()
+        try:
+            _forward(buffer.files, sink)
+            # Waits for the documents written in the background, if any (see `sinks.BackgroundWriter`)
+            sink.flush()
+        except Exception as exc:  # pylint: disable = broad-exception-caught
+            error, entry = f"{exc.__class__.__name__}: {exc}", None
+        duration += time.perf_counter() - start
+    return worker, duration, error, entry
+
+
+def _load_config_builder(config_path: Path) -> Builder:
+    # pylint: disable = import-outside-toplevel
+    from .config import load_config
+
+    return load_config(config_path).builder
@@ -0,0 +1,179 @@
+"""
+Command-line entry point, building the documents described by configuration files (see `cvbuilder.config`).
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+import argparse
+import sys
+import time
+
+from .config import load_config
+
+
+@dataclass
+class BuildReport:
+    """The result of building one configuration."""
+
+    config: str
+    status: str
+    load_time: float = 0
+    build_time: float = 0
+    failed: bool = False
+    reused_fragments: int = 0
+
+
+def build_config(
+    config_path: Path | str, names: list[str] = None, incremental: bool = False
+) -> BuildReport:
+    """Loads a configuration and builds its documents.
+
+    Args:
+        config_path: The path to the configuration file.
+        names: If not None, only the contexts whose output path (or output file name) is in this list are built.
+        incremental: Whether to skip the build when every output (every page, if paginated) is more recent than
+            the configuration, the inputs, and the files read by the contexts (e.g., the CSS files and the images).
+
+    Returns:
+        The report of the build.
+    """
+    start = time.perf_counter()
+    try:
+        config = load_config(config_path)
+    except (OSError, ValueError) as exc:
+        return BuildReport(str(config_path), f"failed: {exc}", failed=True)
+
+    builder = config.builder
+    builder.contexts = builder.select_contexts(names)
+    load_time = time.perf_counter() - start
+
+    if len(builder.contexts) == 0:
+        return BuildReport(str(config_path), "no context selected", load_time)
+
+    if incremental and _up_to_date(
+        [config.path]
+        + config.inputs
+        + [path for context in builder.contexts for path in context.resource_files()],
+        [path for context in builder.contexts for path in context.written_files()],
+    ):
+        return BuildReport(str(config_path), "up to date", load_time)
+
+    start = time.perf_counter()
+    try:
+        builder.build(config.inputs)
+    except Exception as exc:  # pylint: disable = broad-exception-caught
+        return BuildReport(
+            str(config_path),
+            f"failed: {exc.__class__.__name__}: {exc}",
+            load_time,
+            time.perf_counter() - start,
+            True,
+        )
+    return BuildReport(
+        str(config_path),
+        "built",
+        load_time,
+        time.perf_counter() - start,
+        reused_fragments=(
+            0
+            if builder.fragment_cache is None
+            else builder.fragment_cache.statistics.reused
+        ),
+    )
+
+
+def _up_to_date(sources: list[Path], outputs: list[Path]) -> bool:
+    try:
+        oldest_output = min(output.stat().st_mtime for output in outputs)
+        newest_source = max(source.stat().st_mtime for source in sources)
+    except FileNotFoundError:
+        return False
+    return oldest_output >= newest_source
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="cvbuilder",
+        description="Builds CV documents from JSON files, following build configuration files (TOML or JSON).",
+    )
+    parser.add_argument("configs", nargs="+", type=Path, metavar="CONFIG")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of configurations built in parallel, in separate processes",
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="skip the configurations whose outputs are more recent than their inputs",
+    )
+    parser.add_argument(
+        "-c",
+        "--context",
+        action="append",
+        dest="contexts",
+        metavar="NAME",
+        help="only build the context with this output path or output file name (can be repeated)",
+    )
+    parser.add_argument(
+        "-t", "--timings", action="store_true", help="print timing information"
+    )
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    """Runs the command-line interface.
+
+    Args:
+        argv: The arguments. If None, `sys.argv` is used.
+
+    Returns:
+        The exit code: 0 if every configuration was built, 1 otherwise.
+    """
+    startup_time = time.process_time()
+    args = _parser().parse_args(argv)
+
+    start = time.perf_counter()
+    if args.jobs > 1 and len(args.configs) > 1:
+        # pylint: disable = import-outside-toplevel
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+            reports = list(
+                executor.map(
+                    build_config,
+                    args.configs,
+                    [args.contexts] * len(args.configs),
+                    [args.incremental] * len(args.configs),
+                )
+            )
+    else:
+        reports = [
+            build_config(config, args.contexts, args.incremental)
+            for config in args.configs
+        ]
+    total_time = time.perf_counter() - start
+
+    for report in reports:
+        line = f"{report.config}: {report.status}"
+        if args.timings:
+            line += (
+                f" (load {report.load_time * 1000:.1f} ms, build {report.build_time * 1000:.1f} ms,"
+                f" {report.reused_fragments} reused fragments)"
+            )
+        print(line, file=sys.stderr if report.failed else sys.stdout)
+
+    if args.timings:
+        print(
+            f"startup {startup_time * 1000:.1f} ms (CPU), total {total_time * 1000:.1f} ms"
+        )
+
+    return 1 if any(report.failed for report in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
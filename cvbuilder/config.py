@@ -0,0 +1,297 @@
+"""
+Declarative build configurations.
+
+A configuration file (TOML or JSON) describes the JSON input files, the contexts and the modules of each context.
+It replaces the Python script that would otherwise be needed to create a `Builder`.
+For instance,
+```toml
+inputs = ["json_example/example.json"]
+
+[[contexts]]
+type = "html"
+output = "output/html/index.html"
+css = ["resources/css/style.css"]
+title = "{name} - {position}"
+modules = [
+    { type = "contact", key = "contact", category = "sidebar" },
+    { type = "jobs", key = "jobs" },
+    { type = "text", options = { section = "Closing Words", text = "Goodbye." } },
+]
+
+[[contexts]]
+type = "latex"
+output = "output/latex/cv.tex"
+styles = { title = { author = "\\\\bfseries" } }
+modules = [{ type = "contact", key = "contact", category = "title" }]
+```
+
+The `type` of a context or a module is either one of the names known by this module
+(see `CONTEXT_TYPES` and `MODULE_TYPES`), or a fully qualified name `package.module:Class`.
+The `key` of a module may be a list of keys (e.g., for the statistics module).
+The `options` of a module are passed as keyword arguments to the constructor of the module,
+and its optional `pagination` (e.g., `{ page_size = 50, per_subsection = true }`) to `Context.paginate`.
+
+A context may have a `precompression` table (e.g., `{ gzip_level = 9 }`) to write compressed sidecar files.
+An HTML context may have an `assets` table (e.g., `{ output_dir = "output/html", minify = true }`) to use an
+`AssetPipeline`, shared by all the contexts with the same `output_dir`, and a `search` table
+(e.g., `{ max_terms = 20000 }`, or `{}` for the default values) to write a `SearchIndex`.
+
+The optional top-level `snapshots` key is a directory in which the loaded data are cached (see `cvbuilder.snapshot`),
+`schema` is a JSON Schema the documents are validated against (see `Builder.set_schema`), with `validation_workers` threads,
+`manifest` is the manifest of the output files (see `Builder.set_manifest`),
+and `share_fragments = true` renders identical modules only once across the contexts (see `Builder.share_fragments`).
+
+Relative input and output paths are resolved from the directory containing the configuration file.
+An invalid table or option (e.g., an unknown option, or a string instead of a number) raises a `ConfigError`
+naming the table and the option, when the configuration is loaded.
+"""
+
+from __future__ import annotations
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+import importlib
+import inspect
+import json
+import tomllib
+
+from . import Builder
+
+CONTEXT_TYPES = {
+    "html": "cvbuilder.contexts.html:HTMLContext",
+    "latex": "cvbuilder.contexts.latex:LaTeXContext",
+    "markdown": "cvbuilder.contexts.markdown:MarkdownContext",
+}
+
+MODULE_TYPES = {
+    "award": "cvbuilder.modules.award:AwardModule",
+    "contact": "cvbuilder.modules.contact:ContactModule",
+    "event": "cvbuilder.modules.event:EventModule",
+    "job": "cvbuilder.modules.job:JobModule",
+    "language": "cvbuilder.modules.language:LanguageModule",
+    "logos": "cvbuilder.modules.logos:LogosModule",
+    "project": "cvbuilder.modules.project:ProjectModule",
+    "publication": "cvbuilder.modules.publication:PublicationModule",
+    "service": "cvbuilder.modules.service:ServiceModule",
+    "statistics": "cvbuilder.modules.statistics:StatisticsModule",
+    "summary": "cvbuilder.modules.summary:SummaryModule",
+    "supervision": "cvbuilder.modules.supervision:SupervisionModule",
+    "talk": "cvbuilder.modules.talk:TalkModule",
+    "teach": "cvbuilder.modules.teach:TeachModule",
+    "text": "cvbuilder.modules.text:TextModule",
+}
+
+# Plural forms, matching the keys used in the JSON schema
+MODULE_TYPES |= {
+    "awards": MODULE_TYPES["award"],
+    "events": MODULE_TYPES["event"],
+    "jobs": MODULE_TYPES["job"],
+    "languages": MODULE_TYPES["language"],
+    "projects": MODULE_TYPES["project"],
+    "publications": MODULE_TYPES["publication"],
+    "services": MODULE_TYPES["service"],
+    "talks": MODULE_TYPES["talk"],
+    "teaching": MODULE_TYPES["teach"],
+}
+
+
+class ConfigError(ValueError):
+    """Raised when a build configuration is invalid."""
+
+
+@dataclass
+class BuildConfig:
+    """A loaded build configuration."""
+
+    path: Path
+    builder: Builder
+    inputs: list[Path] = field(default_factory=list)
+
+
+def load_config(config_path: Path | str) -> BuildConfig:
+    """Reads a configuration file (TOML or JSON, depending on the extension) and creates the builder it describes.
+
+    Args:
+        config_path: The path to the configuration file.
+
+    Raises:
+        ConfigError: if the configuration is invalid.
+
+    Returns:
+        The loaded configuration.
+    """
+    if isinstance(config_path, str):
+        config_path = Path(config_path)
+
+    with config_path.open("rb") as file:
+        if config_path.suffix == ".json":
+            values = json.load(file)
+        else:
+            values = tomllib.load(file)
+
+    base = config_path.parent
+    return BuildConfig(
+        config_path,
+        create_builder(values, base),
+        [base / path for path in values.get("inputs", [])],
+    )
+
+
+def create_builder(values: dict[str, Any], base: Path = Path(".")) -> Builder:
+    """Creates a builder from the values of a configuration.
+
+    Args:
+        values: The configuration, as a dictionary.
+        base: The directory relative output paths are resolved from.
+
+    Raises:
+        ConfigError: if the configuration is invalid.
+
+    Returns:
+        The builder, with all its contexts and modules.
+    """
+    builder = Builder(values.get("personal_key", "personal"))
+    if "snapshots" in values:
+        builder.set_snapshot_cache(base / values["snapshots"])
+    if "schema" in values:
+        builder.set_schema(base / values["schema"], values.get("validation_workers", 1))
+    if "manifest" in values:
+        builder.set_manifest(base / values["manifest"])
+    if values.get("share_fragments", False):
+        builder.share_fragments()
+    pipelines = {}
+    for context_values in values.get("contexts", []):
+        builder.register_context(_create_context(context_values, base, pipelines))
+    return builder
+
+
+def resolve_type(name: str, known: dict[str, str]) -> type:
+    """Finds the class designated by a name.
+
+    Args:
+        name: Either a key of `known`, or a fully qualified name `package.module:Class`.
+        known: The short names.
+
+    Raises:
+        ConfigError: if the class does not exist.
+
+    Returns:
+        The class.
+    """
+    qualified = known.get(name, name)
+    module_name, _, class_name = qualified.partition(":")
+    if class_name == "":
+        raise ConfigError(
+            f"Configuration: unknown type '{name}' (expected one of {', '.join(known)}, or 'package.module:Class')"
+        )
+    try:
+        return getattr(importlib.import_module(module_name), class_name)
+    except (ImportError, AttributeError) as exc:
+        raise ConfigError(f"Configuration: can not import '{qualified}'") from exc
+
+
+def _create_context(values: dict[str, Any], base: Path, pipelines: dict[Path, Any]):
+    # pylint: disable = import-outside-toplevel
+    from .contexts.html import AssetPipeline, HTMLContext
+    from .contexts.latex import LaTeXContext, Style
+    from .contexts.markdown import MarkdownContext
+    from .contexts.search import SearchIndex
+
+    try:
+        context_type = resolve_type(values["type"], CONTEXT_TYPES)
+        output = base / values["output"]
+    except KeyError as exc:
+        raise ConfigError(f"Configuration: a context is missing the key {exc}") from exc
+
+    name = f"the context '{values['output']}'"
+    with _invalid(f"options for {name}"):
+        options = values.get("options", {})  # e.g., { compact = true } for HTML
+        if issubclass(context_type, MarkdownContext):
+            context = context_type(output, values.get("title", ""), **_checked(context_type, options))
+        else:
+            context = context_type(output, **_checked(context_type, options))
+
+    if "precompression" in values:
+        with _invalid(f"'precompression' table of {name}"):
+            context.set_precompression(**_checked(context.set_precompression, values["precompression"]))
+
+    if isinstance(context, HTMLContext):
+        with _invalid(f"'css' list of {name}"):
+            for css in values.get("css", []):
+                context.add_css_file(css)
+        if "title" in values:
+            title = values["title"]
+            context.set_title_fct(lambda personal: title.format(**vars(personal)))
+        if "assets" in values:
+            with _invalid(f"'assets' table of {name}"):
+                assets = dict(values["assets"])
+                output_dir = base / assets.pop("output_dir") if "output_dir" in assets else output.parent
+                if output_dir not in pipelines:
+                    pipelines[output_dir] = AssetPipeline(
+                        output_dir, source_root=base, **_checked(AssetPipeline, assets)
+                    )
+            context.set_asset_pipeline(pipelines[output_dir])
+        if "search" in values:
+            with _invalid(f"'search' table of {name}"):
+                context.set_search_index(SearchIndex(**_checked(SearchIndex, values["search"])))
+
+    if isinstance(context, LaTeXContext):
+        for option in values.get("class_options", []):
+            context.add_class_option(option)
+        for package in values.get("packages", []):
+            context.add_package(package)
+        for other in values.get("preamble", []):
+            context.add_to_preamble(other)
+        for style_name, style in values.get("styles", {}).items():
+            with _invalid(f"style '{style_name}' of {name}"):
+                context.set_style(style_name, Style(style))
+
+    for module_values in values.get("modules", []):
+        try:
+            module_type = resolve_type(module_values["type"], MODULE_TYPES)
+        except KeyError as exc:
+            raise ConfigError(f"Configuration: a module is missing the key {exc}") from exc
+        try:
+            module = module_type(**_checked(module_type, module_values.get("options", {})))
+        except (TypeError, ValueError) as exc:
+            raise ConfigError(
+                f"Configuration: invalid options for the module '{module_values['type']}': {exc}"
+            ) from exc
+        context.add_module(
+            module_values.get("key"), module, module_values.get("category", "default")
+        )
+        if "pagination" in module_values:
+            try:
+                context.paginate(module, **_checked(context.paginate, module_values["pagination"]))
+            except (TypeError, ValueError, NotImplementedError) as exc:
+                raise ConfigError(
+                    f"Configuration: invalid pagination for the module '{module_values['type']}': {exc}"
+                ) from exc
+
+    return context
+
+
+@contextmanager
+def _invalid(description: str) -> Iterator[None]:
+    # The constructors and the setters report invalid values (e.g., an option of the wrong type) with these errors
+    try:
+        yield
+    except (TypeError, ValueError) as exc:
+        raise ConfigError(f"Configuration: invalid {description}: {exc}") from exc
+
+
+def _checked(function: Any, options: dict[str, Any]) -> dict[str, Any]:
+    # Checks the type of each option against the default value of its parameter, such that a wrong type
+    # (e.g., a string instead of a number) is reported now, instead of in the middle of a build
+    if not isinstance(options, dict):
+        raise TypeError(f"expected a table, not a {type(options).__name__}")
+    parameters = inspect.signature(function).parameters
+    for key, value in options.items():
+        default = parameters[key].default if key in parameters else None
+        expected = (int, float) if isinstance(default, float) else type(default)
+        if isinstance(default, (bool, int, float, str)) and not isinstance(value, expected):
+            raise TypeError(
+                f"'{key}' must be of type {type(default).__name__}, not {type(value).__name__}"
+            )
+    return options
@@ -2,19 +2,38 @@
 Defines default contexts that can be used in the builder.
 """
 
+from __future__ import annotations
 from abc import ABC
-from typing import Any
-from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable
+from dataclasses import dataclass, replace
 from pathlib import Path
-import dateutil.parser
 import datetime
+import importlib
 
-from .. import modules
+from .. import shallow_copy
+from .pagination import Page, PageDigests, Pagination, digest
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from .. import modules
+    from ..manifest import BuildManifest
+    from ..sinks import OutputSink
+    from .compression import Precompression
+    from .fragments import FragmentCache
+
+# The contexts are only imported when they are first accessed (PEP 562)
+_SUBMODULES = ("compression", "fragments", "html", "latex", "markdown", "pagination", "search")
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @dataclass
 class ModuleDescriptor:
-    in_json: str
+    in_json: str | tuple[str, ...]
     module: modules.Module
     category: str
 
@@ -35,6 +54,11 @@ class Context(ABC):
     The exact behavior depends on the subclass.
 
     The context is also responsible for the header/title definition, using an instance of PersonalData
+
+    Every render uses its own *view* of the context: a shallow copy holding the rendering state
+    (e.g., the stack of open HTML blocks, or the current page).
+    The view is the context given to the modules, such that the same context can be rendered by multiple threads
+    at the same time, as long as the data of its modules do not change.
     """
 
     def __init__(
@@ -50,21 +74,141 @@ class Context(ABC):
         self.name = name
         self.date_output_format = date_output_format
         self.modules: list[ModuleDescriptor] = []
+        # For each category, the modules and their bound to_{name} methods, in order
+        self._render_plan: dict[str, list[tuple[modules.Module, Callable[[Context], str]]]] = {}
+        self.pagination: Pagination = None
+        self.precompression: Precompression = None
+        self.fragment_cache: FragmentCache = None
+        self.sink: OutputSink = None
+        self.manifest: BuildManifest = None
+        self._current_page: tuple[int, list[Page]] = None
 
     def add_module(
-        self, in_json: str, module: modules.Module, category: str = "default"
+        self,
+        in_json: str | tuple[str, ...],
+        module: modules.Module,
+        category: str = "default",
     ) -> None:
         """Adds a new module.
 
         Each module is filled from data stored in the JSON file.
         The 'in_json' argument defines which key contains the data to be used for this module.
         If None, no value is read.
+        If multiple keys are given, the module loads a dictionary holding the values of the keys present in the document
+        (e.g., `StatisticsModule`).
+
+        The module must implement the function `to_{name}`, where `name` is the name of the context.
 
         Arguments:
-            in_json -- The JSON key
+            in_json -- The JSON key(s)
             module -- The module
+            category -- The category of the module, deciding where the module is rendered
         """
+        try:
+            method = getattr(module, f"to_{self.name}")
+        except AttributeError as exc:
+            raise NotImplementedError(
+                f"Each used module must implement the function to_{self.name}"
+            ) from exc
+
+        if isinstance(in_json, list):
+            in_json = tuple(in_json)
         self.modules.append(ModuleDescriptor(in_json, module, category))
+        self._render_plan.setdefault(category, []).append((module, method))
+
+    def reset(self) -> None:
+        """Forgets the data loaded by the modules, such that the context can produce the documents of another CV."""
+        for descriptor in self.modules:
+            descriptor.module.reset()
+        self._current_page = None
+
+    def fork(self, output_path: Path | str = None) -> Context:
+        """Creates a context with the same configuration, whose modules are forked (see `modules.Module.fork`).
+
+        The fork does not hold any data, and can be used at the same time as this context.
+        The rest of the configuration (precompression, styles, CSS files, and so on) is shared, and must not be modified.
+
+        Arguments:
+            output_path -- The output path of the fork. If None, the output path of this context is used
+
+        Returns:
+            The fork
+        """
+        context = shallow_copy(self)
+        if output_path is not None:
+            context.output_path = Path(output_path)
+        context.modules = []
+        context._render_plan = {}
+        forks = {}
+        for descriptor in self.modules:
+            if id(descriptor.module) not in forks:
+                forks[id(descriptor.module)] = descriptor.module.fork()
+            context.add_module(
+                descriptor.in_json, forks[id(descriptor.module)], descriptor.category
+            )
+        if self.pagination is not None:
+            context.pagination = replace(
+                self.pagination, module=forks[id(self.pagination.module)]
+            )
+        context._current_page = None
+        return context
+
+    def relocate(self, relocate: Callable[[Path], Path], relocated: dict[Any, Any]) -> None:
+        """Moves the resources written next to the output (e.g., the assets of HTML contexts) of a fork.
+
+        Called by `Builder.fork` on the forks writing in another directory.
+
+        Arguments:
+            relocate -- Gives the new location of a path
+            relocated -- The resources already relocated for the other contexts of the same builder, by original
+        """
+
+    def keep_in_memory(self) -> None:
+        """Keeps the resources produced while rendering (e.g., the assets of HTML contexts) in memory.
+
+        Called by `Builder.render` on its forks, which write nothing.
+        """
+
+    def set_precompression(
+        self, gzip_level: int = 9, brotli_level: int = 11, use_brotli: bool = True
+    ) -> None:
+        """Writes a compressed `.gz` (and `.br`, if the `brotli` package is installed) file next to each output file.
+
+        The compressed files are not written again when the contents of an output file did not change.
+
+        Arguments:
+            gzip_level -- The compression level for gzip, between 0 and 9
+            brotli_level -- The quality for brotli, between 0 and 11
+            use_brotli -- Whether to write `.br` files
+        """
+        from .compression import Precompression  # pylint: disable = import-outside-toplevel
+
+        self.precompression = Precompression(gzip_level, brotli_level, use_brotli)
+
+    def paginate(
+        self, module: modules.Module, page_size: int = None, per_subsection: bool = False
+    ) -> None:
+        """Splits the entries of a module over multiple output files.
+
+        The first page is written to the output path of the context, and the following pages next to it
+        (`name-2.html`, `name-3.html`, ... or, when splitting per subsection, `name-2023.html`, ...).
+        Every page contains the whole document, except that the paginated module only renders the entries of that page,
+        followed by links to the other pages.
+
+        When writing the output, pages whose contents did not change since the previous build are not rendered again.
+
+        Arguments:
+            module -- The module to paginate. It must have been added to this context
+            page_size -- The maximal number of entries per page, or None to not limit the number of entries
+            per_subsection -- Whether each subsection gets its own page(s)
+        """
+        if type(self)._page_navigation is Context._page_navigation:
+            raise NotImplementedError(
+                f"The {self.name} context does not support pagination"
+            )
+        if not any(descriptor.module is module for descriptor in self.modules):
+            raise ValueError("Only a module of the context can be paginated")
+        self.pagination = Pagination(module, page_size, per_subsection)
 
     def format_variable(self, name: str, value: str) -> str:
         """Constructs a string to set the variable named "name" to the given value, in the appropriate manner for the context.
@@ -105,6 +249,9 @@ class Context(ABC):
             if date_output_format is None:
                 return date_input.strftime(self.date_output_format)
             return date_input.strftime(date_output_format)
+
+        import dateutil.parser  # pylint: disable = import-outside-toplevel
+
         try:
             date = dateutil.parser.parse(date_input)
             if date_output_format is None:
@@ -115,37 +262,243 @@ class Context(ABC):
 
     def load_data_from_document(self, json_document: dict[str, Any]) -> None:
         for module in self.modules:
-            if module.in_json is not None and module.in_json in json_document:
+            if isinstance(module.in_json, tuple):
+                values = {
+                    key: json_document[key] for key in module.in_json if key in json_document
+                }
+                if len(values) > 0:
+                    module.module.load(values)
+            elif module.in_json is not None and module.in_json in json_document:
                 module.module.load(json_document[module.in_json])
 
     def write_output(self, personal: PersonalData) -> None:
-        """Writes the output of this context into a single file.
+        """Writes the output of this context into a single file (or one file per page, if paginated).
+
+        With a sink (see `cvbuilder.sinks`), the file(s) are given to the sink, and every page is written.
 
         Arguments:
             modules -- The modules to use
             personal -- The personal data to use
         """
-        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.pagination is None:
+            self._write(self.output_path, self.render(personal))
+            return
+
+        pages = self.pagination.split(self.output_path)
+        digests = PageDigests(self.output_path)
+        if self.sink is not None:
+            # The unchanged pages can only be skipped when the previous pages are still on the filesystem.
+            # The digests are forgotten, as the pages on the filesystem (if any) may be replaced by the sink.
+            # Each page is given to the sink as soon as it is rendered (see `sinks.BackgroundWriter`)
+            digests.discard()
+            for index, page in enumerate(pages):
+                self._write(page.path, self._render_page(personal, pages, index))
+            return
+
+        for index, page_digest in enumerate(self._page_digests(personal, pages)):
+            page = pages[index]
+            if digests.unchanged(page.path, page_digest) and (
+                self.precompression is None or self.precompression.up_to_date(page.path)
+            ):
+                self._keep(page.path)
+                # The page is up to date as of this build (see `cli --incremental`)
+                page.path.touch()
+                continue
+            self._write(page.path, self._render_page(personal, pages, index))
+        digests.save()
+
+    async def awrite_output(
+        self, personal: PersonalData, executor: Executor = None
+    ) -> None:
+        """Asynchronous counterpart of `write_output`.
+
+        The rendering is performed in the given executor (by default, the event loop's default executor)
+        and the file(s) are written in a separate thread, such that the event loop is never blocked.
+
+        Arguments:
+            personal -- The personal data to use
+            executor -- The executor in which the output is rendered
+        """
+        # pylint: disable = import-outside-toplevel
+        import asyncio
+        import contextvars
+
+        loop = asyncio.get_running_loop()
+        # The files given to the sink while rendering (e.g., the assets) belong to the write group of the build
+        outputs = await loop.run_in_executor(
+            executor, contextvars.copy_context().run, self.render_outputs, personal
+        )
+        for path, output in outputs:
+            await asyncio.to_thread(self._write, path, output)
+        if self.pagination is not None:
+            await asyncio.to_thread(self._save_page_digests, personal)
+
+    def _save_page_digests(self, personal: PersonalData) -> None:
+        # Every page was written: the next synchronous build can skip the pages that did not change since
+        digests = PageDigests(self.output_path)
+        if self.sink is not None:
+            digests.discard()
+            return
+        pages = self.pagination.split(self.output_path)
+        for page, page_digest in zip(pages, self._page_digests(personal, pages)):
+            digests.unchanged(page.path, page_digest)
+        digests.save()
+
+    def written_files(self) -> list[Path]:
+        """The files written by the previous build of this context, to check whether they are up to date.
+
+        For a paginated context, every page recorded by the previous build, and the file recording them.
+        """
+        if self.pagination is None:
+            return [self.output_path]
+        digests = PageDigests(self.output_path)
+        return [self.output_path.with_name(name) for name in digests.previous] + [digests.path]
+
+    def resource_files(self) -> list[Path]:
+        """The files read while rendering, besides the JSON document(s) (e.g., the CSS files of HTML contexts)."""
+        return []
+
+    @property
+    def source_keys(self) -> list[str]:
+        """The JSON keys read by the modules of this context."""
+        keys = {}
+        for descriptor in self.modules:
+            if isinstance(descriptor.in_json, tuple):
+                keys.update(dict.fromkeys(descriptor.in_json))
+            elif descriptor.in_json is not None:
+                keys[descriptor.in_json] = None
+        return list(keys)
+
+    def _keep(self, path: Path) -> None:
+        """Keeps the entry of an output file in the manifest, when the file was not written again."""
+        if self.manifest is not None:
+            self.manifest.keep(path)
+
+    def _write(self, path: Path, output: str) -> None:
+        if self.manifest is not None:
+            self.manifest.record(path, output.encode("UTF8"), self.source_keys)
+
+        if self.sink is not None:
+            self.sink.write_file(path, output.encode("UTF8"), self.precompression)
+            return
+
+        if self.precompression is not None:
+            self.precompression.write(path, output)
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        with path.open(mode="w", encoding="UTF8") as file:
+            file.write(output)
+
+    def render_outputs(self, personal: PersonalData) -> list[tuple[Path, str]]:
+        """Produces every output file of this context (one per page, if paginated), without writing them.
+
+        Arguments:
+            personal -- The personal data to use
+
+        Returns:
+            The path and the contents of each output file
+        """
+        if self.pagination is None:
+            return [(self.output_path, self.render(personal))]
+
+        pages = self.pagination.split(self.output_path)
+        return [
+            (page.path, self._render_page(personal, pages, index))
+            for index, page in enumerate(pages)
+        ]
+
+    def render(self, personal: PersonalData) -> str:
+        """Produces the output of this context, without writing it.
+
+        Arguments:
+            personal -- The personal data to use
+
+        Returns:
+            The contents of the output document
+        """
+        return self._render_view()._build_output(personal)
 
-        with self.output_path.open(mode="w", encoding="UTF8") as file:
-            file.write(self._build_output(personal))
+    def _render_view(self) -> Context:
+        """Creates the view of this context used by one render, with a fresh rendering state."""
+        view = shallow_copy(self)
+        view._current_page = None
+        return view
 
     def _run_modules(self, category: str = "default") -> str:
         output = ""
-        for module in self.modules:
-            if module.category != category:
-                continue
+        for module, method in self._render_plan.get(category, ()):
+            if self.fragment_cache is None:
+                output += method(self)
+            else:
+                output += self.fragment_cache.render(self, module, method)
+
+            if self._current_page is not None and module is self.pagination.module:
+                output += self._page_navigation(*self._current_page)
+        return output
 
-            method = None
-            try:
-                method = getattr(module.module, f"to_{self.name}")
-            except AttributeError as exc:
-                raise NotImplementedError(
-                    f"Each used module must implement the function to_{self.name}"
-                ) from exc
+    def _render_page(
+        self, personal: PersonalData, pages: list[Page], index: int
+    ) -> str:
+        # The view renders a fork of the paginated module holding the data of the page,
+        # instead of modifying the data of the module
+        module = self.pagination.module
+        page_module = module.fork()
+        page_module.data = pages[index].data
+
+        view = self._render_view()
+        view.pagination = replace(self.pagination, module=page_module)
+        view._render_plan = {
+            category: [
+                (page_module, getattr(page_module, f"to_{self.name}"))
+                if planned is module
+                else (planned, method)
+                for planned, method in plan
+            ]
+            for category, plan in self._render_plan.items()
+        }
+        view._current_page = (index, pages)
+        return view._build_output(personal)
+
+    def _page_digest(
+        self, personal: PersonalData, pages: list[Page]
+    ) -> str:
+        """Computes a digest of everything that appears on every page: configuration, other modules, and links."""
+        parts = [
+            repr(personal),
+            self._configuration_key(personal),
+            "|".join(page.label for page in pages),
+        ]
+        for descriptor in self.modules:
+            state = vars(descriptor.module)
+            if descriptor.module is self.pagination.module:
+                state = {key: value for key, value in state.items() if key != "data"}
+            parts.append(
+                f"{descriptor.in_json}:{descriptor.category}:{type(descriptor.module).__qualname__}:{state!r}"
+            )
+        return digest(*parts)
+
+    def _page_digests(self, personal: PersonalData, pages: list[Page]) -> list[str]:
+        common = self._page_digest(personal, pages)
+        return [digest(common, str(index), repr(page.data)) for index, page in enumerate(pages)]
+
+    def _configuration_key(self, _personal: PersonalData) -> str:
+        """Describes the configuration of the context that influences the output, as a string."""
+        return self.date_output_format
+
+    def fragment_state(self) -> str:
+        """Describes the state of the context that influences the output of a module, as a string.
+
+        Two contexts of the same type with the same state produce the same output for the same module
+        (see `fragments.FragmentCache`).
+        """
+        return f"{self.name}|{self.date_output_format}"
 
-            output += method(self)
-        return output
+    def _page_navigation(self, current: int, pages: list[Page]) -> str:
+        raise NotImplementedError(
+            f"The {self.name} context does not support pagination"
+        )
 
     def _build_output(self, personal: PersonalData) -> str:
         raise NotImplementedError("Context classes must implement build_output")
@@ -0,0 +1,149 @@
+"""
+Precompressed sidecar files (`.gz`, and `.br` when the `brotli` package is installed).
+
+Web servers able to serve precompressed files (e.g., `gzip_static` for nginx) then do not need to compress
+the generated documents on every request.
+
+The digest of the contents and the levels the sidecars were compressed with are stored next to the output
+(in `.<name>.precompressed.json`), such that sidecars made from other contents, or with other levels, are written again.
+"""
+
+from __future__ import annotations
+from contextlib import ExitStack
+from pathlib import Path
+import gzip
+import hashlib
+import json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class Precompression:
+    """Writes output files along with their compressed sidecars.
+
+    The output is encoded and fed chunk by chunk to the plain file and to every compressor, in a single pass.
+    Nothing is written when the plain file already has the same contents, and the sidecars exist and were
+    compressed from these contents with the same levels.
+    """
+
+    def __init__(
+        self,
+        gzip_level: int = 9,
+        brotli_level: int = 11,
+        use_brotli: bool = True,
+        chunk_size: int = 1 << 16,
+    ) -> None:
+        """Initializes the precompression.
+
+        Arguments:
+            gzip_level -- The compression level for gzip, between 0 and 9
+            brotli_level -- The quality for brotli, between 0 and 11
+            use_brotli -- Whether to write `.br` sidecars. They are never written if `brotli` is not installed
+            chunk_size -- The number of bytes given to the compressors at once
+        """
+        self.gzip_level = gzip_level
+        self.brotli_level = brotli_level
+        self.use_brotli = use_brotli and brotli is not None
+        self.chunk_size = chunk_size
+
+    def sidecars(self, path: Path) -> list[Path]:
+        """The paths of the compressed files of an output file."""
+        paths = [path.with_name(path.name + ".gz")]
+        if self.use_brotli:
+            paths.append(path.with_name(path.name + ".br"))
+        return paths
+
+    def state_path(self, path: Path) -> Path:
+        """The path of the file storing the digest and the levels the sidecars of an output file were made from."""
+        return path.with_name(f".{path.name}.precompressed.json")
+
+    def up_to_date(self, path: Path) -> bool:
+        """Whether the sidecars of an output file exist, and were compressed from its contents with the same levels."""
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return False
+        return self._unchanged(path, data, self._state(data))
+
+    def compress(self, path: Path, data: bytes) -> list[tuple[Path, bytes]]:
+        """Compresses the contents of an output file, without writing anything.
+
+        Arguments:
+            path -- The path of the output file
+            data -- The contents of the output file
+
+        Returns:
+            The path and the contents of each sidecar
+        """
+        compressed = [gzip.compress(data, self.gzip_level, mtime=0)]
+        if self.use_brotli:
+            compressed.append(brotli.compress(data, quality=self.brotli_level))
+        return list(zip(self.sidecars(path), compressed))
+
+    def write(self, path: Path, output: str) -> bool:
+        """Writes an output file and its compressed sidecars.
+
+        Arguments:
+            path -- The path of the output file
+            output -- The contents of the output file
+
+        Returns:
+            False if the files were already up to date (the plain file is then only touched), True otherwise
+        """
+        data = output.encode("UTF8")
+        state = self._state(data)
+        if self._unchanged(path, data, state):
+            path.touch()
+            return False
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        sidecars = self.sidecars(path)
+        with ExitStack() as stack:
+            plain = stack.enter_context(path.open("wb"))
+            # mtime=0 makes the gzip file reproducible
+            gzipped = stack.enter_context(
+                gzip.GzipFile(sidecars[0], "wb", self.gzip_level, mtime=0)
+            )
+            compressor = None
+            if self.use_brotli:
+                compressed = stack.enter_context(sidecars[1].open("wb"))
+                compressor = brotli.Compressor(quality=self.brotli_level)
+
+            view = memoryview(data)
+            for start in range(0, len(data), self.chunk_size):
+                chunk = view[start : start + self.chunk_size]
+                plain.write(chunk)
+                gzipped.write(chunk)
+                if compressor is not None:
+                    compressed.write(compressor.process(bytes(chunk)))
+            if compressor is not None:
+                compressed.write(compressor.finish())
+        if not self.use_brotli:
+            # A web server would serve the sidecar of a previous build
+            path.with_name(path.name + ".br").unlink(missing_ok=True)
+        with self.state_path(path).open("w", encoding="UTF8") as file:
+            json.dump(state, file)
+        return True
+
+    def _state(self, data: bytes) -> dict[str, str | int | None]:
+        return {
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "gzip_level": self.gzip_level,
+            "brotli_level": self.brotli_level if self.use_brotli else None,
+        }
+
+    def _unchanged(self, path: Path, data: bytes, state: dict[str, str | int | None]) -> bool:
+        try:
+            if path.stat().st_size != len(data):
+                return False
+            if not all(sidecar.exists() for sidecar in self.sidecars(path)):
+                return False
+            with self.state_path(path).open(encoding="UTF8") as file:
+                if json.load(file) != state:
+                    return False
+            return path.read_bytes() == data
+        except (OSError, ValueError):
+            return False
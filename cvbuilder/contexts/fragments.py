@@ -0,0 +1,131 @@
+"""
+Sharing of the fragments rendered by the modules, across the contexts of a builder.
+
+Contexts often render the same module with the same data in the same way (e.g., the contact and language modules
+in the sidebar of every HTML page). A fragment is identified by the type and the rendering state of the context
+(see `Context.fragment_state`), and by the type and the state (data included) of the module.
+The first context rendering a fragment stores it, and the other contexts reuse it.
+
+Only the modules configured identically in more than one place (in contexts of the same type) can share
+their fragments: the other modules are rendered directly, without computing any key.
+The key of a shared module, which hashes its data, is computed once per build.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+import threading
+
+from .pagination import digest
+
+if TYPE_CHECKING:
+    from . import Context
+    from .. import modules
+
+
+@dataclass
+class FragmentStatistics:
+    """Counters of a fragment cache."""
+
+    rendered: int = 0
+    reused: int = 0
+    reused_characters: int = 0
+
+
+class FragmentCache:
+    """The fragments rendered during a build, shared by the contexts.
+
+    The fragments are only valid for one build: `clear` must be called before loading new data.
+    The statistics are kept across builds.
+
+    A fragment is not stored when rendering the module modified the rendering state of the context
+    (e.g., an HTML section left open), as reusing the fragment would not reproduce this modification.
+    """
+
+    def __init__(self) -> None:
+        self.statistics = FragmentStatistics()
+        self._fragments: dict[str, str] = {}
+        self._contexts: list[Context] = []
+        # The key of each module that may share its fragments (by identifier), computed by the first render of a build
+        self._keys: dict[int, str] = None
+        self._lock = threading.Lock()
+
+    def register(self, context: Context) -> None:
+        """Registers a context using this cache (see `Builder.register_context`)."""
+        with self._lock:
+            self._contexts.append(context)
+            self._keys = None
+
+    def clear(self) -> None:
+        """Forgets the stored fragments, and the keys of the modules."""
+        with self._lock:
+            self._fragments.clear()
+            self._keys = None
+
+    def render(
+        self,
+        context: Context,
+        module: modules.Module,
+        method: Callable[[Context], str],
+    ) -> str:
+        """Renders a module in a context, unless the same fragment was already rendered.
+
+        Arguments:
+            context -- The context
+            module -- The module
+            method -- The bound method of the module rendering it in the context
+
+        Returns:
+            The fragment
+        """
+        with self._lock:
+            if self._keys is None:
+                self._keys = self._module_keys()
+            module_key = self._keys.get(id(module))
+        if module_key is None:
+            return method(context)
+
+        state = context.fragment_state()
+        key = digest(state, module_key)
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self.statistics.reused += 1
+                self.statistics.reused_characters += len(fragment)
+                return fragment
+
+        fragment = method(context)
+        with self._lock:
+            self.statistics.rendered += 1
+            if context.fragment_state() == state:
+                self._fragments[key] = fragment
+        return fragment
+
+    def _module_keys(self) -> dict[int, str]:
+        # Groups the occurrences of the modules by type of context, type of module, and configuration
+        groups: dict[tuple[str, str, str], list[modules.Module]] = {}
+        for context in self._contexts:
+            for descriptor in context.modules:
+                module = descriptor.module
+                configuration = {key: value for key, value in vars(module).items() if key != "data"}
+                group = (type(context).__qualname__, type(module).__qualname__, repr(configuration))
+                groups.setdefault(group, []).append(module)
+
+        keys = {}
+        for (context_type, module_type, _), occurrences in groups.items():
+            if len(occurrences) > 1:
+                for module in occurrences:
+                    if id(module) not in keys:
+                        keys[id(module)] = digest(context_type, module_type, repr(vars(module)))
+        return keys
+
+    def __getstate__(self) -> dict:
+        # Copies (e.g., `copy.deepcopy` of a builder) start with an empty cache and their own lock
+        return {"statistics": FragmentStatistics(), "contexts": self._contexts}
+
+    def __setstate__(self, state: dict) -> None:
+        self.statistics = state["statistics"]
+        self._fragments = {}
+        self._contexts = state["contexts"]
+        self._keys = None
+        self._lock = threading.Lock()
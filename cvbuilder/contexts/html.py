@@ -1,25 +1,49 @@
 from __future__ import annotations
-from typing import Callable
+from typing import TYPE_CHECKING, Any, Callable
 from pathlib import Path
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import weakref
 
-from . import Context, PersonalData
-from .. import modules
+from . import Context, PersonalData, pagination, search
+from .. import modules, shallow_copy
+
+if TYPE_CHECKING:
+    from ..manifest import BuildManifest
+    from ..sinks import OutputSink
 
 
 class HTMLStack:
     """A stack for an HTML context.
 
     It provides utilities to open and close headers, div blocks, paragraphs, and so on.
+
+    In compact mode, the produced HTML has no indentation nor line breaks between tags.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, compact: bool = False) -> None:
         self.stack: list[tuple[str, int]] = []
+        self.compact = compact
+
+    def _indentation(self, indent: int) -> str:
+        if self.compact:
+            return ""
+        return "\t" * indent
+
+    def _line(self, indent: int, content: str) -> str:
+        if self.compact:
+            return content
+        return "\t" * indent + content + "\n"
 
     def close_block(self) -> str:
         if len(self.stack) > 0:
             tag, indent = self.stack.pop()
             if tag is not None:
-                return "\t" * indent + f"</{tag}>\n"
+                return self._line(indent, f"</{tag}>")
         return ""
 
     def _get_indent(self) -> int:
@@ -37,7 +61,7 @@ class HTMLStack:
         tag = "section"
         self.stack.append((tag, indent))
 
-        section = "\t" * indent + f'<{tag} class="section {class_name}">\n'
+        section = self._line(indent, f'<{tag} class="section {class_name}">')
         section += self.header(level, name, class_name, icon)
         return section
 
@@ -53,15 +77,15 @@ class HTMLStack:
         if name == "" and icon == "":
             return ""
 
-        return (
-            "\t" * self._get_indent()
-            + f'<h{level} class="{class_name}">{icon}{name}</h{level}>\n'
+        return self._line(
+            self._get_indent(),
+            f'<h{level} class="{class_name}">{icon}{name}</h{level}>',
         )
 
     def open_div(self, class_name: str) -> str:
         indent = self._get_indent()
         self.stack.append(("div", indent))
-        return "\t" * indent + f'<div class="{class_name}">\n'
+        return self._line(indent, f'<div class="{class_name}">')
 
     def simple_div_block(
         self, class_name: str, content: str | modules.description.Description
@@ -73,7 +97,7 @@ class HTMLStack:
                 return ""
             content = content.to_html()
         div = self.open_div(class_name)
-        div += "\t" * self._get_indent() + content + "\n"
+        div += self._line(self._get_indent(), content)
         div += self.close_block()
         return div
 
@@ -87,9 +111,9 @@ class HTMLStack:
                 return ""
             content = content.to_html()
         indent = self._get_indent()
-        p = "\t" * indent + f'<p class="{class_name}">\n'
-        p += "\t" * (indent + 1) + content + "\n"
-        p += "\t" * indent + "</p>\n"
+        p = self._line(indent, f'<p class="{class_name}">')
+        p += self._line(indent + 1, content)
+        p += self._line(indent, "</p>")
         return p
 
     def span_block(
@@ -114,7 +138,7 @@ class HTMLStack:
         tag = "ol" if numbered else "ul"
         indent = self._get_indent()
         self.stack.append((tag, indent))
-        return "\t" * indent + f'<{tag} class="{class_name}">\n'
+        return self._line(indent, f'<{tag} class="{class_name}">')
 
     def list_item(
         self, class_name: str, content: str | modules.description.Description
@@ -125,85 +149,558 @@ class HTMLStack:
             if content.is_empty():
                 return ""
             content = content.to_html()
-        return "\t" * self._get_indent() + f'<li class="{class_name}">{content}</li>\n'
+        return self._line(self._get_indent(), f'<li class="{class_name}">{content}</li>')
+
+    def table_block(self, class_name: str, rows: list[list[str]]) -> str:
+        indent = self._get_indent()
+        table = self._line(indent, f'<table class="{class_name}">')
+        for row in rows:
+            table += self._line(
+                indent + 1, "<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>"
+            )
+        table += self._line(indent, "</table>")
+        return table
 
     def img_block(self, class_name: str, img: str, alt: str) -> str:
-        return (
-            "\t" * self._get_indent()
-            + f'<img class="{class_name}" src="{img}" alt="{alt}"/>\n'
+        return self._line(
+            self._get_indent(), f'<img class="{class_name}" src="{img}" alt="{alt}"/>'
         )
 
     def idiomatic_block(self, class_name: str, content: str) -> str:
-        return "\t" * self._get_indent() + f'<i class="{class_name}">{content}</i>'
+        return (
+            self._indentation(self._get_indent())
+            + f'<i class="{class_name}">{content}</i>'
+        )
+
+
+class AssetPipeline:
+    """Bundles, minifies, and fingerprints the assets (CSS files and images) used by HTML contexts.
+
+    The CSS files registered in a context are concatenated and minified into a single bundle, and the local images
+    (e.g., the photo or the logos) are copied.
+    Every asset is written in `output_dir/assets_dir` under a name containing a hash of its contents
+    (e.g., `style.3f2a9c01d2e4.css`), such that it can be cached forever by browsers and proxies.
+    An asset is only written when a file with the same contents does not exist yet,
+    and the hash of a source file is only computed again when its size or modification time changed.
+    When the context has an output sink (see `cvbuilder.sinks`), the assets are given to the sink instead,
+    once per sink.
+    With a manifest (see `cvbuilder.manifest`), the assets used by every build are recorded in the manifest.
+    A pipeline in memory (see `in_memory`) only computes the URLs of the assets, and writes nothing.
+
+    The same pipeline can (and should) be shared by all the contexts writing in the same directory.
+    The paths of the CSS files and images are read from the current working directory, or from `source_root`.
+    """
+
+    def __init__(
+        self,
+        output_dir: Path | str,
+        assets_dir: str = "assets",
+        source_root: Path | str = ".",
+        minify: bool = True,
+    ) -> None:
+        self.output_dir = Path(output_dir)
+        self.assets_path = self.output_dir / assets_dir
+        self.source_root = Path(source_root)
+        self.minify = minify
+        self._lock = threading.Lock()
+        self._state_path = self.assets_path / ".assets.json"
+        try:
+            with self._state_path.open(encoding="UTF8") as file:
+                self._state: dict[str, list] = json.load(file)
+        except (OSError, ValueError):
+            self._state = {}
+        self._bundles: dict[tuple, Path] = {}
+        # The source (a path, or the contents), the hash and the size of every asset,
+        # and the images referenced by each bundle
+        self._sources: dict[Path, Path | bytes] = {}
+        self._digests: dict[Path, tuple[str, int]] = {}
+        self._dependencies: dict[Path, list[Path]] = {}
+        self._delivered: weakref.WeakKeyDictionary[OutputSink, set[Path]] = weakref.WeakKeyDictionary()
+        self._in_memory = False
+
+    def fork(self, output_dir: Path | str) -> AssetPipeline:
+        """Creates a pipeline with the same configuration, writing in another directory.
+
+        The hashes of the source files are shared with this pipeline.
+
+        Arguments:
+            output_dir -- The directory of the outputs of the fork
+        """
+        pipeline = shallow_copy(self)
+        pipeline.output_dir = Path(output_dir)
+        pipeline.assets_path = pipeline.output_dir / self.assets_path.relative_to(self.output_dir)
+        pipeline._state_path = pipeline.assets_path / self._state_path.name
+        pipeline._bundles = {}
+        pipeline._sources = {}
+        pipeline._digests = {}
+        pipeline._dependencies = {}
+        pipeline._delivered = weakref.WeakKeyDictionary()
+        return pipeline
+
+    def in_memory(self) -> AssetPipeline:
+        """Creates a pipeline keeping the assets in memory: they are not written, given to a sink, nor recorded.
+
+        The assets and the hashes are shared with this pipeline, such that the bundles are not produced again.
+        """
+        pipeline = shallow_copy(self)
+        pipeline._in_memory = True
+        return pipeline
+
+    def css_bundle(
+        self,
+        css_files: list[Path],
+        relative_to: Path,
+        sink: OutputSink = None,
+        manifest: BuildManifest = None,
+    ) -> str:
+        """Produces the bundle of the given CSS files.
+
+        Arguments:
+            css_files -- The CSS files, in order
+            relative_to -- The directory of the document that will link to the bundle
+            sink -- If not None, the bundle (and the images it references) are given to this sink
+            manifest -- If not None, the bundle (and the images it references) are recorded in this manifest
+
+        Returns:
+            The URL of the bundle, relative to `relative_to`
+        """
+        key = tuple(
+            (str(css), self._fingerprint(self.source_root / css)) for css in css_files
+        )
+        with self._lock:
+            bundle = self._bundles.get(key)
+        if bundle is None:
+            contents = []
+            images = []
+            for css in css_files:
+                source = self.source_root / css
+                text = source.read_text(encoding="UTF8")
+                contents.append(self._rewrite_urls(text, source.parent, images))
+            contents = "\n".join(contents)
+            if self.minify:
+                contents = minify_css(contents)
+            bundle = self._asset("bundle.css", contents.encode("UTF8"))
+            with self._lock:
+                self._dependencies[bundle] = images
+                self._bundles[key] = bundle
+        self._deliver(bundle, sink, manifest)
+        return _relative_url(bundle, relative_to)
+
+    def resource(
+        self,
+        source: str,
+        relative_to: Path,
+        sink: OutputSink = None,
+        manifest: BuildManifest = None,
+    ) -> str:
+        """Produces a fingerprinted copy of a local resource (an image, for instance).
+
+        URLs and paths to files that do not exist are returned as-is.
+
+        Arguments:
+            source -- The path to the resource
+            relative_to -- The directory of the document that will use the resource
+            sink -- If not None, the copy is given to this sink
+            manifest -- If not None, the copy is recorded in this manifest
+
+        Returns:
+            The URL of the copy, relative to `relative_to`
+        """
+        if _is_url(source):
+            return source
+        path = self.source_root / source
+        if not path.is_file():
+            return source
+        target = self._copy(path)
+        self._deliver(target, sink, manifest)
+        return _relative_url(target, relative_to)
+
+    def sources(self, css_files: list[Path]) -> list[Path]:
+        """The given CSS files and every source file known to the pipeline (e.g., the images of previous builds).
+
+        Arguments:
+            css_files -- The CSS files of the page
+        """
+        sources = {str((self.source_root / css).resolve()) for css in css_files}
+        with self._lock:
+            sources.update(self._state)
+        return [Path(source) for source in sorted(sources)]
+
+    def sources_digest(self, css_files: list[Path]) -> str:
+        """A hash of the contents of the given CSS files and of every image known to the pipeline.
+
+        It changes when an asset linked by a page changes, even if the data of the page did not change.
+
+        Arguments:
+            css_files -- The CSS files of the page
+        """
+        fingerprints = [
+            self._fingerprint(path) if path.is_file() else "" for path in self.sources(css_files)
+        ]
+        return hashlib.sha256("|".join(fingerprints).encode("UTF8")).hexdigest()
+
+    def save(self) -> None:
+        """Stores the hashes of the source files, to avoid reading them again in the next build.
+
+        The hashes are stored in `assets_dir/.assets.json`. They are not stored by the contexts writing in a sink.
+        """
+        with self._lock:
+            self.assets_path.mkdir(parents=True, exist_ok=True)
+            with self._state_path.open(mode="w", encoding="UTF8") as file:
+                json.dump(self._state, file)
+
+    def _fingerprint(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            known = self._state.get(key)
+        unchanged = known is not None and known[:2] == [stat.st_size, stat.st_mtime_ns]
+        # The hashes of older states were truncated
+        if unchanged and len(known[2]) == 64:
+            return known[2]
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        with self._lock:
+            self._state[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+    def _fingerprinted_path(self, name: str, digest: str) -> Path:
+        stem, dot, suffix = name.partition(".")
+        return self.assets_path / f"{stem}.{digest}{dot}{suffix}"
+
+    def _copy(self, source: Path) -> Path:
+        digest = self._fingerprint(source)
+        target = self._fingerprinted_path(source.name, digest[:12])
+        with self._lock:
+            self._sources[target] = source
+            self._digests[target] = (digest, source.stat().st_size)
+        return target
+
+    def _asset(self, name: str, contents: bytes) -> Path:
+        digest = hashlib.sha256(contents).hexdigest()
+        target = self._fingerprinted_path(name, digest[:12])
+        with self._lock:
+            self._sources[target] = contents
+            self._digests[target] = (digest, len(contents))
+        return target
+
+    def _deliver(self, target: Path, sink: OutputSink, manifest: BuildManifest) -> None:
+        """Writes an asset (and its dependencies), unless it was already written, and records it."""
+        if self._in_memory:
+            return
+        with self._lock:
+            source = self._sources[target]
+            sha256, size = self._digests[target]
+            dependencies = self._dependencies.get(target, [])
+            delivered = None if sink is None else self._delivered.setdefault(sink, set())
+            written = delivered is not None and target in delivered
+            if delivered is not None:
+                delivered.add(target)
+        if manifest is not None:
+            # The identifier of the build of an asset never changes, as its name follows from its contents
+            manifest.record_digest(target, sha256, size, [])
+        if sink is not None:
+            if not written:
+                sink.write(target, source if isinstance(source, bytes) else source.read_bytes())
+        elif not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if isinstance(source, bytes):
+                target.write_bytes(source)
+            else:
+                shutil.copyfile(source, target)
+        for dependency in dependencies:
+            self._deliver(dependency, sink, manifest)
+
+    def _rewrite_urls(self, css: str, directory: Path, images: list[Path]) -> str:
+        def rewrite(match: re.Match) -> str:
+            url = match.group(2)
+            path = directory / url
+            if _is_url(url) or not path.is_file():
+                return match.group(0)
+            target = self._copy(path)
+            images.append(target)
+            return f"url({_relative_url(target, self.assets_path)})"
+
+        return re.sub(r"url\(\s*(['\"]?)([^'\")]+)\1\s*\)", rewrite, css)
+
+
+def minify_css(css: str) -> str:
+    """Removes the comments and the insignificant whitespace of a CSS document."""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = css.replace(";}", "}")
+    return css.strip()
+
+
+def _is_url(path: str) -> bool:
+    return re.match(r"^([a-z][a-z0-9+.-]*:|//|#)", path, re.IGNORECASE) is not None
+
+
+def _relative_url(target: Path, relative_to: Path) -> str:
+    return Path(os.path.relpath(target, relative_to)).as_posix()
 
 
 class HTMLContext(Context, HTMLStack):
-    def __init__(self, output_path: Path | str) -> None:
+    def __init__(self, output_path: Path | str, compact: bool = False) -> None:
+        """Initializes an HTML context.
+
+        Arguments:
+            output_path -- The path of the output file
+            compact -- Whether to produce HTML without indentation nor line breaks between tags
+        """
         Context.__init__(self, "html", output_path)
-        HTMLStack.__init__(self)
+        HTMLStack.__init__(self, compact)
         self.css_files = []
         self.title_fct = None
+        self.asset_pipeline: AssetPipeline = None
+        self.search_index: search.SearchIndex = None
+        self._search_index_loaded = False
+
+    def reset(self) -> None:
+        super().reset()
+        self.stack.clear()
+
+    def fork(self, output_path: Path | str = None) -> HTMLContext:
+        context = super().fork(output_path)
+        context.stack = []
+        if self.search_index is not None:
+            context.search_index = self.search_index.fork()
+            context._search_index_loaded = False
+        return context
+
+    def _render_view(self) -> HTMLContext:
+        view = super()._render_view()
+        view.stack = []
+        return view
 
     def add_css_file(self, css_path: Path | str) -> None:
         if isinstance(css_path, str):
             css_path = Path(css_path)
         self.css_files.append(css_path)
 
+    def relocate(self, relocate: Callable[[Path], Path], relocated: dict[Any, Any]) -> None:
+        super().relocate(relocate, relocated)
+        if self.asset_pipeline is not None:
+            pipeline = self.asset_pipeline
+            if pipeline not in relocated:
+                relocated[pipeline] = pipeline.fork(relocate(pipeline.output_dir))
+            self.asset_pipeline = relocated[pipeline]
+
+    def keep_in_memory(self) -> None:
+        super().keep_in_memory()
+        if self.asset_pipeline is not None:
+            self.asset_pipeline = self.asset_pipeline.in_memory()
+
+    def resource_files(self) -> list[Path]:
+        if self.asset_pipeline is None:
+            # The CSS files are linked, and not read
+            return super().resource_files()
+        return super().resource_files() + [
+            path for path in self.asset_pipeline.sources(self.css_files) if path.is_file()
+        ]
+
+    def set_asset_pipeline(self, pipeline: AssetPipeline) -> None:
+        """Uses an asset pipeline for the CSS files and the local images.
+
+        The CSS files are then paths to the source files (instead of URLs), bundled into a single stylesheet.
+
+        Arguments:
+            pipeline -- The pipeline, typically shared by all the HTML contexts writing in the same directory
+        """
+        self.asset_pipeline = pipeline
+
+    def set_search_index(self, index: search.SearchIndex) -> None:
+        """Writes a search index of the entries of the modules (typically, publications and talks) next to the output.
+
+        Unless disabled in the index, a search field querying the index is added at the top of the main content.
+
+        Arguments:
+            index -- The search index
+        """
+        self.search_index = index
+
     def format_variable(self, name: str, value: str) -> str:
         raise NotImplementedError(
             "Contexts should implement format_variable(self, name: str, value: str)"
         )
 
+    def write_output(self, personal: PersonalData) -> None:
+        super().write_output(personal)
+        # With a sink, nothing but the outputs is written (the hashes stay in memory)
+        if self.asset_pipeline is not None and self.sink is None:
+            self.asset_pipeline.save()
+        if self.search_index is not None:
+            self._write_search_index()
+
+    def render_outputs(self, personal: PersonalData) -> list[tuple[Path, str]]:
+        outputs = super().render_outputs(personal)
+        if self.search_index is not None:
+            self.search_index.update(self._search_entries())
+            outputs.append(
+                (
+                    self.search_index.index_path(self.output_path),
+                    self.search_index.to_json(),
+                )
+            )
+        return outputs
+
+    def _keep(self, path: Path) -> None:
+        super()._keep(path)
+        # The assets linked by the page are not requested from the pipeline again
+        if self.manifest is not None and self.asset_pipeline is not None:
+            self.manifest.keep_directory(self.asset_pipeline.assets_path)
+
+    def _write_search_index(self) -> None:
+        path = self.search_index.index_path(self.output_path)
+        if not self._search_index_loaded:
+            self.search_index.load(path)
+            self._search_index_loaded = True
+        # With a sink, the index of the previous build is not in the output (e.g., in another archive)
+        changed = self.search_index.update(self._search_entries())
+        if changed or self.sink is not None or not path.exists():
+            self._write(path, self.search_index.to_json())
+        elif self.manifest is not None:
+            self.manifest.keep(path)
+
+    def _search_entries(self) -> list[tuple[str, dict]]:
+        entries = []
+        for descriptor in self.modules:
+            module = descriptor.module
+            if self.pagination is not None and module is self.pagination.module:
+                pages = [
+                    (page.path.name, page.data)
+                    for page in self.pagination.split(self.output_path)
+                ]
+            else:
+                pages = [(self.output_path.name, module.data)]
+
+            for url, data in pages:
+                for _, data_list in data:
+                    for entry in data_list:
+                        fields = getattr(entry, "search_fields", lambda: None)()
+                        if fields is not None:
+                            entries.append((url, fields))
+        return entries
+
+    def _search_widget(self) -> str:
+        index = _relative_url(
+            self.search_index.index_path(self.output_path), self.output_path.parent
+        )
+        script = search.WIDGET_SCRIPT.replace(
+            "MIN_LENGTH", str(self.search_index.min_token_length)
+        )
+        widget = self.open_div("search")
+        widget += self._line(
+            self._get_indent(),
+            f'<input type="search" class="search-input" placeholder="Search" data-index="{index}">',
+        )
+        widget += self._line(self._get_indent(), '<ul class="search-results"></ul>')
+        widget += self.close_block()
+        widget += self._line(self._get_indent(), f"<script>{script}</script>")
+        return widget
+
+    def img_block(self, class_name: str, img: str, alt: str) -> str:
+        if self.asset_pipeline is not None:
+            img = self.asset_pipeline.resource(
+                img, self.output_path.parent, self.sink, self.manifest
+            )
+        return super().img_block(class_name, img, alt)
+
     def set_title_fct(self, title_fct: Callable[[PersonalData], str]) -> None:
         self.title_fct = title_fct
 
+    def _configuration_key(self, personal: PersonalData) -> str:
+        title = None if personal is None else self._title(personal)
+        widget = self.search_index is not None and self.search_index.widget
+        assets = None
+        if self.asset_pipeline is not None:
+            assets = self.asset_pipeline.sources_digest(self.css_files)
+        return (
+            f"{super()._configuration_key(personal)}|{self.compact}|{self.css_files!r}|{title}|{widget}|{assets}"
+        )
+
+    def fragment_state(self) -> str:
+        # Images are linked relatively to the output file
+        assets = None if self.asset_pipeline is None else self.asset_pipeline.output_dir
+        return f"{super().fragment_state()}|{self.compact}|{self.stack!r}|{self.output_path.parent}|{assets}"
+
+    def _page_navigation(self, current: int, pages: list[pagination.Page]) -> str:
+        indent = self._get_indent()
+        nav = self._line(indent, '<nav class="pagination">')
+        for index, page in enumerate(pages):
+            if index == current:
+                link = self.span_block("page current", page.label)
+            else:
+                link = self.link_block("page", page.path.name, page.label, "")
+            nav += self._line(indent + 1, link)
+        nav += self._line(indent, "</nav>")
+        return nav
+
     def _build_output(self, personal: PersonalData) -> str:
-        html = '<!DOCTYPE html>\n<html lang="en">\n'
+        html = self._line(0, "<!DOCTYPE html>")
+        html += self._line(0, '<html lang="en">')
         html += self._head(personal)
-        html += "\n"
+        html += self._line(0, "")
         html += self._body(personal)
         html += "</html>"
         return html
 
     def _head(self, personal: PersonalData) -> str:
         if personal is None:
-            return '\t<head>\n\t\t<meta charset="UTF-8">\n\t</head>\n'
-
-        title = ""
-        if self.title_fct is None:
-            title = f"{personal.name} - {personal.position}"
+            return (
+                self._line(1, "<head>")
+                + self._line(2, '<meta charset="UTF-8">')
+                + self._line(1, "</head>")
+            )
+
+        title = self._title(personal)
+
+        head = self._line(1, "<head>")
+        head += self._line(2, '<meta charset="UTF-8">')
+        head += self._line(
+            2, '<meta name="viewport" content="width=device-width, initial-scale=1.0">'
+        )
+        head += self._line(2, '<meta http-equiv="X-UA-Compatible" content="ie=edge">')
+        head += self._line(2, f"<title>{title}</title>")
+        head += self._line(2, '<link rel="icon" href="./favicon.ico" type="image/x-icon">')
+        head += self._line(
+            2,
+            '<link rel="stylesheet" href="https://cdn.jsdelivr.net/gh/iconoir-icons/iconoir@main/css/iconoir.css">',
+        )
+        if self.asset_pipeline is not None and len(self.css_files) > 0:
+            bundle = self.asset_pipeline.css_bundle(
+                self.css_files, self.output_path.parent, self.sink, self.manifest
+            )
+            head += self._line(2, f'<link rel="stylesheet" href="{bundle}">')
         else:
-            title = self.title_fct(personal)
-
-        head = f"""\t<head>
-\t\t<meta charset="UTF-8">
-\t\t<meta name="viewport" content="width=device-width, initial-scale=1.0">
-\t\t<meta http-equiv="X-UA-Compatible" content="ie=edge">
-\t\t<title>{title}</title>
-\t\t<link rel="icon" href="./favicon.ico" type="image/x-icon">
-\t\t<link rel="stylesheet" href="https://cdn.jsdelivr.net/gh/iconoir-icons/iconoir@main/css/iconoir.css">
-"""
-        for css in self.css_files:
-            head += f'\t\t<link rel="stylesheet" href="{css}">\n'
-        head += "\t</head>\n"
+            for css in self.css_files:
+                head += self._line(2, f'<link rel="stylesheet" href="{css}">')
+        head += self._line(1, "</head>")
         return head
 
+    def _title(self, personal: PersonalData) -> str:
+        if self.title_fct is None:
+            return f"{personal.name} - {personal.position}"
+        return self.title_fct(personal)
+
     def _body(self, personal: PersonalData) -> str:
-        body = "\t<body>\n"
+        body = self._line(1, "<body>")
         body += self._header(personal)
         body += self._main(personal)
         body += self._footer(personal)
-        body += "\t</body>\n"
+        body += self._line(1, "</body>")
         return body
 
     def _header(self, _personal: PersonalData) -> str:
         return ""
 
     def _main(self, personal: PersonalData) -> str:
-        main = "\t\t<main>\n"
+        main = self._line(2, "<main>")
         main += self._sidebar(personal)
+        if self.search_index is not None and self.search_index.widget:
+            main += self._search_widget()
         main += self._run_modules()
-        main += "\t\t</main>\n"
+        main += self._line(2, "</main>")
         return main
 
     def _sidebar(self, personal: PersonalData) -> str:
@@ -224,7 +721,7 @@ class HTMLContext(Context, HTMLStack):
 
         sidebar += self._run_modules("sidebar")
 
-        sidebar += self.close_block() + "\n"  # sidebar
+        sidebar += self.close_block() + self._line(0, "")  # sidebar
         return sidebar
 
     def _footer(self, _personal: PersonalData) -> str:
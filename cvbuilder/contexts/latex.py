@@ -19,6 +19,14 @@ class Style:
         for key, value in key_values.items():
             setattr(self, key, value)
 
+    def __repr__(self) -> str:
+        return f"Style({vars(self)!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Style):
+            return NotImplemented
+        return vars(self) == vars(other)
+
 
 class LaTeXContext(Context):
     """The LaTeX context.
@@ -68,6 +76,9 @@ class LaTeXContext(Context):
         """
         self.styles[name] = style
 
+    def fragment_state(self) -> str:
+        return f"{super().fragment_state()}|{self.styles!r}"
+
     def format_style(self, style: Style, **kwargs) -> str:
         """Converts a style instance to a succession of key-value pairs for a LaTeX output.
 
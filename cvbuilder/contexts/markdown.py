@@ -1,7 +1,7 @@
 from __future__ import annotations
 from pathlib import Path
 
-from . import Context, PersonalData, html
+from . import Context, PersonalData, html, pagination
 from .. import modules
 
 
@@ -11,6 +11,20 @@ class MarkdownContext(Context, html.HTMLStack):
         html.HTMLStack.__init__(self)
         self.title = title
 
+    def reset(self) -> None:
+        super().reset()
+        self.stack.clear()
+
+    def fork(self, output_path: Path | str = None) -> MarkdownContext:
+        context = super().fork(output_path)
+        context.stack = []
+        return context
+
+    def _render_view(self) -> MarkdownContext:
+        view = super()._render_view()
+        view.stack = []
+        return view
+
     def _get_indent(self) -> int:
         if len(self.stack) > 0:
             return self.stack[-1][1] + 1
@@ -36,6 +50,19 @@ class MarkdownContext(Context, html.HTMLStack):
     def link(self, url: str, text: str) -> str:
         return f"[{text}]({url})"
 
+    def _configuration_key(self, personal: PersonalData) -> str:
+        return f"{super()._configuration_key(personal)}|{self.title}"
+
+    def fragment_state(self) -> str:
+        return f"{super().fragment_state()}|{self.stack!r}"
+
+    def _page_navigation(self, current: int, pages: list[pagination.Page]) -> str:
+        links = [
+            f"**{page.label}**" if index == current else self.link(page.path.name, page.label)
+            for index, page in enumerate(pages)
+        ]
+        return "\n" + " | ".join(links) + "\n"
+
     def _build_output(self, personal: PersonalData) -> str:
         markdown = f"title: {self.title}\n\n{self._run_modules()}"
         return markdown
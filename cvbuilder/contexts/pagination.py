@@ -0,0 +1,159 @@
+"""
+Pagination of a module's entries over multiple output files.
+
+Modules with thousands of entries (typically, publications and talks) produce very large pages.
+A paginated context splits the entries of one module into multiple output files (*pages*),
+either by number of entries or by subsection (e.g., by year), and links the pages together.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+import hashlib
+import json
+import re
+
+if TYPE_CHECKING:
+    from .. import modules
+
+
+@dataclass
+class Page:
+    """A single page of a paginated module."""
+
+    label: str
+    path: Path
+    data: list[tuple[None | str, list[modules.Data]]]
+
+
+@dataclass
+class Pagination:
+    """Splits the entries of a module into pages.
+
+    If `per_subsection` is True, each subsection of the module gets its own page(s).
+    If `page_size` is not None, a page contains at most `page_size` entries.
+    The first page is written to the output path of the context, and the other pages next to it.
+    """
+
+    module: modules.Module
+    page_size: int = None
+    per_subsection: bool = False
+
+    def __post_init__(self) -> None:
+        if self.page_size is not None and self.page_size <= 0:
+            raise ValueError("Pagination: the page size must be positive")
+        if self.page_size is None and not self.per_subsection:
+            raise ValueError(
+                "Pagination: a page size is required when pages are not split per subsection"
+            )
+
+    def split(self, output_path: Path) -> list[Page]:
+        """Splits the current data of the module into pages.
+
+        Arguments:
+            output_path -- The output path of the context, used for the first page
+
+        Returns:
+            The pages, in order. There is always at least one page.
+        """
+        if self.per_subsection:
+            groups = [
+                (section, [(section, data_list)])
+                for section, data_list in self.module.data
+            ]
+        else:
+            groups = [(None, self.module.data)]
+
+        chunks: list[tuple[None | str, list[tuple[None | str, list]]]] = []
+        for section, data in groups:
+            if self.page_size is None:
+                chunks.append((section, data))
+                continue
+            entries = [(sub, entry) for sub, data_list in data for entry in data_list]
+            for start in range(0, max(len(entries), 1), self.page_size):
+                chunks.append(
+                    (section, _regroup(entries[start : start + self.page_size]))
+                )
+
+        if len(chunks) == 0:
+            chunks.append((None, []))
+
+        pages = []
+        counts: dict[None | str, int] = {}
+        for section, data in chunks:
+            counts[section] = counts.get(section, 0) + 1
+            if section is None:
+                label = str(len(pages) + 1)
+            elif counts[section] == 1:
+                label = section
+            else:
+                label = f"{section} ({counts[section]})"
+
+            if len(pages) == 0:
+                path = output_path
+            elif section is None:
+                path = output_path.with_name(
+                    f"{output_path.stem}-{len(pages) + 1}{output_path.suffix}"
+                )
+            else:
+                path = output_path.with_name(
+                    f"{output_path.stem}-{_slug(label)}{output_path.suffix}"
+                )
+            pages.append(Page(label, path, data))
+        return pages
+
+
+def _regroup(
+    entries: list[tuple[None | str, modules.Data]]
+) -> list[tuple[None | str, list[modules.Data]]]:
+    data: list[tuple[None | str, list[modules.Data]]] = []
+    for section, entry in entries:
+        if len(data) == 0 or data[-1][0] != section:
+            data.append((section, []))
+        data[-1][1].append(entry)
+    return data
+
+
+def _slug(label: str) -> str:
+    return re.sub("[^a-z0-9]+", "-", label.lower()).strip("-")
+
+
+def digest(*parts: str) -> str:
+    """Computes a digest identifying the contents of a page."""
+    sha = hashlib.sha256()
+    for part in parts:
+        sha.update(part.encode("UTF8"))
+        sha.update(b"\0")
+    return sha.hexdigest()
+
+
+class PageDigests:
+    """The digests of the pages written by the previous build, stored next to the output.
+
+    A page whose digest did not change since the previous build does not need to be rendered again.
+    """
+
+    def __init__(self, output_path: Path) -> None:
+        self.path = output_path.with_name(f".{output_path.name}.pages.json")
+        try:
+            with self.path.open(encoding="UTF8") as file:
+                self.previous: dict[str, str] = json.load(file)
+        except (OSError, ValueError):
+            self.previous = {}
+        self.current: dict[str, str] = {}
+
+    def unchanged(self, path: Path, page_digest: str) -> bool:
+        self.current[path.name] = page_digest
+        return self.previous.get(path.name) == page_digest and path.exists()
+
+    def discard(self) -> None:
+        """Forgets the digests, when the pages are written elsewhere (e.g., in a sink) or without them."""
+        self.current = {}
+        self.path.unlink(missing_ok=True)
+
+    def save(self) -> None:
+        # Written even if unchanged, as its modification time is the time of the build
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open(mode="w", encoding="UTF8") as file:
+            json.dump(self.current, file)
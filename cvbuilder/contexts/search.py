@@ -0,0 +1,268 @@
+"""
+Prebuilt inverted index, used to search publications and talks on the client side.
+
+The index is a JSON document
+```
+{
+    "version": 2,
+    "fields": ["title", "authors", "venue", "year"],
+    "settings": {"min_token_length": 2, "max_tokens_per_entry": 64, "max_terms": 50000},
+    "pruned": false,
+    "docs": [["id", "url", "title", "authors", "venue", "year"], ...],
+    "terms": {"token": [0, 4, 17], ...}
+}
+```
+where each term is mapped to the (sorted) positions of the documents containing it,
+and `pruned` tells whether some terms were dropped to respect `max_terms`.
+The data of a module can be indexed if its data instances implement `search_fields` (see `modules.Data`).
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any
+import hashlib
+import json
+import re
+import unicodedata
+
+from .. import shallow_copy
+from ..modules.description import Description
+
+INDEX_VERSION = 2
+FIELDS = ("title", "authors", "venue", "year")
+# The fields whose terms are never pruned: the most frequent names (e.g., the usual co-authors) are searched the most
+NAME_FIELDS = ("authors",)
+# The words joining the names, which are pruned like the other terms
+_NAME_CONNECTORS = frozenset(("and", "et", "al", "others"))
+
+_TOKEN_SEPARATOR = re.compile(r"[\W_]+")
+
+
+def tokenize(text: str, min_length: int = 2) -> list[str]:
+    """Splits a text into lowercase tokens, without accents nor punctuation (Markdown markup included).
+
+    Arguments:
+        text -- The text
+        min_length -- The minimal length of a token
+
+    Returns:
+        The tokens, in order of appearance, without duplicates
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    tokens = []
+    for token in _TOKEN_SEPARATOR.split(text):
+        if len(token) >= min_length and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+class SearchIndex:
+    """An inverted index of the titles, authors, venues, and years of the entries of some modules.
+
+    The index is updated incrementally: entries are identified by a hash of their fields,
+    only new entries are tokenized, and the file is not written again when the set of entries did not change.
+
+    To bound the size of the index, each entry contributes at most `max_tokens_per_entry` tokens, and only
+    the `max_terms` least frequent terms are kept (very frequent terms select too many entries to be useful).
+    The terms of the names (see `NAME_FIELDS`) are always kept, and count towards `max_terms`.
+    The tokens of the entries are recovered from the terms of a previous index, unless some terms were pruned
+    or the index was written with other settings: the entries are then tokenized again from their fields.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = None,
+        min_token_length: int = 2,
+        max_tokens_per_entry: int = 64,
+        max_terms: int = 50000,
+        widget: bool = True,
+    ) -> None:
+        """Initializes a search index.
+
+        Arguments:
+            path -- The path of the index, relative to the directory of the output of the context.
+                    If None, the output file name with the suffix `.search.json` is used
+            min_token_length -- The minimal length of an indexed token
+            max_tokens_per_entry -- The maximal number of tokens indexed per entry
+            max_terms -- The maximal number of terms in the index
+            widget -- Whether the HTML context adds a search field using the index
+        """
+        self.path = None if path is None else Path(path)
+        self.min_token_length = min_token_length
+        self.max_tokens_per_entry = max_tokens_per_entry
+        self.max_terms = max_terms
+        self.widget = widget
+        # id -> (document, tokens)
+        self._entries: dict[str, tuple[list[str], list[str]]] = {}
+        # The settings of the last update (or of the loaded index), and the settings the tokens were made with
+        self._indexed_with: dict[str, int] = None
+        self._tokenized_with: tuple[int, int] = None
+
+    def fork(self) -> SearchIndex:
+        """Creates an index with the same configuration, without any entry."""
+        index = shallow_copy(self)
+        index._entries = {}
+        index._indexed_with = None
+        index._tokenized_with = None
+        return index
+
+    @property
+    def settings(self) -> dict[str, int]:
+        """The settings changing the contents of the index."""
+        return {
+            "min_token_length": self.min_token_length,
+            "max_tokens_per_entry": self.max_tokens_per_entry,
+            "max_terms": self.max_terms,
+        }
+
+    def index_path(self, output_path: Path) -> Path:
+        """The path of the index file for a context writing to `output_path`."""
+        if self.path is None:
+            return output_path.with_suffix(".search.json")
+        return output_path.parent / self.path
+
+    def load(self, path: Path) -> None:
+        """Loads the entries of a previously written index, such that they are not tokenized again."""
+        try:
+            with path.open(encoding="UTF8") as file:
+                previous = json.load(file)
+        except (OSError, ValueError):
+            return
+        if previous.get("version") != INDEX_VERSION:
+            return
+        settings = previous.get("settings")
+        if previous.get("pruned", True) or settings != self.settings:
+            self._entries = {document[0]: (document, self._tokens(document)) for document in previous["docs"]}
+        else:
+            # Every token of the entries is a term of the index
+            tokens: dict[int, list[str]] = {}
+            for term, positions in previous["terms"].items():
+                for position in positions:
+                    tokens.setdefault(position, []).append(term)
+            self._entries = {
+                document[0]: (document, tokens.get(position, []))
+                for position, document in enumerate(previous["docs"])
+            }
+        self._indexed_with = settings
+        self._tokenized_with = (self.min_token_length, self.max_tokens_per_entry)
+
+    def update(self, entries: list[tuple[str, dict[str, Any]]]) -> bool:
+        """Replaces the indexed entries.
+
+        Arguments:
+            entries -- Pairs of a URL and the fields of an entry (see `FIELDS`)
+
+        Returns:
+            Whether the index changed (its entries, or its settings)
+        """
+        tokenized_with = (self.min_token_length, self.max_tokens_per_entry)
+        # The tokens made with other settings are not reused
+        reused = self._entries if tokenized_with == self._tokenized_with else {}
+        current = {}
+        for url, fields in entries:
+            document = [url] + [_as_text(fields.get(field)) for field in FIELDS]
+            identifier = hashlib.sha1(
+                "\0".join(document).encode("UTF8"), usedforsecurity=False
+            ).hexdigest()[:12]
+            document = [identifier] + document
+            if identifier in reused:
+                current[identifier] = reused[identifier]
+            else:
+                current[identifier] = (document, self._tokens(document))
+
+        changed = current.keys() != self._entries.keys() or self._indexed_with != self.settings
+        self._entries = current
+        self._indexed_with = self.settings
+        self._tokenized_with = tokenized_with
+        return changed
+
+    def to_json(self) -> str:
+        """Serializes the index."""
+        documents = []
+        postings: dict[str, list[int]] = {}
+        for position, (document, tokens) in enumerate(self._entries.values()):
+            documents.append(document)
+            for token in tokens:
+                postings.setdefault(token, []).append(position)
+
+        pruned = len(postings) > self.max_terms
+        if pruned:
+            names = self._name_terms(documents)
+            others = sorted(
+                (term for term in postings if term not in names),
+                key=lambda term: (len(postings[term]), term),
+            )
+            kept = [term for term in postings if term in names]
+            kept += others[: max(self.max_terms - len(kept), 0)]
+            postings = {term: postings[term] for term in kept}
+
+        return json.dumps(
+            {
+                "version": INDEX_VERSION,
+                "fields": list(FIELDS),
+                "settings": self.settings,
+                "pruned": pruned,
+                "docs": documents,
+                "terms": dict(sorted(postings.items())),
+            },
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+
+    def _tokens(self, document: list[str]) -> list[str]:
+        # The names come first, such that a long title does not push them out of the tokens
+        names = [document[FIELDS.index(field) + 2] for field in NAME_FIELDS]
+        text = " ".join(names + document[2:])
+        return tokenize(text, self.min_token_length)[: self.max_tokens_per_entry]
+
+    def _name_terms(self, documents: list[list[str]]) -> set[str]:
+        # The documents start with their identifier and their URL, followed by the fields
+        positions = [FIELDS.index(field) + 2 for field in NAME_FIELDS]
+        return {
+            token
+            for document in documents
+            for position in positions
+            for token in tokenize(document[position], self.min_token_length)
+            if token not in _NAME_CONNECTORS
+        }
+
+
+def _as_text(value: Any) -> str:
+    if value is None or (isinstance(value, Description) and value.is_empty()):
+        return ""
+    return str(value)
+
+
+# Minimal client-side search, loading the index on first use.
+# The query is tokenized like the entries, and the entries containing every token (as a prefix) are listed.
+WIDGET_SCRIPT = """(function () {
+  var input = document.currentScript.previousElementSibling.querySelector("input");
+  var results = input.nextElementSibling;
+  var index = null;
+  function tokens(text) {
+    return text.toLowerCase().normalize("NFKD").replace(/[\\u0300-\\u036f]/g, "")
+      .split(/[^\\p{L}\\p{N}]+/u).filter(function (t) { return t.length >= MIN_LENGTH; });
+  }
+  function search() {
+    var query = tokens(input.value);
+    results.innerHTML = "";
+    if (query.length === 0) { return; }
+    var terms = Object.keys(index.terms), found = null;
+    query.forEach(function (q) {
+      var hits = new Set();
+      terms.forEach(function (t) { if (t.startsWith(q)) { index.terms[t].forEach(function (d) { hits.add(d); }); } });
+      found = found === null ? hits : new Set([...found].filter(function (d) { return hits.has(d); }));
+    });
+    [...found].slice(0, 50).forEach(function (d) {
+      var doc = index.docs[d], item = document.createElement("li"), link = document.createElement("a");
+      link.href = doc[1]; link.textContent = doc[2] + " (" + doc[5] + ")";
+      item.appendChild(link); results.appendChild(item);
+    });
+  }
+  input.addEventListener("input", function () {
+    if (index !== null) { search(); return; }
+    fetch(input.dataset.index).then(function (r) { return r.json(); })
+      .then(function (json) { index = json; search(); });
+  });
+})();"""
@@ -0,0 +1,197 @@
+"""
+Directory of the CVs built by a batch: an index page listing every person, and a sitemap.
+
+The entries of the directory are collected by the batch builder while it builds the CVs (see `batch.build_batch`):
+the personal data of each CV and the number of entries loaded per JSON key.
+Thus, the JSON files are never read again to produce the directory.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+import datetime
+import html
+import os
+import urllib.parse
+
+if TYPE_CHECKING:
+    from . import Builder
+    from .contexts import PersonalData
+    from .sinks import OutputSink
+
+
+@dataclass
+class DirectoryEntry:
+    """A CV of the directory: the personal data, the written documents, and the number of entries per JSON key."""
+
+    personal: PersonalData
+    documents: list[Path]
+    counts: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def main_document(self) -> Path:
+        """The document linked from the index page: the first HTML document, or the first document."""
+        return next(
+            (path for path in self.documents if path.suffix == ".html"),
+            self.documents[0],
+        )
+
+
+def collect_entry(builder: Builder, personal: PersonalData) -> DirectoryEntry:
+    """Describes the CV that was just built by a builder.
+
+    Arguments:
+        builder -- The builder, holding the data of the CV
+        personal -- The personal data of the CV (see `Builder.build`)
+
+    Returns:
+        The entry of the CV
+    """
+    counts = {}
+    for context in builder.contexts:
+        for descriptor in context.modules:
+            # A key shared by multiple modules (or contexts) is counted once.
+            # Modules reading multiple keys (e.g., statistics) are not counted
+            if isinstance(descriptor.in_json, str) and descriptor.in_json not in counts:
+                counts[descriptor.in_json] = sum(
+                    len(data_list) for _, data_list in descriptor.module.data
+                )
+    return DirectoryEntry(
+        personal, [context.output_path for context in builder.contexts], counts
+    )
+
+
+class DirectoryIndex:
+    """Writes the index page and the sitemap of a directory of CVs."""
+
+    def __init__(
+        self,
+        output_dir: Path | str,
+        base_url: str = None,
+        title: str = "People",
+        counted_keys: list[str] = None,
+        css_files: list[str] = None,
+    ) -> None:
+        """Initializes a directory index.
+
+        Arguments:
+            output_dir -- The directory receiving `index.html` and `sitemap.xml`
+            base_url -- The URL of `output_dir` once published. If None, no sitemap is written
+                        (a sitemap requires absolute URLs)
+            title -- The title of the index page
+            counted_keys -- The JSON keys whose numbers of entries are shown on the index page.
+                            If None, every key with at least one entry
+            css_files -- The CSS files linked by the index page
+        """
+        self.output_dir = Path(output_dir)
+        self.base_url = None if base_url is None else base_url.rstrip("/") + "/"
+        self.title = title
+        self.counted_keys = counted_keys
+        self.css_files = [] if css_files is None else css_files
+
+    def write(self, entries: list[DirectoryEntry], sink: OutputSink = None) -> list[Path]:
+        """Writes the index page and, if a base URL is known, the sitemap.
+
+        The entries without personal data are skipped on the index page, but their documents are in the sitemap.
+
+        Arguments:
+            entries -- The entries of the CVs
+            sink -- If not None, the files are given to this sink (see `cvbuilder.sinks`)
+
+        Returns:
+            The paths of the written files
+        """
+        outputs = {self.output_dir / "index.html": self.render_index(entries)}
+        if self.base_url is not None:
+            outputs[self.output_dir / "sitemap.xml"] = self.render_sitemap(entries)
+        if sink is None:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+        for path, output in outputs.items():
+            if sink is None:
+                path.write_text(output, encoding="UTF8")
+            else:
+                sink.write(path, output.encode("UTF8"))
+        return list(outputs)
+
+    def render_index(self, entries: list[DirectoryEntry]) -> str:
+        """Renders the index page, listing the persons by name."""
+        listed = sorted(
+            (entry for entry in entries if entry.personal is not None),
+            key=lambda entry: entry.personal.name.casefold(),
+        )
+        lines = [
+            "<!DOCTYPE html>",
+            '<html lang="en">',
+            "<head>",
+            '  <meta charset="utf-8"/>',
+            '  <meta name="viewport" content="width=device-width, initial-scale=1"/>',
+            f"  <title>{html.escape(self.title)}</title>",
+        ]
+        for css_file in self.css_files:
+            lines.append(f'  <link rel="stylesheet" href="{html.escape(css_file)}"/>')
+        lines += [
+            "</head>",
+            "<body>",
+            f"  <h1>{html.escape(self.title)}</h1>",
+            '  <ul class="directory">',
+        ]
+        for entry in listed:
+            lines += self._render_entry(entry)
+        lines += ["  </ul>", "</body>", "</html>", ""]
+        return "\n".join(lines)
+
+    def render_sitemap(self, entries: list[DirectoryEntry]) -> str:
+        """Renders the sitemap, listing the index page and the HTML documents of every CV."""
+        today = datetime.date.today().isoformat()
+        urls = [self.base_url + "index.html"]
+        for entry in entries:
+            urls += [
+                self.base_url + self._relative_url(path)
+                for path in entry.documents
+                if path.suffix == ".html"
+            ]
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+        ]
+        for url in urls:
+            lines.append(
+                f"  <url><loc>{html.escape(url)}</loc><lastmod>{today}</lastmod></url>"
+            )
+        lines += ["</urlset>", ""]
+        return "\n".join(lines)
+
+    def _render_entry(self, entry: DirectoryEntry) -> list[str]:
+        personal = entry.personal
+        lines = ['    <li class="person">']
+        if personal.photo is not None:
+            photo = personal.photo
+            if not urllib.parse.urlparse(photo).scheme and not Path(photo).is_absolute():
+                # The photo is relative to the main document of the CV
+                photo = self._relative_url(entry.main_document.parent / photo)
+            lines.append(
+                f'      <img class="photo" src="{html.escape(photo)}" alt="{html.escape(personal.name)}"/>'
+            )
+        link = html.escape(self._relative_url(entry.main_document))
+        lines.append(
+            f'      <a class="name" href="{link}">{html.escape(personal.name)}</a>'
+        )
+        lines.append(f'      <div class="position">{html.escape(personal.position)}</div>')
+        lines.append(
+            f'      <div class="organization">{html.escape(personal.organization)}</div>'
+        )
+        counts = [
+            f"{count} {html.escape(key)}"
+            for key, count in entry.counts.items()
+            if (self.counted_keys is None and count > 0)
+            or (self.counted_keys is not None and key in self.counted_keys)
+        ]
+        if len(counts) > 0:
+            lines.append(f'      <div class="counts">{" · ".join(counts)}</div>')
+        lines.append("    </li>")
+        return lines
+
+    def _relative_url(self, path: Path) -> str:
+        relative = os.path.relpath(Path(path).resolve(), self.output_dir.resolve())
+        return urllib.parse.quote(Path(relative).as_posix())
@@ -0,0 +1,345 @@
+"""
+A job queue for batch builds, stored in an SQLite database.
+
+A coordinator enqueues the CVs to build (see `batch.BatchJob`), and any number of workers, in one or many processes
+or hosts sharing the database, claim the jobs and build them (see `work`):
+```python
+queue = JobQueue("jobs.sqlite")
+queue.enqueue(BatchJob([f"people/{name}.json"], f"output/{name}") for name in names)
+```
+and, on every host,
+```
+python -m cvbuilder.jobqueue work jobs.sqlite department.toml --processes 8
+python -m cvbuilder.jobqueue status jobs.sqlite
+```
+
+A claimed job is *leased* to a worker for `lease` seconds. When a worker dies (or takes too long),
+its lease expires and another worker claims the job again.
+A failed job is retried until it was attempted `max_attempts` times.
+The duration of every attempt is recorded.
+
+Warning:
+    SQLite relies on the locks of the file system. Network file systems with unreliable locks (e.g., some NFS setups)
+    can corrupt the database.
+"""
+
+from __future__ import annotations
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import sys
+import time
+
+from .batch import BatchJob, config_factory, run_job, worker_context
+
+if TYPE_CHECKING:
+    from . import Builder
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    inputs TEXT NOT NULL,
+    output_directory TEXT NOT NULL,
+    contexts TEXT,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    worker TEXT,
+    lease_expires REAL,
+    error TEXT,
+    enqueued REAL NOT NULL,
+    finished REAL,
+    duration REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+"""
+
+STATES = ("pending", "running", "done", "failed")
+
+
+class JobQueue:
+    """The jobs of batch builds, in an SQLite database shared by the coordinator and the workers."""
+
+    def __init__(self, path: Path | str, timeout: float = 60) -> None:
+        """Opens (and creates, if needed) a job queue.
+
+        Arguments:
+            path -- The path of the database
+            timeout -- The number of seconds to wait for a lock on the database
+        """
+        self.path = Path(path)
+        # Transactions are explicit (see _transaction)
+        self._connection = sqlite3.connect(self.path, timeout, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def enqueue(self, jobs: Iterable[BatchJob], max_attempts: int = 3) -> int:
+        """Adds jobs to the queue.
+
+        Relative paths are resolved by the workers, from their working directory.
+
+        Arguments:
+            jobs -- The jobs
+            max_attempts -- The number of times a job is attempted before being marked as failed
+
+        Returns:
+            The number of enqueued jobs
+        """
+        now = time.time()
+        rows = [
+            (
+                json.dumps([str(path) for path in job.inputs]),
+                str(job.output_directory),
+                None if job.contexts is None else json.dumps(job.contexts),
+                max_attempts,
+                now,
+            )
+            for job in jobs
+        ]
+        with self._transaction():
+            self._connection.executemany(
+                "INSERT INTO jobs (inputs, output_directory, contexts, max_attempts, enqueued) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def claim(self, worker: str, lease: float = 300) -> tuple[int, BatchJob] | None:
+        """Claims a pending job, or a running job whose lease expired.
+
+        Arguments:
+            worker -- The name of the worker
+            lease -- The number of seconds the job is leased to the worker
+
+        Returns:
+            The identifier of the job and the job, or None if no job can be claimed
+        """
+        now = time.time()
+        with self._transaction():
+            # The worker of the last attempt did not finish in time
+            self._connection.execute(
+                "UPDATE jobs SET state = 'failed', error = 'lease expired'"
+                " WHERE state = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now,),
+            )
+            row = self._connection.execute(
+                "SELECT id, inputs, output_directory, contexts FROM jobs"
+                " WHERE state = 'pending' OR (state = 'running' AND lease_expires < ?)"
+                " ORDER BY id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE jobs SET state = 'running', worker = ?, lease_expires = ?, attempts = attempts + 1"
+                " WHERE id = ?",
+                (worker, now + lease, row[0]),
+            )
+        job_id, inputs, output_directory, contexts = row
+        return job_id, BatchJob(
+            [Path(path) for path in json.loads(inputs)],
+            Path(output_directory),
+            None if contexts is None else json.loads(contexts),
+        )
+
+    def complete(self, job_id: int, worker: str, duration: float) -> bool:
+        """Marks a claimed job as done.
+
+        Arguments:
+            job_id -- The identifier of the job
+            worker -- The name of the worker holding the lease
+            duration -- The number of seconds spent building the job
+
+        Returns:
+            False if the worker lost the lease (the job was claimed by another worker), True otherwise
+        """
+        with self._transaction():
+            cursor = self._connection.execute(
+                "UPDATE jobs SET state = 'done', error = NULL, finished = ?, duration = duration + ?"
+                " WHERE id = ? AND worker = ? AND state = 'running'",
+                (time.time(), duration, job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: int, worker: str, error: str, duration: float) -> bool:
+        """Records a failed attempt of a claimed job. The job is retried, unless it reached its maximal number of attempts.
+
+        Arguments:
+            job_id -- The identifier of the job
+            worker -- The name of the worker holding the lease
+            error -- The error message
+            duration -- The number of seconds spent on the attempt
+
+        Returns:
+            False if the worker lost the lease (the job was claimed by another worker), True otherwise
+        """
+        with self._transaction():
+            cursor = self._connection.execute(
+                "UPDATE jobs SET"
+                " state = CASE WHEN attempts < max_attempts THEN 'pending' ELSE 'failed' END,"
+                " error = ?, finished = ?, duration = duration + ?"
+                " WHERE id = ? AND worker = ? AND state = 'running'",
+                (error, time.time(), duration, job_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def status(self) -> dict[str, Any]:
+        """Counts the jobs in each state, and summarizes the durations of the finished jobs (in total, and per worker)."""
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(
+            self._connection.execute(
+                "SELECT state, COUNT(*) FROM jobs GROUP BY state"
+            ).fetchall()
+        )
+        finished, total, longest, attempts = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(duration), 0), COALESCE(MAX(duration), 0), COALESCE(SUM(attempts), 0)"
+            " FROM jobs WHERE state IN ('done', 'failed')"
+        ).fetchone()
+        workers = {
+            worker: {"jobs": jobs, "total_time": worker_total}
+            for worker, jobs, worker_total in self._connection.execute(
+                "SELECT worker, COUNT(*), SUM(duration) FROM jobs WHERE state = 'done' GROUP BY worker"
+            )
+        }
+        return {
+            "jobs": counts,
+            "attempts": attempts,
+            "total_time": total,
+            "mean_time": total / finished if finished else 0.0,
+            "max_time": longest,
+            "workers": workers,
+        }
+
+    def failures(self) -> list[tuple[BatchJob, str]]:
+        """The jobs that failed on every attempt, with their last error."""
+        rows = self._connection.execute(
+            "SELECT inputs, output_directory, contexts, error FROM jobs WHERE state = 'failed' ORDER BY id"
+        ).fetchall()
+        return [
+            (
+                BatchJob(
+                    [Path(path) for path in json.loads(inputs)],
+                    Path(output_directory),
+                    None if contexts is None else json.loads(contexts),
+                ),
+                error,
+            )
+            for inputs, output_directory, contexts, error in rows
+        ]
+
+    def has_unfinished_jobs(self) -> bool:
+        """Whether some jobs are pending or running."""
+        return (
+            self._connection.execute(
+                "SELECT 1 FROM jobs WHERE state IN ('pending', 'running') LIMIT 1"
+            ).fetchone()
+            is not None
+        )
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # The database is locked for writing from the start, such that two workers can not claim the same job
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+
+def work(
+    queue_path: Path | str,
+    factory: Callable[[], Builder],
+    worker: str = None,
+    lease: float = 300,
+    poll_interval: float = 1,
+) -> int:
+    """Claims and builds jobs, until every job of the queue is finished.
+
+    The builder is created once by the factory, and forked for every job (see `batch.build_batch`).
+
+    Args:
+        queue_path: The path of the database of the queue.
+        factory: The function creating the configured builder.
+        worker: The name of the worker. If None, the host name and the process identifier.
+        lease: The number of seconds a claimed job is leased to the worker. It must exceed the duration of a job.
+        poll_interval: The number of seconds to wait before claiming again, when the remaining jobs are leased
+            by other workers.
+
+    Returns:
+        The number of jobs built successfully by this worker.
+    """
+    from .modules import description  # pylint: disable = import-outside-toplevel
+
+    if worker is None:
+        worker = f"{socket.gethostname()}:{os.getpid()}"
+    description.warm_up()
+    template = factory()
+    built = 0
+    with closing(JobQueue(queue_path)) as queue:
+        while True:
+            claimed = queue.claim(worker, lease)
+            if claimed is None:
+                if not queue.has_unfinished_jobs():
+                    return built
+                time.sleep(poll_interval)
+                continue
+
+            job_id, job = claimed
+            _, duration, error, _ = run_job(template, job, worker)
+            if error is None:
+                built += queue.complete(job_id, worker, duration)
+            else:
+                queue.fail(job_id, worker, error, duration)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m cvbuilder.jobqueue",
+        description="Works on, or reports the status of, a queue of batch build jobs.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    work_parser = commands.add_parser("work", help="build jobs until the queue is finished")
+    work_parser.add_argument("queue", help="the database of the queue")
+    work_parser.add_argument("config", help="the build configuration of the jobs")
+    work_parser.add_argument(
+        "-p", "--processes", type=int, default=1, help="the number of worker processes (default: 1)"
+    )
+    work_parser.add_argument(
+        "--lease", type=float, default=300, help="the lease of a claimed job, in seconds (default: 300)"
+    )
+    status_parser = commands.add_parser("status", help="print the status of the queue")
+    status_parser.add_argument("queue", help="the database of the queue")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        with closing(JobQueue(args.queue)) as queue:
+            print(json.dumps(queue.status(), indent=2))
+            for job, error in queue.failures():
+                print(f"failed: {job.output_directory}: {error}", file=sys.stderr)
+        return 0
+
+    factory = config_factory(args.config)
+    if args.processes <= 1:
+        built = work(args.queue, factory, lease=args.lease)
+    else:
+        with worker_context().Pool(args.processes) as pool:
+            built = sum(
+                pool.starmap(
+                    work, [(args.queue, factory, None, args.lease)] * args.processes
+                )
+            )
+    print(f"{built} jobs built")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,175 @@
+"""
+Manifest of the files written by the builds (see `Builder.set_manifest`), for HTTP caching and incremental deploys.
+
+For every file written by a context, the manifest holds its SHA-256 hash, its size, the identifier of the last build
+that changed its contents, and the JSON keys read by the modules of the context.
+A web server can thus serve strong ETags (`ManifestEntry.etag`), a CDN can purge only the files depending on a key,
+and a deploy can upload only the files changed by the last build (`BuildManifest.changed`).
+
+The manifest is a JSON file:
+```json
+{
+  "build_id": "20240501T120000.000000Z",
+  "files": {
+    "html/index.html": { "sha256": "...", "size": 52695, "build_id": "20240501T120000.000000Z", "keys": ["jobs", "talks"] }
+  }
+}
+```
+The paths are relative to the directory of the manifest.
+The compressed sidecars (see `contexts.compression`) are not listed, as their contents follow from their file.
+The assets of the HTML contexts (see `contexts.html.AssetPipeline`) are listed, without keys.
+"""
+
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+import datetime
+import hashlib
+import json
+import os
+import threading
+
+if TYPE_CHECKING:
+    from .sinks import OutputSink
+
+
+@dataclass
+class ManifestEntry:
+    """A file of the manifest."""
+
+    sha256: str
+    size: int
+    build_id: str
+    keys: list[str]
+
+    @property
+    def etag(self) -> str:
+        """A strong ETag of the file (a quoted prefix of its hash)."""
+        return f'"{self.sha256[:32]}"'
+
+
+class BuildManifest:
+    """The manifest of the files written by the builds of a builder."""
+
+    def __init__(self, path: Path | str, build_id: str = None) -> None:
+        """Initializes the manifest.
+
+        Arguments:
+            path -- The path of the manifest file
+            build_id -- The identifier of every build (e.g., the revision of the JSON files), which should change
+                        between the builds. If None, each build is identified by its starting time (UTC)
+        """
+        self.path = Path(path)
+        self.fixed_build_id = build_id
+        self.build_id: str = None
+        self.entries: dict[str, ManifestEntry] = {}
+        self.removed: list[str] = []
+        self._written: set[str] = set()
+        self._lock = threading.Lock()
+
+    def start_build(self) -> str:
+        """Starts a new build. The entries of the previous builds are read from the manifest file, if it exists.
+
+        Returns:
+            The identifier of the build
+        """
+        self.build_id = self.fixed_build_id or datetime.datetime.now(
+            datetime.timezone.utc
+        ).strftime("%Y%m%dT%H%M%S.%fZ")
+        self.removed = []
+        self._written = set()
+        try:
+            with self.path.open(encoding="UTF8") as file:
+                previous = json.load(file)
+            self.entries = {
+                name: ManifestEntry(**entry) for name, entry in previous["files"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            # Without a (valid) manifest, every file is considered changed
+            self.entries = {}
+        return self.build_id
+
+    def record(self, path: Path, data: bytes, keys: list[str]) -> ManifestEntry:
+        """Records a file written by the current build.
+
+        The identifier of the build is only given to the file if its contents changed.
+
+        Arguments:
+            path -- The output path of the file
+            data -- The contents of the file
+            keys -- The JSON keys the file is built from
+
+        Returns:
+            The entry of the file
+        """
+        return self.record_digest(path, hashlib.sha256(data).hexdigest(), len(data), keys)
+
+    def record_digest(self, path: Path, sha256: str, size: int, keys: list[str]) -> ManifestEntry:
+        """Records a file used by the current build, whose hash is already known (e.g., an asset).
+
+        Arguments:
+            path -- The output path of the file
+            sha256 -- The SHA-256 hash of the contents of the file, in hexadecimal
+            size -- The size of the file
+            keys -- The JSON keys the file is built from
+
+        Returns:
+            The entry of the file
+        """
+        name = self.name(path)
+        with self._lock:
+            previous = self.entries.get(name)
+            if previous is not None and previous.sha256 == sha256:
+                build_id = previous.build_id
+            else:
+                build_id = self.build_id
+            entry = ManifestEntry(sha256, size, build_id, sorted(keys))
+            self.entries[name] = entry
+            self._written.add(name)
+        return entry
+
+    def keep(self, path: Path) -> None:
+        """Keeps the entry of a file that the current build did not write again, because it did not change."""
+        with self._lock:
+            self._written.add(self.name(path))
+
+    def keep_directory(self, directory: Path) -> None:
+        """Keeps the entries of every file in a directory (e.g., the assets linked by pages that were not written)."""
+        prefix = self.name(directory) + "/"
+        with self._lock:
+            self._written.update(name for name in self.entries if name.startswith(prefix))
+
+    def save(self, sink: OutputSink = None) -> None:
+        """Ends the current build, and writes the manifest.
+
+        The entries of the files that were neither written nor kept by the build are removed (see `removed`).
+
+        Arguments:
+            sink -- If not None, the manifest is given to this sink (see `cvbuilder.sinks`)
+        """
+        with self._lock:
+            self.removed = sorted(name for name in self.entries if name not in self._written)
+            for name in self.removed:
+                del self.entries[name]
+            contents = {
+                "build_id": self.build_id,
+                "files": {name: asdict(entry) for name, entry in sorted(self.entries.items())},
+            }
+        data = (json.dumps(contents, indent=2, ensure_ascii=False) + "\n").encode("UTF8")
+        if sink is not None:
+            sink.write(self.path, data)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_bytes(data)
+
+    @property
+    def changed(self) -> list[str]:
+        """The files whose contents were changed (or created) by the current build."""
+        return sorted(
+            name for name, entry in self.entries.items() if entry.build_id == self.build_id
+        )
+
+    def name(self, path: Path | str) -> str:
+        """The name of a file in the manifest: its path relative to the directory of the manifest."""
+        return Path(os.path.relpath(os.path.abspath(path), os.path.abspath(self.path.parent))).as_posix()
@@ -1,10 +1,39 @@
 from abc import ABC
 from dataclasses import dataclass
-from typing import Callable
+from typing import Any, Callable, Sequence
 import datetime
+import importlib
 
+from .. import shallow_copy
 from ..modules import description
 
+# The modules are only imported when they are first accessed (PEP 562)
+_SUBMODULES = (
+    "award",
+    "columns",
+    "contact",
+    "event",
+    "job",
+    "language",
+    "logos",
+    "project",
+    "publication",
+    "service",
+    "statistics",
+    "summary",
+    "supervision",
+    "talk",
+    "teach",
+    "text",
+    "utils",
+)
+
+
+def __getattr__(name: str) -> Any:
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class Data(ABC):
     """Base class for data held by modules."""
@@ -18,6 +47,10 @@ class Data(ABC):
     def to_markdown(self, context: "contexts.markdown.MarkdownContext") -> str:
         return self.to_html(context)
 
+    def search_fields(self) -> dict[str, Any] | None:
+        """The fields indexed by a search index (see `contexts.search`), or None if the data is not searchable."""
+        return None
+
 
 @dataclass
 class SimpleText:
@@ -47,11 +80,24 @@ class Module(ABC):
     ) -> None:
         self.level = level
         self.section = section
-        self.data: list[tuple[None | str, list[Data]]] = []
+        self.data: list[tuple[None | str, Sequence[Data]]] = []
         self.introduction_text = SimpleText(introduction_text)
         self.section_icon = section_icon
         self.use_subsections = use_subsections
 
+    def reset(self) -> None:
+        """Forgets the loaded data, such that the module can load the data of another CV."""
+        self.data = []
+
+    def fork(self) -> "Module":
+        """Creates a module with the same configuration, without any data.
+
+        The configuration (section, introduction text, and so on) is shared with this module, and must not be modified.
+        """
+        module = shallow_copy(self)
+        module.reset()
+        return module
+
     def load(self, json_value) -> None:
         """Loads the module's data from the given JSON value.
 
@@ -80,17 +126,22 @@ class Module(ABC):
                 )
             order = json_value["order"]
             for subsection in order:
-                data_list = []
-                for data_object in json_value[subsection]:
-                    data_list.append(self._load(data_object))
+                data_list = self._load_list(json_value[subsection])
                 if subsection == "None":
                     subsection = None
                 self.data.append((subsection, data_list))
         else:
-            data_list = []
-            for data_object in json_value:
-                data_list.append(self._load(data_object))
-            self.data.append((None, data_list))
+            self.data.append((None, self._load_list(json_value)))
+
+    def _load_list(self, json_objects: list) -> Sequence[Data]:
+        """Creates the data instances of a list of JSON objects (see `_load`).
+
+        Modules storing their data in columns (see `columns.RecordTable`) return a view instead.
+
+        Arguments:
+            json_objects -- The JSON objects
+        """
+        return [self._load(json_object) for json_object in json_objects]
 
     def _load(self, json_object) -> Data:
         """Creates a single data instance from the json_value.
@@ -0,0 +1,192 @@
+"""
+Columnar storage of the data of a module, for CVs with tens of thousands of entries.
+
+Instead of one data instance per entry, a `RecordTable` stores one column per field of the data class:
+  - the dates are integer ordinals (`array("i")`),
+  - the other values are identifiers in a table of interned values (`array("I")`), such that repeated strings
+    (e.g., venues or authors) are stored once.
+
+The modules hold views over the table (`RecordView`), in place of their lists of data.
+A view is a sequence of data instances, created on access (i.e., when the module is rendered) and then forgotten.
+Grouping and sorting by date run over the columns of integers, without creating any data instance.
+"""
+
+from __future__ import annotations
+from array import array
+from dataclasses import MISSING, fields
+from collections.abc import Sequence
+from typing import Any, Iterable, Iterator
+import datetime
+import hashlib
+import itertools
+
+from . import Data
+
+# Ordinal of a missing date (real ordinals start at 1)
+_NO_DATE = 0
+
+
+class RecordTable:
+    """The entries of a module, stored column by column."""
+
+    def __init__(
+        self,
+        data_type: type[Data],
+        rows: Iterable[dict[str, Any]],
+        date_fields: Sequence[str] = (),
+    ) -> None:
+        """Stores the entries of a module.
+
+        Arguments:
+            data_type -- The dataclass of the entries
+            rows -- The values of the fields of each entry, as they would be given to the constructor of the data class.
+                    The missing fields take the default value of the data class
+            date_fields -- The fields holding dates (`datetime.datetime` or None)
+
+        Raises:
+            TypeError -- if a field is unknown, or a required field is missing (as the constructor would)
+        """
+        self.data_type = data_type
+        self.field_names = [field.name for field in fields(data_type)]
+        self._required_fields = {
+            field.name
+            for field in fields(data_type)
+            if field.default is MISSING and field.default_factory is MISSING
+        }
+        self.date_fields = tuple(date_fields)
+        self._columns: dict[str, array] = {
+            name: array("i") if name in self.date_fields else array("I")
+            for name in self.field_names
+        }
+        # Identifier 0 is None
+        self._values: list[Any] = [None]
+        # Dates that are not a day at midnight (e.g., with a time or a timezone), by (field, row)
+        self._exact_dates: dict[tuple[str, int], datetime.datetime] = {}
+
+        # The index of the interned values is only needed while filling the table
+        value_ids: dict[tuple[type, Any], int] = {}
+        for values in rows:
+            self._append(values, value_ids)
+
+    def __len__(self) -> int:
+        return len(self._columns[self.field_names[0]]) if self.field_names else 0
+
+    def view(self, rows: Sequence[int] = None) -> RecordView:
+        """A view of the given rows (by default, every row), in the given order."""
+        if rows is None:
+            rows = range(len(self))
+        return RecordView(self, array("I", rows))
+
+    def materialize(self, row: int) -> Data:
+        """Creates the data instance of a row."""
+        values = {}
+        for name in self.field_names:
+            if name in self.date_fields:
+                value = self.date(name, row)
+            else:
+                value = self._values[self._columns[name][row]]
+            if value is not None:
+                values[name] = value
+        return self.data_type(**values)
+
+    def raw_row(self, row: int) -> tuple[Any, ...]:
+        """The stored values of a row (the dates as ordinals, or as exact dates), without creating the data instance."""
+        return tuple(
+            self._exact_dates.get((name, row), self._columns[name][row])
+            if name in self.date_fields
+            else self._values[self._columns[name][row]]
+            for name in self.field_names
+        )
+
+    def date(self, name: str, row: int) -> datetime.datetime | None:
+        """The date stored in a field of a row."""
+        exact = self._exact_dates.get((name, row))
+        if exact is not None:
+            return exact
+        ordinal = self._columns[name][row]
+        if ordinal == _NO_DATE:
+            return None
+        return datetime.datetime.fromordinal(ordinal)
+
+    def group_per_year(self, date_field: str) -> list[tuple[str, RecordView]]:
+        """Groups the rows per year, from the most recent, with the most recent dates first in each year.
+
+        This is the columnar counterpart of `modules.group_and_sort_by_date`: within a day,
+        the order of the JSON document is kept.
+        """
+        ordinals = self._columns[date_field]
+        if any(name == date_field for name, _ in self._exact_dates):
+            key = lambda row: self.date(date_field, row)  # pylint: disable = unnecessary-lambda-assignment
+        else:
+            key = ordinals.__getitem__
+        order = sorted(range(len(ordinals)), key=key, reverse=True)
+        return [
+            (str(year), RecordView(self, array("I", rows)))
+            for year, rows in itertools.groupby(
+                order, lambda row: datetime.date.fromordinal(ordinals[row]).year
+            )
+        ]
+
+    def _append(self, values: dict[str, Any], value_ids: dict[tuple[type, Any], int]) -> None:
+        unknown = values.keys() - self._columns.keys()
+        missing = self._required_fields - values.keys()
+        if unknown or missing:
+            raise TypeError(
+                f"{self.data_type.__qualname__}: unknown fields {sorted(unknown)}, missing fields {sorted(missing)}"
+            )
+        row = len(self)
+        for name in self.field_names:
+            value = values.get(name)
+            if name in self.date_fields:
+                self._columns[name].append(self._date_ordinal(name, row, value))
+            else:
+                self._columns[name].append(self._value_id(value, value_ids))
+
+    def _value_id(self, value: Any, value_ids: dict[tuple[type, Any], int]) -> int:
+        if value is None:
+            return 0
+        try:
+            # The type is part of the key, as 2024 == 2024.0 and True == 1
+            key = (type(value), value)
+            identifier = value_ids.get(key)
+        except TypeError:  # Unhashable values (e.g., a style) are not interned
+            key = None
+            identifier = None
+        if identifier is None:
+            identifier = len(self._values)
+            self._values.append(value)
+            if key is not None:
+                value_ids[key] = identifier
+        return identifier
+
+    def _date_ordinal(self, name: str, row: int, value: datetime.datetime | None) -> int:
+        if value is None:
+            return _NO_DATE
+        if value.tzinfo is not None or value != datetime.datetime.fromordinal(value.toordinal()):
+            self._exact_dates[(name, row)] = value
+        return value.toordinal()
+
+
+class RecordView(Sequence):
+    """Some rows of a table, seen as a sequence of data instances (created on access)."""
+
+    def __init__(self, table: RecordTable, rows: array) -> None:
+        self.table = table
+        self.rows = rows
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index: int | slice) -> Data | RecordView:
+        if isinstance(index, slice):
+            return RecordView(self.table, self.rows[index])
+        return self.table.materialize(self.rows[index])
+
+    def __iter__(self) -> Iterator[Data]:
+        return map(self.table.materialize, self.rows)
+
+    def __repr__(self) -> str:
+        # Identifies the contents (e.g., for the digests of the pages and the shared fragments)
+        contents = repr([self.table.raw_row(row) for row in self.rows])
+        digest = hashlib.sha256(contents.encode("UTF8")).hexdigest()
+        return f"RecordView({self.table.data_type.__qualname__}, {len(self)} rows, {digest})"
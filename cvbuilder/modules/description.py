@@ -1,14 +1,75 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
+import functools
 import re
-import markdown
-
-from ..modules.utils import etree_to_latex
+import threading
 
 if TYPE_CHECKING:
+    import markdown
     from ..modules import Data
 
-markdown.Markdown.output_formats["latex"] = etree_to_latex.to_latex_string
+# Markdown instances are not thread-safe: each thread uses its own converters
+_local = threading.local()
+
+
+def _converter(output_format: str) -> markdown.Markdown:
+    """Returns the Markdown converter of the current thread for the output format, ready for a new conversion.
+
+    Markdown is imported on first use.
+    """
+    converters = getattr(_local, "converters", None)
+    if converters is None:
+        converters = _local.converters = {}
+
+    converter = converters.get(output_format)
+    if converter is None:
+        # pylint: disable = import-outside-toplevel, redefined-outer-name
+        import markdown
+
+        if output_format == "latex":
+            from ..modules.utils import etree_to_latex
+
+            # The serializer is set on the instance, instead of registering the format in the class attribute
+            # Markdown.output_formats, shared by every thread (and every user of markdown)
+            converter = markdown.Markdown()
+            converter.output_format = "latex"
+            converter.serializer = etree_to_latex.to_latex_string
+        else:
+            converter = markdown.Markdown(output_format="html", extensions=["smarty"])
+        converters[output_format] = converter
+    return converter.reset()
+
+
+@functools.lru_cache(maxsize=4096)
+def _convert(text: str, output_format: str) -> str:
+    """Converts a Markdown string, memoizing the result.
+
+    The same strings (names, venues, section texts, and so on) tend to be converted many times,
+    in every context and every build of a long-running process.
+    """
+    if output_format == "latex":
+        return _converter("latex").convert(text)
+    text = re.sub("\n\n", "<br/>", text)
+    html = _converter("html").convert(text)
+    # To obtain a better output, we remove all the p tags.
+    # This allows text to flow more naturally, without line breaks.
+    return re.sub("(<p>|</p>)", "", html)
+
+
+def warm_up() -> None:
+    """Creates the Markdown converters of the current thread, such that the first conversions are not slower."""
+    _converter("html")
+    _converter("latex")
+
+
+def cache_info() -> functools._CacheInfo:
+    """Returns the statistics of the cache of converted Markdown strings."""
+    return _convert.cache_info()
+
+
+def cache_clear() -> None:
+    """Empties the cache of converted Markdown strings."""
+    _convert.cache_clear()
 
 
 class Description:
@@ -23,6 +84,17 @@ class Description:
     def __str__(self) -> str:
         return self.description
 
+    def __repr__(self) -> str:
+        return f"Description({self.description!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Description):
+            return NotImplemented
+        return self.description == other.description
+
+    def __hash__(self) -> int:
+        return hash(self.description)
+
     def is_empty(self) -> bool:
         return self.description is None
 
@@ -30,16 +102,12 @@ class Description:
         if self.is_empty():
             return ""
         # TODO: use smarty for LaTeX
-        return markdown.markdown(self.description, output_format="latex")
+        return _convert(self.description, "latex")
 
     def to_html(self) -> str:
         if self.is_empty():
             return ""
-        description = re.sub("\n\n", "<br/>", self.description)
-        html = markdown.markdown(description, output_format="html", extensions=["smarty"])
-        # To obtain a better output, we remove all the p tags.
-        # This allows text to flow more naturally, without line breaks.
-        return re.sub("(<p>|</p>)", "", html)
+        return _convert(self.description, "html")
 
     def to_markdown(self) -> str:
         if self.is_empty():
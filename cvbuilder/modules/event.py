@@ -39,6 +39,9 @@ class EventModule(modules.Module):
 
     Events are automatically sorted and grouped by year.
     Within a year, the order of the JSON document is followed.
+
+    With `columnar=True`, the events are stored in columns (see `modules.columns`),
+    and grouped per year without creating the data instances.
     """
 
     def __init__(
@@ -48,6 +51,7 @@ class EventModule(modules.Module):
         introduction_text: str = "",
         icon: str = "iconoir-calendar",
         use_subsections: bool = True,
+        columnar: bool = False,
     ):
         super().__init__(
             level=level,
@@ -56,8 +60,19 @@ class EventModule(modules.Module):
             use_subsections=use_subsections,
             introduction_text=introduction_text,
         )
+        self.columnar = columnar
 
     def load(self, json_value: list[dict[str, Any]]) -> None:
+        if self.columnar:
+            table = modules.columns.RecordTable(
+                Event, map(self._values, json_value), date_fields=("year",)
+            )
+            if self.use_subsections:
+                self.data = table.group_per_year("year")
+            else:
+                self.data.append((None, table.view()))
+            return
+
         events = list(map(self._load, json_value))
 
         if self.use_subsections:
@@ -70,6 +85,9 @@ class EventModule(modules.Module):
             self.data.append((None, events))
 
     def _load(self, json_object) -> Event:
+        return Event(**self._values(json_object))
+
+    def _values(self, json_object) -> dict[str, Any]:
         year = (
             dateutil.parser.parse(str(json_object["year"]))
             if "year" in json_object
@@ -77,7 +95,7 @@ class EventModule(modules.Module):
         )
         name = json_object["name"] if "name" in json_object else Event.name
         where = json_object["where"] if "where" in json_object else Event.where
-        return Event(year=year, name=name, where=where)
+        return {"year": year, "name": name, "where": where}
 
     def _get_class_name(self) -> str:
         return "event"
@@ -4,6 +4,7 @@ Module for publications.
 
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import Any, Sequence
 
 from .. import contexts
 from .. import modules
@@ -28,6 +29,14 @@ class Publication(modules.Data):
     note: modules.description.Description = modules.description.DescriptionDescriptor()
     style: contexts.latex.Style = None
 
+    def search_fields(self) -> dict[str, Any]:
+        return {
+            "title": self.title,
+            "authors": self.authors,
+            "venue": self.shortWhere if self.where.is_empty() else self.where,
+            "year": self.year,
+        }
+
     def to_latex(self, context: contexts.latex.LaTeXContext) -> str:
         latex = "\\publication{\n"
         latex += context.format_variable("title", self.title)
@@ -97,7 +106,11 @@ class Publication(modules.Data):
 
 
 class PublicationModule(modules.Module):
-    """Publication module, holding data for the job positions defined in the JSON file."""
+    """Publication module, holding data for the job positions defined in the JSON file.
+
+    With `columnar=True`, the publications are stored in columns (see `modules.columns`),
+    which saves memory for very long lists of publications.
+    """
 
     def __init__(
         self,
@@ -106,6 +119,7 @@ class PublicationModule(modules.Module):
         introduction_text: str = "",
         icon: str = "iconoir-journal",
         use_subsections: bool = True,
+        columnar: bool = False,
     ):
         super().__init__(
             level=level,
@@ -114,6 +128,12 @@ class PublicationModule(modules.Module):
             use_subsections=use_subsections,
             introduction_text=introduction_text,
         )
+        self.columnar = columnar
+
+    def _load_list(self, json_objects: list) -> Sequence[Publication]:
+        if not self.columnar:
+            return super()._load_list(json_objects)
+        return modules.columns.RecordTable(Publication, json_objects).view()
 
     def _load(self, json_object):
         return Publication(**json_object)
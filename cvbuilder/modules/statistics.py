@@ -0,0 +1,226 @@
+"""
+Module for statistics over the other data of the CV: publications per year, talks per year, supervisions per role, etc.
+
+The module reads the JSON values of multiple keys (see `Context.add_module`):
+```python
+statistics = StatisticsModule()
+context.add_module(statistics.keys, statistics)
+```
+When multiple JSON documents are loaded (e.g., the CVs of a whole department), the counts are summed.
+The counts are only held by the data of the module (see `Counts`), such that the module can be restored from a snapshot.
+
+Each statistic counts the entries of a key, either per year (with the years of a range, like `2019-2022`,
+`2019 to 2022`, or `2019/2020`, counted once each) or per value of a field. The counts per year are also drawn as a sparkline, from the oldest to the most recent year.
+The values of the counted field are first extracted in a compact column (an `array` of years, or of interned values),
+then counted in a single pass over the column.
+"""
+
+from __future__ import annotations
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+import re
+
+from .. import contexts
+from .. import modules
+
+_YEAR = re.compile(r"(?<![0-9])[0-9]{4}(?![0-9])")
+# The separators of the ranges of years, as written in the free-text fields (e.g., "Academic years 2005 to 2010")
+_RANGE = re.compile(
+    r"(?<![0-9])([0-9]{4})\s*(?:[-–—/]+|\s(?:to|until|till|through)\s)\s*([0-9]{4})(?![0-9])",
+    re.IGNORECASE,
+)
+_SPARKS = "▁▂▃▄▅▆▇█"
+
+
+@dataclass(frozen=True)
+class Statistic:
+    """A statistic: the number of entries of a JSON key, per year or per value of a field."""
+
+    label: str
+    key: str
+    field: str
+    per_year: bool = True
+
+
+DEFAULT_STATISTICS = (
+    Statistic("Publications per year", "publications", "year"),
+    Statistic("Talks per year", "talks", "date"),
+    Statistic("Teaching per year", "teaching", "when"),
+    Statistic("Supervisions per role", "supervision", "role", per_year=False),
+)
+
+
+@dataclass
+class Counts(modules.Data):
+    """The counts of a statistic, as (value, count) rows.
+
+    The rows of a statistic per year go from the most recent year, and skip the years without any entry.
+    """
+
+    statistic: Statistic
+    rows: list[tuple[str, int]]
+
+    def sparkline(self) -> str:
+        """The counts of every year, from the oldest to the most recent one, as a line of Unicode bars."""
+        if len(self.rows) == 0:
+            return ""
+        counts = {int(year): count for year, count in self.rows}
+        highest = max(counts.values())
+        return "".join(
+            _SPARKS[counts.get(year, 0) * (len(_SPARKS) - 1) // highest]
+            for year in range(min(counts), max(counts) + 1)
+        )
+
+    def to_latex(self, context: contexts.latex.LaTeXContext) -> str:
+        highest = max((count for _, count in self.rows), default=0) or 1
+        latex = "\\begin{tabular}{lrl}\n"
+        for value, count in self.rows:
+            bar = f"\\rule{{{5 * count / highest:.2f}em}}{{1ex}}" if count > 0 else ""
+            latex += f"{modules.description.Description(value).to_latex()} & {count} & {bar} \\\\\n"
+        latex += "\\end{tabular}\n"
+        return latex
+
+    def to_html(self, context: contexts.html.HTMLContext) -> str:
+        highest = max((count for _, count in self.rows), default=0) or 1
+        html = context.open_div("item")
+        if self.statistic.per_year:
+            html += context.simple_div_block("sparkline", self.sparkline())
+        html += context.table_block(
+            "statistics",
+            [
+                [
+                    modules.description.Description(value).to_html(),
+                    str(count),
+                    f'<span class="bar" style="width: {100 * count / highest:.0f}%"></span>',
+                ]
+                for value, count in self.rows
+            ],
+        )
+        html += context.close_block()  # item
+        return html
+
+    def to_markdown(self, context: contexts.markdown.MarkdownContext) -> str:
+        markdown = ""
+        if self.statistic.per_year:
+            markdown += self.sparkline() + "\n\n"
+        for value, count in self.rows:
+            markdown += f"- {value}: {count}\n"
+        return markdown + "\n"
+
+
+class StatisticsModule(modules.Module):
+    """Statistics module, counting the entries of other keys of the JSON document.
+
+    Each statistic is rendered as a subsection, titled by its label.
+    """
+
+    def __init__(
+        self,
+        level: int = 1,
+        section: str = "Statistics",
+        introduction_text: str = "",
+        icon: str = "iconoir-stats-report",
+        statistics: list[Statistic | dict[str, Any]] = DEFAULT_STATISTICS,
+    ):
+        super().__init__(
+            level=level,
+            section=section,
+            section_icon=icon,
+            use_subsections=True,
+            introduction_text=introduction_text,
+        )
+        self.statistics = tuple(
+            statistic if isinstance(statistic, Statistic) else Statistic(**statistic)
+            for statistic in statistics
+        )
+
+    @property
+    def keys(self) -> tuple[str, ...]:
+        """The JSON keys read by the statistics (to give to `Context.add_module`)."""
+        return tuple(dict.fromkeys(statistic.key for statistic in self.statistics))
+
+    def load(self, json_value: dict[str, Any]) -> None:
+        """Counts the entries of the keys present in the JSON document.
+
+        Arguments:
+            json_value -- The JSON values of the keys (see `keys`) present in the document
+        """
+        # The counts of the previous documents
+        previous = {label: data_list[0] for label, data_list in self.data}
+        counters = []
+        for statistic in self.statistics:
+            counter = Counter()
+            if statistic.label in previous:
+                counter.update(
+                    {
+                        int(value) if statistic.per_year else value: count
+                        for value, count in previous[statistic.label].rows
+                    }
+                )
+            counters.append(counter)
+            if statistic.key not in json_value:
+                continue
+            values = (
+                json_object.get(statistic.field)
+                for json_object in _entries(json_value[statistic.key])
+            )
+            if statistic.per_year:
+                counter.update(_years_column(values))
+            else:
+                counter.update(_count_values(values))
+
+        self.data = [
+            (statistic.label, [Counts(statistic, _rows(statistic, counter))])
+            for statistic, counter in zip(self.statistics, counters)
+        ]
+
+    def _get_class_name(self) -> str:
+        return "statistics"
+
+
+def _entries(json_value: list | dict) -> list[dict[str, Any]]:
+    # The entries of a key, with or without subsections (see `Module.load`)
+    if isinstance(json_value, dict) and "order" in json_value:
+        return [
+            json_object
+            for subsection in json_value["order"]
+            for json_object in json_value[subsection]
+        ]
+    return json_value
+
+
+def _years_column(values) -> array:
+    years = array("H")
+    for value in values:
+        if value is None:
+            continue
+        value = str(value)
+        match = _RANGE.search(value)
+        if match is not None and int(match[1]) <= int(match[2]):
+            # A range (e.g., 2019-2022, or 2019 to 2022) counts in each of its years
+            years.extend(range(int(match[1]), int(match[2]) + 1))
+            continue
+        match = _YEAR.search(value)
+        if match is not None:
+            years.append(int(match[0]))
+    return years
+
+
+def _count_values(values) -> dict[str, int]:
+    # Each distinct value gets an identifier, and the column of identifiers is counted
+    index: dict[str, int] = {}
+    identifiers = array(
+        "I",
+        (index.setdefault(str(value), len(index)) for value in values if value is not None),
+    )
+    names = list(index)
+    return {names[identifier]: count for identifier, count in Counter(identifiers).items()}
+
+
+def _rows(statistic: Statistic, counter: Counter) -> list[tuple[str, int]]:
+    if not statistic.per_year:
+        return sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+    # From the most recent year (as `modules.group_per_year`)
+    return [(str(year), count) for year, count in sorted(counter.items(), reverse=True)]
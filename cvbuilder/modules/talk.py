@@ -20,6 +20,13 @@ class Talk(modules.Data):
     video: str = None
     style: contexts.latex.Style = None
 
+    def search_fields(self) -> dict[str, Any]:
+        return {
+            "title": self.title,
+            "venue": self.conference,
+            "year": None if self.date is None else self.date.year,
+        }
+
     def to_latex(self, context: contexts.latex.LaTeXContext) -> str:
         latex = "\\talk{\n"
         latex += context.format_variable("date", context.format_date(self.date))
@@ -75,6 +82,9 @@ class TalkModule(modules.Module):
     """Talk module.
 
     Talks are automatically sorted by their date, and grouped together by year.
+
+    With `columnar=True`, the talks are stored in columns (see `modules.columns`),
+    and grouped per year without creating the data instances.
     """
 
     def __init__(
@@ -84,6 +94,7 @@ class TalkModule(modules.Module):
         introduction_text: str = "",
         icon: str = "iconoir-sound-high",
         use_subsections: bool = True,
+        columnar: bool = False,
     ) -> None:
         super().__init__(
             level=level,
@@ -92,8 +103,19 @@ class TalkModule(modules.Module):
             use_subsections=use_subsections,
             introduction_text=introduction_text,
         )
+        self.columnar = columnar
 
     def load(self, json_value: list[dict[str, Any]]) -> None:
+        if self.columnar:
+            table = modules.columns.RecordTable(
+                Talk, map(self._values, json_value), date_fields=("date",)
+            )
+            if self.use_subsections:
+                self.data = table.group_per_year("date")
+            else:
+                self.data.append((None, table.view()))
+            return
+
         talks = list(map(self._load, json_value))
 
         if self.use_subsections:
@@ -106,6 +128,9 @@ class TalkModule(modules.Module):
             self.data.append((None, talks))
 
     def _load(self, json_object) -> Talk:
+        return Talk(**self._values(json_object))
+
+    def _values(self, json_object) -> dict[str, Any]:
         date = (
             dateutil.parser.parse(json_object["date"])
             if "date" in json_object
@@ -121,15 +146,15 @@ class TalkModule(modules.Module):
             if "style" in json_object
             else Talk.style
         )
-        return Talk(
-            date=date,
-            title=title,
-            conference=conference,
-            where=where,
-            pdf=pdf,
-            video=video,
-            style=style,
-        )
+        return {
+            "date": date,
+            "title": title,
+            "conference": conference,
+            "where": where,
+            "pdf": pdf,
+            "video": video,
+            "style": style,
+        }
 
     def _get_class_name(self) -> str:
         return "talks"
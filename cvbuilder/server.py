@@ -0,0 +1,266 @@
+"""
+A long-running render server, keeping a configured builder warm between requests.
+
+Spawning a new Python process for every CV to render costs the imports of every module and context,
+as well as the Markdown conversions that were already computed for previous requests.
+The server instead keeps a configured `Builder` (the *template*) in memory and renders CVs on demand,
+without writing anything to the disk.
+
+The protocol is a small HTTP API:
+
+  - `POST /render` with a JSON body `{"cv": ..., "contexts": [...]}`, where `cv` is a JSON document
+    (or a list of JSON documents) following the schema, and `contexts` is an optional list of output paths
+    (or output file names) selecting the contexts to render. Another value of `contexts` is rejected (status 400).
+    The response is a JSON object `{"outputs": {path: contents}, "time": seconds}`.
+  - `GET /stats` returns the request timing metrics and the statistics of the caches.
+
+The server can listen on a TCP port or on a Unix socket (see `serve`).
+"""
+
+from __future__ import annotations
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from . import Builder
+from .modules import description
+
+
+class RenderStatistics:
+    """Timing metrics of the requests handled by a render server."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.rejected = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, duration: float, error: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            if error:
+                self.errors += 1
+            self.total_time += duration
+            self.max_time = max(self.max_time, duration)
+
+    def record_rejection(self) -> None:
+        with self._lock:
+            self.rejected += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "rejected": self.rejected,
+                "total_time": self.total_time,
+                "mean_time": self.total_time / self.requests if self.requests else 0.0,
+                "max_time": self.max_time,
+            }
+
+
+class RenderService:
+    """Renders CVs from JSON documents using a warm builder template.
+
+    Each request is rendered with a fork of the template (see `Builder.render`), such that the data of one CV
+    never leaks into another.
+    At most `max_concurrency` renders run at the same time; further requests wait up to `queue_timeout` seconds.
+    """
+
+    def __init__(
+        self, template: Builder, max_concurrency: int = 4, queue_timeout: float = 30
+    ) -> None:
+        self.template = template
+        self.queue_timeout = queue_timeout
+        self.max_concurrency = max_concurrency
+        self.statistics = RenderStatistics()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def render(
+        self,
+        json_documents: dict[str, Any] | list[dict[str, Any]],
+        names: list[str] = None,
+    ) -> dict[str, str]:
+        """Renders the given JSON document(s).
+
+        Args:
+            json_documents: The JSON document(s) of the CV.
+            names: The output paths (or output file names) of the contexts to render. If None, every context is rendered.
+
+        Raises:
+            TimeoutError: if no render slot became available in time.
+
+        Returns:
+            A dictionary mapping the output path of each rendered context to its contents.
+        """
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self.statistics.record_rejection()
+            raise TimeoutError("Render server: too many concurrent requests")
+
+        start = time.perf_counter()
+        error = True
+        try:
+            outputs = self.template.render(json_documents, names)
+            error = False
+            return outputs
+        finally:
+            self.statistics.record(time.perf_counter() - start, error)
+            self._slots.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Returns the timing metrics and the cache statistics."""
+        markdown_cache = description.cache_info()
+        return {
+            "requests": self.statistics.as_dict(),
+            "max_concurrency": self.max_concurrency,
+            "caches": {
+                "markdown": {
+                    "hits": markdown_cache.hits,
+                    "misses": markdown_cache.misses,
+                    "size": markdown_cache.currsize,
+                    "max_size": markdown_cache.maxsize,
+                }
+            },
+        }
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler of the render server. The service is available as `self.server.service`."""
+
+    server_version = "cvbuilder"
+
+    def do_GET(self) -> None:  # pylint: disable = invalid-name
+        if self.path != "/stats":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown path"})
+            return
+        self._send_json(HTTPStatus.OK, self.server.service.stats())
+
+    def do_POST(self) -> None:  # pylint: disable = invalid-name
+        if self.path != "/render":
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown path"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            cv = request["cv"]
+            names = request.get("contexts")
+            if names is not None and not (
+                isinstance(names, list) and all(isinstance(name, str) for name in names)
+            ):
+                raise TypeError("'contexts' must be a list of strings")
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": f"invalid request: {exc}"})
+            return
+
+        start = time.perf_counter()
+        try:
+            outputs = self.server.service.render(cv, names)
+        except TimeoutError as exc:
+            self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(exc)})
+            return
+        except Exception as exc:  # pylint: disable = broad-exception-caught
+            self._send_json(
+                HTTPStatus.UNPROCESSABLE_ENTITY,
+                {"error": f"{exc.__class__.__name__}: {exc}"},
+            )
+            return
+
+        self._send_json(
+            HTTPStatus.OK, {"outputs": outputs, "time": time.perf_counter() - start}
+        )
+
+    def address_string(self) -> str:
+        # Unix sockets do not have a client address
+        if isinstance(self.client_address, tuple):
+            return super().address_string()
+        return "unix"
+
+    def log_message(self, format: str, *args) -> None:  # pylint: disable = redefined-builtin
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: HTTPStatus, value: Any) -> None:
+        body = json.dumps(value).encode("UTF8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class RenderHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding a render service."""
+
+    def __init__(self, address: tuple[str, int], service: RenderService, quiet: bool = False) -> None:
+        super().__init__(address, RenderRequestHandler)
+        self.service = service
+        self.quiet = quiet
+
+
+class RenderUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threaded HTTP server holding a render service, listening on a Unix socket."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: Path | str, service: RenderService, quiet: bool = False) -> None:
+        super().__init__(str(socket_path), RenderRequestHandler)
+        self.service = service
+        self.quiet = quiet
+
+    def server_bind(self) -> None:
+        socketserver.UnixStreamServer.server_bind(self)
+        # BaseHTTPRequestHandler expects these attributes
+        self.server_name = socket.gethostname()
+        self.server_port = 0
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            os.unlink(self.server_address)
+        except OSError:
+            pass
+
+
+def serve(
+    template: Builder,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    socket_path: Path | str = None,
+    max_concurrency: int = 4,
+    quiet: bool = False,
+) -> None:
+    """Starts a render server and serves requests until interrupted.
+
+    Args:
+        template: The configured builder, whose contexts and modules are used for every request.
+        host: The host to listen on (ignored if `socket_path` is given).
+        port: The TCP port to listen on (ignored if `socket_path` is given).
+        socket_path: If not None, the server listens on this Unix socket instead of a TCP port.
+        max_concurrency: The maximal number of CVs rendered at the same time.
+        quiet: Whether to disable the logging of requests.
+    """
+    service = RenderService(template, max_concurrency)
+    if socket_path is None:
+        server = RenderHTTPServer((host, port), service, quiet)
+        where = f"http://{host}:{server.server_port}"
+    else:
+        server = RenderUnixServer(socket_path, service, quiet)
+        where = f"unix:{socket_path}"
+
+    print(f"Render server: listening on {where}", file=sys.stderr)
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
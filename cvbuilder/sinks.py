@@ -0,0 +1,411 @@
+"""
+Output sinks: where the contexts write their output files (see `Builder.set_sink`).
+
+By default, a context writes each output file on the filesystem, at its output path.
+With a sink, the output files are given to the sink instead:
+
+  - `FileSystemSink` writes them on the filesystem, creating each directory only once;
+  - `MemorySink` keeps them in a dictionary (e.g., for tests, or to send them elsewhere);
+  - `ZipSink` and `TarSink` stream them into a single archive (`.zip`, or `.tar.gz`) through a large write buffer,
+    such that a whole batch of CVs produces one file, written with a few large writes, and shipped in one transfer.
+
+In an archive (and in a `MemorySink`), the name of a file is its path relative to the `root` of the sink.
+The archives are reproducible: the entries are written in the order they are received, with a fixed timestamp.
+Every sink can be shared by multiple threads (e.g., the forks of a builder in a batch).
+
+A `BackgroundWriter` wraps another sink, and performs its writes (and the compression of the sidecars, if any)
+in a background thread, while the contexts render the next documents.
+The rendered documents waiting to be written are bounded, such that a slow disk blocks the rendering instead of
+filling the memory. `Builder.build` waits for the writes of its documents, and raises the errors of these writes.
+The files are tracked per thread, or per write group (see `write_group`) such as an asynchronous build
+(`Builder.abuild`) and the threads it starts.
+
+The HTML assets (see `contexts.html.AssetPipeline`) are given to the sink as well, once per sink.
+"""
+
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Iterator
+import contextvars
+import gzip
+import io
+import os
+import tarfile
+import threading
+import zipfile
+
+if TYPE_CHECKING:
+    from .contexts.compression import Precompression
+
+# The size of the write buffer of the archives
+BUFFER_SIZE = 1 << 20
+
+# The write group of the current context, if any (see `write_group`)
+_WRITE_GROUP: contextvars.ContextVar[object] = contextvars.ContextVar("cvbuilder_write_group", default=None)
+
+# The timestamp of the entries of the archives (the earliest date of a zip file)
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+_TAR_MTIME = 315532800
+
+
+class WriteError(OSError):
+    """Raised when output files could not be written. The paths and the errors are in `errors`."""
+
+    def __init__(self, errors: list[tuple[Path, BaseException]]) -> None:
+        self.errors = errors
+        shown = "\n".join(f"  {path}: {error}" for path, error in errors[:20])
+        more = f"\n  ... and {len(errors) - 20} more" if len(errors) > 20 else ""
+        super().__init__(f"{len(errors)} file(s) could not be written:\n{shown}{more}")
+
+
+class OutputSink(ABC):
+    """Receives the output files of the contexts."""
+
+    def __init__(self, root: Path | str = ".") -> None:
+        """Initializes the sink.
+
+        Arguments:
+            root -- The directory the names of the files are relative to
+        """
+        self.root = Path(os.path.abspath(root))
+        # The names are computed from absolute paths as strings, without accessing the filesystem
+        self._prefix = os.path.join(str(self.root), "")
+        self.files_written = 0
+        self.bytes_written = 0
+
+    @abstractmethod
+    def write(self, path: Path, data: bytes) -> None:
+        """Writes an output file.
+
+        Arguments:
+            path -- The output path of the file
+            data -- The contents of the file
+        """
+
+    def write_file(self, path: Path, data: bytes, precompression: Precompression = None) -> None:
+        """Writes an output file and, if needed, its compressed sidecars (see `contexts.compression`).
+
+        Arguments:
+            path -- The output path of the file
+            data -- The contents of the file
+            precompression -- If not None, the compression of the sidecars
+        """
+        self.write(path, data)
+        if precompression is not None:
+            for sidecar, compressed in precompression.compress(path, data):
+                self.write(sidecar, compressed)
+
+    def flush(self) -> None:
+        """Waits until the files given by the current thread (or write group, see `write_group`) are written.
+
+        Raises:
+            WriteError -- if some of these files could not be written
+        """
+
+    def close(self) -> None:
+        """Finishes writing the files (e.g., writes the end of an archive). The sink can not be used anymore."""
+
+    def name(self, path: Path | str) -> str:
+        """The name of a file in the sink: its path relative to the root, with `/` separators.
+
+        Raises:
+            ValueError -- if the path is not inside the root
+        """
+        absolute = os.path.abspath(path)
+        if not absolute.startswith(self._prefix):
+            raise ValueError(f"Output sink: {path} is not inside {self.root}")
+        return absolute[len(self._prefix) :].replace(os.sep, "/")
+
+    def __enter__(self) -> OutputSink:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def _count(self, data: bytes) -> None:
+        self.files_written += 1
+        self.bytes_written += len(data)
+
+
+class FileSystemSink(OutputSink):
+    """Writes the files on the filesystem, at their output paths.
+
+    The directories already created by the sink are remembered, such that each of them is created once.
+    """
+
+    def __init__(self, root: Path | str = ".", atomic: bool = False) -> None:
+        """Initializes the sink.
+
+        Arguments:
+            root -- The directory the names of the files are relative to
+            atomic -- Whether each file is written to a temporary file, then renamed.
+                      A reader (e.g., a web server) then never sees a partially written file
+        """
+        super().__init__(root)
+        self.atomic = atomic
+        self._directories: set[Path] = set()
+        self._lock = threading.Lock()
+
+    def write(self, path: Path, data: bytes) -> None:
+        path = Path(path)
+        directory = path.parent
+        if directory not in self._directories:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._directories.add(directory)
+        if self.atomic:
+            temporary = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            try:
+                temporary.write_bytes(data)
+                os.replace(temporary, path)
+            except BaseException:
+                temporary.unlink(missing_ok=True)
+                raise
+        else:
+            path.write_bytes(data)
+        with self._lock:
+            self._count(data)
+
+
+class MemorySink(OutputSink):
+    """Keeps the files in memory, in `files` (a dictionary from the name of each file to its contents)."""
+
+    def __init__(self, root: Path | str = ".") -> None:
+        super().__init__(root)
+        self.files: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def write(self, path: Path, data: bytes) -> None:
+        name = self.name(path)
+        with self._lock:
+            self.files[name] = data
+            self._count(data)
+
+    def read_text(self, name: str) -> str:
+        """The contents of a file, decoded."""
+        return self.files[name].decode("UTF8")
+
+
+class ZipSink(OutputSink):
+    """Streams the files into a zip archive."""
+
+    def __init__(
+        self,
+        archive_path: Path | str,
+        root: Path | str = ".",
+        compresslevel: int = 6,
+        compression: int = zipfile.ZIP_DEFLATED,
+    ) -> None:
+        """Creates the archive.
+
+        Arguments:
+            archive_path -- The path of the zip archive
+            root -- The directory the names of the files are relative to
+            compresslevel -- The compression level, between 0 and 9
+            compression -- The compression method (see `zipfile`)
+        """
+        super().__init__(root)
+        self.archive_path = Path(archive_path)
+        self.compresslevel = compresslevel
+        self.compression = compression
+        self._file = _open_buffered(self.archive_path)
+        self._archive = zipfile.ZipFile(self._file, "w")
+        self._lock = threading.Lock()
+
+    def write(self, path: Path, data: bytes) -> None:
+        info = zipfile.ZipInfo(self.name(path), date_time=_ZIP_DATE_TIME)
+        info.compress_type = self.compression
+        info.external_attr = 0o644 << 16
+        with self._lock:
+            self._archive.writestr(info, data, compresslevel=self.compresslevel)
+            self._count(data)
+
+    def close(self) -> None:
+        with self._lock:
+            self._archive.close()
+            self._file.close()
+
+
+class TarSink(OutputSink):
+    """Streams the files into a gzip-compressed tar archive (`.tar.gz`)."""
+
+    def __init__(
+        self,
+        archive_path: Path | str,
+        root: Path | str = ".",
+        compresslevel: int = 6,
+    ) -> None:
+        """Creates the archive.
+
+        Arguments:
+            archive_path -- The path of the tar archive
+            root -- The directory the names of the files are relative to
+            compresslevel -- The gzip compression level, between 0 and 9
+        """
+        super().__init__(root)
+        self.archive_path = Path(archive_path)
+        self.compresslevel = compresslevel
+        self._file = _open_buffered(self.archive_path)
+        # mtime=0 makes the gzip stream reproducible
+        self._compressed = gzip.GzipFile(
+            filename="", mode="wb", compresslevel=compresslevel, fileobj=self._file, mtime=0
+        )
+        # The small blocks of tarfile (headers, padding) are compressed in large chunks
+        self._buffer = io.BufferedWriter(self._compressed, BUFFER_SIZE)
+        self._archive = tarfile.open(fileobj=self._buffer, mode="w", format=tarfile.PAX_FORMAT)
+        self._lock = threading.Lock()
+
+    def write(self, path: Path, data: bytes) -> None:
+        info = tarfile.TarInfo(self.name(path))
+        info.size = len(data)
+        info.mtime = _TAR_MTIME
+        info.mode = 0o644
+        with self._lock:
+            self._archive.addfile(info, io.BytesIO(data))
+            self._count(data)
+
+    def close(self) -> None:
+        with self._lock:
+            self._archive.close()
+            self._buffer.close()
+            self._file.close()
+
+
+class BackgroundWriter(OutputSink):
+    """Writes the files with another sink, in a background thread.
+
+    The files given by a thread are written in order. When the files waiting to be written reach `max_pending_bytes`,
+    giving another file blocks until enough files are written (backpressure).
+    The errors are reported to the thread (or the write group, see `write_group`) that gave the files, by `flush`
+    (called at the end of `Builder.build` and `Builder.abuild`).
+    """
+
+    def __init__(self, sink: OutputSink, max_pending_bytes: int = 64 << 20) -> None:
+        """Starts the background thread.
+
+        Arguments:
+            sink -- The sink performing the writes
+            max_pending_bytes -- The maximal size of the files waiting to be written.
+                                 A larger file is still accepted, once every other file is written
+        """
+        super().__init__(sink.root)
+        self.sink = sink
+        self.max_pending_bytes = max_pending_bytes
+        self._queue: deque[tuple[object, Path, bytes, Precompression]] = deque()
+        self._pending_bytes = 0
+        # For each thread (or write group): the number of its files not written yet, and its write errors
+        self._pending: dict[object, int] = {}
+        self._errors: dict[object, list[tuple[Path, BaseException]]] = {}
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="cvbuilder-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, path: Path, data: bytes) -> None:
+        self.write_file(path, data)
+
+    def write_file(self, path: Path, data: bytes, precompression: Precompression = None) -> None:
+        group = _current_group()
+        with self._condition:
+            if self._closed:
+                raise ValueError("Background writer: the writer is closed")
+            while self._pending_bytes > 0 and self._pending_bytes + len(data) > self.max_pending_bytes:
+                self._condition.wait()
+            self._queue.append((group, Path(path), data, precompression))
+            self._pending_bytes += len(data)
+            self._pending[group] = self._pending.get(group, 0) + 1
+            self._count(data)
+            self._condition.notify_all()
+
+    def flush(self) -> None:
+        group = _current_group()
+        with self._condition:
+            while self._pending.get(group, 0) > 0:
+                self._condition.wait()
+            self._pending.pop(group, None)
+            errors = self._errors.pop(group, [])
+        if len(errors) > 0:
+            raise WriteError(errors)
+
+    def close(self) -> None:
+        """Writes the remaining files, stops the background thread, and closes the sink.
+
+        Raises:
+            WriteError -- if some files could not be written, and their errors were not reported by `flush`
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+        self.sink.close()
+        with self._condition:
+            errors = [error for group_errors in self._errors.values() for error in group_errors]
+            self._errors.clear()
+        if len(errors) > 0:
+            raise WriteError(errors)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while len(self._queue) == 0 and not self._closed:
+                    self._condition.wait()
+                if len(self._queue) == 0:
+                    return
+                group, path, data, precompression = self._queue.popleft()
+            error = None
+            try:
+                self.sink.write_file(path, data, precompression)
+            except Exception as exc:  # pylint: disable = broad-exception-caught
+                error = exc
+            with self._condition:
+                self._pending_bytes -= len(data)
+                self._pending[group] -= 1
+                if error is not None:
+                    self._errors.setdefault(group, []).append((path, error))
+                self._condition.notify_all()
+
+
+@contextmanager
+def write_group() -> Iterator[None]:
+    """Groups the files given to the sinks in the current context, until the end of the `with` block.
+
+    The group follows the context into the threads started by `asyncio.to_thread` (and into the functions run by
+    `contextvars.copy_context().run`), such that `OutputSink.flush` waits for the files given by all of them.
+    """
+    token = _WRITE_GROUP.set(object())
+    try:
+        yield
+    finally:
+        _WRITE_GROUP.reset(token)
+
+
+def open_sink(target: Path | str, root: Path | str = ".") -> OutputSink:
+    """Creates the sink writing to a target, chosen by its name.
+
+    Arguments:
+        target -- A `.zip` file, or a `.tar.gz` (or `.tgz`) file. Otherwise, the files are written on the filesystem
+        root -- The directory the names of the files are relative to
+
+    Returns:
+        The sink
+    """
+    name = Path(target).name
+    if name.endswith(".zip"):
+        return ZipSink(target, root)
+    if name.endswith((".tar.gz", ".tgz")):
+        return TarSink(target, root)
+    return FileSystemSink(root)
+
+
+def _current_group() -> object:
+    group = _WRITE_GROUP.get()
+    return threading.get_ident() if group is None else group
+
+
+def _open_buffered(path: Path) -> BinaryIO:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.open("wb", buffering=BUFFER_SIZE)
@@ -0,0 +1,126 @@
+"""
+Binary snapshots of the data loaded by the modules of a builder.
+
+Loading a CV means parsing the JSON files and constructing every data instance (and its descriptions).
+When neither the JSON files nor the configuration of the builder changed since the previous build,
+the loaded state can instead be restored from a snapshot (a pickle file).
+
+A snapshot is identified by the configuration of the builder (contexts, modules and their options),
+and records the digests of the JSON files and the versions of `cvbuilder` and of the snapshot format.
+A snapshot that does not match is ignored, and replaced after the build.
+
+Warning:
+    Snapshots are pickle files: only use a cache directory that is not writable by untrusted users.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+import hashlib
+import os
+import pickle
+import threading
+
+if TYPE_CHECKING:
+    from . import Builder
+    from .contexts import PersonalData
+
+SNAPSHOT_VERSION = 1
+
+
+class SnapshotCache:
+    """A directory of snapshots, one per builder configuration."""
+
+    def __init__(self, directory: Path | str) -> None:
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def restore(
+        self, builder: Builder, json_contents: list[bytes]
+    ) -> tuple[bool, PersonalData]:
+        """Restores the data of the modules of the builder, if the snapshot matches.
+
+        Args:
+            builder: The builder.
+            json_contents: The raw contents of the JSON files.
+
+        Returns:
+            Whether the snapshot was restored, and the personal data it contains.
+        """
+        path = self._path(builder)
+        try:
+            with path.open("rb") as file:
+                snapshot = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            self.misses += 1
+            return False, None
+
+        if snapshot.get("key") != self._key(json_contents):
+            self.misses += 1
+            return False, None
+
+        for context, modules_data in zip(builder.contexts, snapshot["data"]):
+            for descriptor, data in zip(context.modules, modules_data):
+                descriptor.module.data = data
+        self.hits += 1
+        return True, snapshot["personal"]
+
+    def store(
+        self, builder: Builder, json_contents: list[bytes], personal: PersonalData
+    ) -> None:
+        """Writes the snapshot of the data of the modules of the builder.
+
+        Args:
+            builder: The builder, whose modules are loaded.
+            json_contents: The raw contents of the JSON files.
+            personal: The personal data.
+        """
+        snapshot = {
+            "key": self._key(json_contents),
+            "personal": personal,
+            "data": [
+                [descriptor.module.data for descriptor in context.modules]
+                for context in builder.contexts
+            ],
+        }
+        path = self._path(builder)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Forks of a builder share the cache, and may store the same snapshot at the same time
+        temporary = path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+        with temporary.open("wb") as file:
+            pickle.dump(snapshot, file, protocol=pickle.HIGHEST_PROTOCOL)
+        temporary.replace(path)
+
+    def _path(self, builder: Builder) -> Path:
+        return self.directory / f"snapshot-{configuration_digest(builder)[:16]}.pickle"
+
+    @staticmethod
+    def _key(json_contents: list[bytes]) -> tuple[Any, ...]:
+        # pylint: disable = import-outside-toplevel
+        from . import __version__
+
+        return (
+            SNAPSHOT_VERSION,
+            __version__,
+            tuple(hashlib.sha256(contents).hexdigest() for contents in json_contents),
+        )
+
+
+def configuration_digest(builder: Builder) -> str:
+    """Computes a digest of the contexts and modules of a builder (excluding the loaded data)."""
+    sha = hashlib.sha256(builder.personal_key.encode("UTF8"))
+    for context in builder.contexts:
+        sha.update(f"{type(context).__qualname__}:{context.output_path}\0".encode("UTF8"))
+        for descriptor in context.modules:
+            state = {
+                key: value
+                for key, value in vars(descriptor.module).items()
+                if key != "data"
+            }
+            sha.update(
+                f"{descriptor.in_json}:{descriptor.category}:{type(descriptor.module).__qualname__}:{state!r}\0".encode(
+                    "UTF8"
+                )
+            )
+    return sha.hexdigest()
@@ -0,0 +1,330 @@
+"""
+Validation of the JSON documents against a JSON Schema (e.g., the `schema.json` of this repository).
+
+The schema is compiled once into a tree of small checking functions, and the compiled validator is cached
+(per schema file, until the file changes; see `load_validator`).
+The supported keywords are the ones used by `schema.json`: `type`, `properties`, `additionalProperties`, `required`,
+`items`, `oneOf`, and local references (`$ref` to `#/...`). The annotations (`description`, `title`, etc.) are ignored,
+and any other keyword is rejected when compiling the schema.
+
+Every violation of a document is reported, with the JSON pointer (RFC 6901) of the invalid value.
+The sections of a document (the values of its top-level keys) can be checked in parallel.
+"""
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable
+import functools
+import json
+
+_ANNOTATIONS = {"$schema", "$id", "title", "description", "definitions", "default", "examples", "$comment"}
+_KEYWORDS = {"type", "properties", "additionalProperties", "required", "items", "oneOf", "$ref"}
+
+# The Python types of the JSON types (bool is a subclass of int, and is excluded from integer and number)
+_TYPES: dict[str, tuple[type, ...]] = {
+    "null": (type(None),),
+    "boolean": (bool,),
+    "integer": (int,),
+    "number": (int, float),
+    "string": (str,),
+    "array": (list,),
+    "object": (dict,),
+}
+
+
+@dataclass(frozen=True)
+class Violation:
+    """A value of a document that does not satisfy the schema."""
+
+    pointer: str
+    message: str
+    source: str = None
+
+    def __str__(self) -> str:
+        location = self.pointer or "/"
+        if self.source is not None:
+            location = f"{self.source}: {location}"
+        return f"{location}: {self.message}"
+
+
+class ValidationError(ValueError):
+    """Raised when documents do not satisfy the schema. All the violations are in `violations`."""
+
+    def __init__(self, violations: list[Violation]) -> None:
+        self.violations = violations
+        shown = "\n".join(f"  {violation}" for violation in violations[:20])
+        more = f"\n  ... and {len(violations) - 20} more" if len(violations) > 20 else ""
+        super().__init__(f"{len(violations)} schema violation(s):\n{shown}{more}")
+
+
+# The location of a value: None for the document, or the location of its parent and its key (or index).
+# The JSON pointer is only formatted when a violation is found
+Location = tuple | None
+
+# A compiled check appends the violations of a value (at a location) to a list
+Check = Callable[[Any, Location, list[Violation]], None]
+
+
+class Validator:
+    """A compiled JSON Schema."""
+
+    def __init__(self, schema: dict[str, Any]) -> None:
+        """Compiles a schema.
+
+        Arguments:
+            schema -- The schema
+
+        Raises:
+            ValueError -- if the schema uses an unsupported keyword, or a reference can not be resolved
+        """
+        compiler = _Compiler(schema)
+        properties = schema.get("properties", {})
+        # The sections are checked separately (and maybe in parallel): the check of the document itself
+        # only looks at its keys
+        self._document_check = compiler.compile(
+            {**schema, "properties": {key: {} for key in properties}}
+        )
+        self._section_checks = {
+            key: compiler.compile(section) for key, section in properties.items()
+        }
+
+    def violations(
+        self, document: Any, source: str = None, workers: int = 1
+    ) -> list[Violation]:
+        """Checks a document.
+
+        Arguments:
+            document -- The JSON document
+            source -- The name of the document (e.g., its path) given to the violations
+            workers -- The number of threads checking the sections of the document
+
+        Returns:
+            The violations, in the order of the sections of the document
+        """
+        violations: list[Violation] = []
+        self._document_check(document, None, violations)
+        if isinstance(document, dict):
+            sections = [
+                (key, value)
+                for key, value in document.items()
+                if key in self._section_checks
+            ]
+            if workers > 1 and len(sections) > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    results = executor.map(lambda section: self._check_section(*section), sections)
+                    for section_violations in results:
+                        violations += section_violations
+            else:
+                for key, value in sections:
+                    violations += self._check_section(key, value)
+        if source is not None:
+            violations = [
+                Violation(violation.pointer, violation.message, source)
+                for violation in violations
+            ]
+        return violations
+
+    def validate(self, documents: list[tuple[str, Any]], workers: int = 1) -> None:
+        """Checks documents, and raises an error listing every violation.
+
+        Arguments:
+            documents -- Pairs of a name (e.g., a path) and a JSON document
+            workers -- The number of threads checking the sections of each document
+
+        Raises:
+            ValidationError -- if a document does not satisfy the schema
+        """
+        violations = []
+        for source, document in documents:
+            violations += self.violations(document, source, workers)
+        if len(violations) > 0:
+            raise ValidationError(violations)
+
+    def _check_section(self, key: str, value: Any) -> list[Violation]:
+        violations: list[Violation] = []
+        self._section_checks[key](value, (None, key), violations)
+        return violations
+
+
+@functools.lru_cache(maxsize=8)
+def _cached_validator(path: Path, _mtime_ns: int, _size: int) -> Validator:
+    with path.open(encoding="UTF8") as file:
+        return Validator(json.load(file))
+
+
+def load_validator(schema_path: Path | str) -> Validator:
+    """Loads and compiles a schema file, or returns the validator already compiled for this file (unless it changed).
+
+    Arguments:
+        schema_path -- The path of the schema
+
+    Returns:
+        The validator
+    """
+    path = Path(schema_path).resolve()
+    stat = path.stat()
+    return _cached_validator(path, stat.st_mtime_ns, stat.st_size)
+
+
+def _pointer(location: Location) -> str:
+    keys = []
+    while location is not None:
+        location, key = location
+        keys.append(str(key).replace("~", "~0").replace("/", "~1"))
+    return "".join("/" + key for key in reversed(keys))
+
+
+def _type_name(value: Any) -> str:
+    return next(
+        (name for name, types in _TYPES.items() if isinstance(value, types)),
+        type(value).__name__,
+    )
+
+
+def _no_check(_value: Any, _location: Location, _violations: list[Violation]) -> None:
+    pass
+
+
+class _Compiler:
+    def __init__(self, root: dict[str, Any]) -> None:
+        self.root = root
+        self.references: dict[str, Check] = {}
+
+    def compile(self, schema: dict[str, Any] | bool) -> Check:
+        if schema is True:
+            return _no_check
+        if schema is False:
+            return lambda value, path, violations: violations.append(
+                Violation(_pointer(path), "no value is allowed")
+            )
+        unsupported = schema.keys() - _KEYWORDS - _ANNOTATIONS
+        if len(unsupported) > 0:
+            raise ValueError(f"Schema: unsupported keyword(s) {', '.join(sorted(unsupported))}")
+
+        checks = []
+        if "$ref" in schema:
+            checks.append(self._reference(schema["$ref"]))
+        if "type" in schema:
+            checks.append(self._type(schema["type"]))
+        if schema.keys() & {"properties", "additionalProperties", "required"}:
+            checks.append(self._object(schema))
+        if "items" in schema:
+            checks.append(self._items(schema["items"]))
+        if "oneOf" in schema:
+            checks.append(self._one_of(schema["oneOf"]))
+
+        if len(checks) == 0:
+            return _no_check
+        if len(checks) == 1:
+            return checks[0]
+
+        def check(value: Any, path: Location, violations: list[Violation]) -> None:
+            for subcheck in checks:
+                subcheck(value, path, violations)
+
+        return check
+
+    def _reference(self, reference: str) -> Check:
+        if reference not in self.references:
+            if not reference.startswith("#"):
+                raise ValueError(f"Schema: only local references are supported ({reference})")
+            target = self.root
+            for part in reference[1:].split("/")[1:]:
+                part = part.replace("~1", "/").replace("~0", "~")
+                try:
+                    target = target[part]
+                except (KeyError, TypeError) as exc:
+                    raise ValueError(f"Schema: unresolved reference {reference}") from exc
+            # The target may refer to itself: the compiled check is looked up when called
+            compiled: list[Check] = []
+            self.references[reference] = lambda value, path, violations: compiled[0](
+                value, path, violations
+            )
+            compiled.append(self.compile(target))
+        return self.references[reference]
+
+    def _type(self, types: str | list[str]) -> Check:
+        if isinstance(types, str):
+            types = [types]
+        unknown = [name for name in types if name not in _TYPES]
+        if len(unknown) > 0:
+            raise ValueError(f"Schema: unknown type(s) {', '.join(unknown)}")
+        python_types = tuple(python_type for name in types for python_type in _TYPES[name])
+        exclude_bool = "boolean" not in types
+        expected = " or ".join(types)
+
+        def check(value: Any, path: Location, violations: list[Violation]) -> None:
+            if not isinstance(value, python_types) or (exclude_bool and value.__class__ is bool):
+                violations.append(Violation(_pointer(path), f"expected {expected}, got {_type_name(value)}"))
+
+        return check
+
+    def _object(self, schema: dict[str, Any]) -> Check:
+        properties = {key: self.compile(value) for key, value in schema.get("properties", {}).items()}
+        required = schema.get("required", [])
+        additional = schema.get("additionalProperties", True)
+        additional_check = None if isinstance(additional, bool) else self.compile(additional)
+
+        def check(value: Any, path: Location, violations: list[Violation]) -> None:
+            if not isinstance(value, dict):
+                return
+            for key in required:
+                if key not in value:
+                    violations.append(Violation(_pointer(path), f"missing required property '{key}'"))
+            for key, item in value.items():
+                property_check = properties.get(key)
+                if property_check is not None:
+                    property_check(item, (path, key), violations)
+                elif additional_check is not None:
+                    additional_check(item, (path, key), violations)
+                elif additional is False:
+                    violations.append(Violation(_pointer(path), f"unexpected property '{key}'"))
+
+        return check
+
+    def _items(self, items: dict[str, Any]) -> Check:
+        item_check = self.compile(items)
+
+        def check(value: Any, path: Location, violations: list[Violation]) -> None:
+            if not isinstance(value, list):
+                return
+            for index, item in enumerate(value):
+                item_check(item, (path, index), violations)
+
+        return check
+
+    def _one_of(self, alternatives: list[dict[str, Any]]) -> Check:
+        checks = [self.compile(alternative) for alternative in alternatives]
+
+        def check(value: Any, path: Location, violations: list[Violation]) -> None:
+            results = []
+            for alternative in checks:
+                alternative_violations: list[Violation] = []
+                alternative(value, path, alternative_violations)
+                results.append(alternative_violations)
+            valid = sum(1 for result in results if len(result) == 0)
+            if valid == 1:
+                return
+            pointer = _pointer(path)
+            if valid > 1:
+                violations.append(Violation(pointer, "matches more than one alternative (oneOf)"))
+                return
+            # The violations of the alternatives accepting the type of the value
+            candidates = [
+                result
+                for result in results
+                if not any(
+                    violation.pointer == pointer and violation.message.startswith("expected ")
+                    for violation in result
+                )
+            ]
+            if len(candidates) == 0:
+                messages = "; ".join(result[0].message for result in results)
+                violations.append(Violation(pointer, f"matches no alternative ({messages})"))
+            else:
+                violations.extend(min(candidates, key=len))
+
+        return check
+
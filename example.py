@@ -1,8 +1,6 @@
-import shutil
-
 from cvbuilder import Builder
 from cvbuilder.contexts.latex import LaTeXContext, Style
-from cvbuilder.contexts.html import HTMLContext
+from cvbuilder.contexts.html import AssetPipeline, HTMLContext
 from cvbuilder.contexts.markdown import MarkdownContext
 from cvbuilder.modules.text import TextModule
 from cvbuilder.modules.job import JobModule
@@ -15,18 +13,21 @@ from cvbuilder.modules.summary import SummaryModule
 from cvbuilder.modules.logos import LogosModule
 from cvbuilder.modules.event import EventModule
 from cvbuilder.modules.award import AwardModule
-from cvbuilder.modules.services import ServiceModule
+from cvbuilder.modules.service import ServiceModule
 from cvbuilder.modules.language import LanguageModule
 from cvbuilder.modules.contact import ContactModule
 
-# Copy resources folder
-shutil.copytree("resources/", "output/html/resources/", dirs_exist_ok=True)
-
 builder = Builder()
+# The sidebar is rendered once, and reused on both HTML pages
+builder.share_fragments()
+
+# CSS files and images of the HTML pages are bundled and copied in output/html/assets/
+assets = AssetPipeline("output/html")
 
 # Main page of HTML
 main_html = HTMLContext("output/html/index.html")
 builder.register_context(main_html)
+main_html.set_asset_pipeline(assets)
 
 main_html.add_css_file("resources/css/style.css")
 main_html.add_css_file("resources/css/sidebar.css")
@@ -68,6 +69,7 @@ main_html.add_module(
 # HTML publications page
 publication_html = HTMLContext("output/html/publications.html")
 builder.register_context(publication_html)
+publication_html.set_asset_pipeline(assets)
 
 publication_html.set_title_fct(lambda personal: f"{personal.name} - Publications")
 publication_html.add_css_file("resources/css/style.css")
@@ -0,0 +1,38 @@
+import json
+from pathlib import Path
+
+from cvbuilder.aggregate import aggregate_publications, write_aggregated
+
+CVS = [
+    {"publications": [{"title": "A Paper", "year": 2020, "doi": "10.1/x"}, {"title": "B", "year": 2019}]},
+    {"publications": [{"title": "a paper!", "year": 2020, "pages": "1-2"}, {"title": "C", "year": 2021}]},
+]
+
+
+def _paths(tmp_path: Path) -> list[Path]:
+    paths = []
+    for index, cv in enumerate(CVS):
+        path = tmp_path / f"{index}.json"
+        path.write_text(json.dumps(cv), encoding="UTF8")
+        paths.append(path)
+    return paths
+
+
+def test_duplicates_are_merged_by_year(tmp_path):
+    aggregated = aggregate_publications(_paths(tmp_path))
+
+    assert aggregated["order"] == ["2021", "2020", "2019"]
+    # The first occurrence is kept, completed by its duplicate
+    assert aggregated["2020"] == [{"title": "A Paper", "year": 2020, "doi": "10.1/x", "pages": "1-2"}]
+
+
+def test_written_publications_match_the_aggregated_ones(tmp_path):
+    paths = _paths(tmp_path)
+    output = tmp_path / "out" / "publications.json"
+
+    assert write_aggregated(paths, output) == 3
+    assert json.loads(output.read_text(encoding="UTF8")) == {"publications": aggregate_publications(paths)}
+    write_aggregated(paths, output, per_year=False)
+    assert json.loads(output.read_text(encoding="UTF8")) == {
+        "publications": aggregate_publications(paths, per_year=False)
+    }
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from cvbuilder import Builder
+from cvbuilder.batch import BatchJob, build_batch
+from cvbuilder.contexts.markdown import MarkdownContext
+from cvbuilder.modules.job import JobModule
+from cvbuilder.sinks import MemorySink
+
+EXAMPLE = Path(__file__).parent.parent / "json_example" / "example.json"
+
+
+class FailingContext(MarkdownContext):
+    """Fails for the jobs writing in a directory named "fail"."""
+
+    def write_output(self, personal):
+        if self.output_path.parent.name == "fail":
+            raise RuntimeError("failing job")
+        super().write_output(personal)
+
+
+def _factory(root: Path):
+    def factory() -> Builder:
+        builder = Builder()
+        # The first context is written before the second one fails
+        for context_type in (MarkdownContext, FailingContext):
+            context = context_type(root / f"{context_type.__name__}.md", "CV")
+            context.add_module("jobs", JobModule())
+            builder.register_context(context)
+        return builder
+
+    return factory
+
+
+def test_failed_jobs_leave_nothing_in_the_sink(tmp_path):
+    sink = MemorySink(tmp_path / "jobs")
+    jobs = [BatchJob([EXAMPLE], tmp_path / "jobs" / name) for name in ("ok", "fail")]
+    report = build_batch(_factory(tmp_path / "template"), jobs, mode="thread", workers=2, sink=sink)
+
+    assert [job for job, _ in report.failures] == [jobs[1]]
+    assert sorted(sink.files) == ["ok/FailingContext.md", "ok/MarkdownContext.md"]
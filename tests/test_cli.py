@@ -0,0 +1,36 @@
+import os
+from pathlib import Path
+
+from cvbuilder.cli import build_config
+
+EXAMPLES = Path(__file__).parent.parent / "json_example"
+CONFIG = """
+inputs = ["{examples}/example.json", "{examples}/summary.json"]
+
+[[contexts]]
+type = "html"
+output = "output/index.html"
+assets = {{ output_dir = "output" }}
+css = ["style.css"]
+modules = [{{ type = "talks", key = "talks", pagination = {{ page_size = 2 }} }}]
+"""
+
+
+def test_incremental_builds_follow_the_css_and_every_page(tmp_path):
+    config = tmp_path / "cv.toml"
+    config.write_text(CONFIG.format(examples=EXAMPLES.as_posix()), encoding="UTF8")
+    css = tmp_path / "style.css"
+    css.write_text("body { color: black; }", encoding="UTF8")
+    assert build_config(config).status == "built"
+    assert build_config(config, incremental=True).status == "up to date"
+
+    # The outputs were built before the CSS file changed
+    for path in (tmp_path / "output").rglob("*"):
+        os.utime(path, (0, 0))
+    css.touch()
+    assert build_config(config, incremental=True).status == "built"
+    # The pages did not change, but are up to date
+    assert build_config(config, incremental=True).status == "up to date"
+
+    (tmp_path / "output" / "index-2.html").unlink()
+    assert build_config(config, incremental=True).status == "built"
@@ -0,0 +1,17 @@
+import gzip
+
+from cvbuilder.contexts.compression import Precompression
+
+
+def test_sidecars_follow_the_contents_and_the_levels(tmp_path):
+    path = tmp_path / "index.html"
+    assert Precompression(gzip_level=1).write(path, "previous")
+    # The plain file is written again without its sidecars
+    path.write_text("current", encoding="UTF8")
+
+    assert Precompression(gzip_level=1).write(path, "current")
+    assert gzip.decompress(path.with_name("index.html.gz").read_bytes()) == b"current"
+    assert not Precompression(gzip_level=1).write(path, "current")
+    assert Precompression(gzip_level=1).up_to_date(path)
+    assert not Precompression(gzip_level=9).up_to_date(path)
+    assert Precompression(gzip_level=9).write(path, "current")
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from cvbuilder import Builder
+from cvbuilder.contexts.html import AssetPipeline, HTMLContext
+from cvbuilder.sinks import MemorySink
+
+RESOURCES = Path(__file__).parent.parent / "resources"
+SUMMARY = Path(__file__).parent.parent / "json_example" / "summary.json"
+
+
+def _template(tmp_path: Path) -> Builder:
+    builder = Builder()
+    pipeline = AssetPipeline(tmp_path / "template" / "html", source_root=RESOURCES)
+    for name in ("index.html", "publications.html"):
+        context = HTMLContext(tmp_path / "template" / "html" / name)
+        context.add_css_file("css/style.css")
+        context.set_asset_pipeline(pipeline)
+        builder.register_context(context)
+    return builder
+
+
+def test_forks_write_their_assets_in_their_directory(tmp_path):
+    template = _template(tmp_path)
+    sink = MemorySink(tmp_path / "jobs")
+    template.set_sink(sink)
+    for job in ("1", "2"):
+        fork = template.fork(tmp_path / "jobs" / job)
+        assert fork.contexts[0].asset_pipeline is fork.contexts[1].asset_pipeline
+        fork.build(SUMMARY)
+
+    bundles = sorted(name for name in sink.files if "/assets/bundle." in name)
+    assert [name.split("/")[0] for name in bundles] == ["1", "2"]
+    # The outputs (and the assets) keep their layout relative to the common directory of the outputs
+    bundle = bundles[0].removeprefix("1/")
+    assert f'href="{bundle}"' in sink.files["1/index.html"].decode("UTF8")
+    assert template.contexts[0].asset_pipeline.output_dir == tmp_path / "template" / "html"
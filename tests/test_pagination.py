@@ -0,0 +1,58 @@
+import asyncio
+import copy
+import json
+from pathlib import Path
+
+import pytest
+
+from cvbuilder import Builder
+from cvbuilder.contexts.html import HTMLContext
+from cvbuilder.modules.talk import TalkModule
+from cvbuilder.sinks import FileSystemSink
+
+EXAMPLE = Path(__file__).parent.parent / "json_example" / "example.json"
+
+
+def _builder(tmp_path: Path) -> Builder:
+    builder = Builder()
+    context = HTMLContext(tmp_path / "output" / "index.html")
+    talks = TalkModule()
+    context.add_module("talks", talks)
+    context.paginate(talks, page_size=2)
+    builder.register_context(context)
+    return builder
+
+
+def _documents(tmp_path: Path) -> tuple[Path, Path]:
+    document = json.loads(EXAMPLE.read_text(encoding="UTF8"))
+    changed = copy.deepcopy(document)
+    changed["talks"][-1]["title"] = "A changed talk"
+    paths = tmp_path / "a.json", tmp_path / "b.json"
+    for path, contents in zip(paths, (document, changed)):
+        path.write_text(json.dumps(contents), encoding="UTF8")
+    return paths
+
+
+def _pages(tmp_path: Path) -> str:
+    return "".join(
+        page.read_text(encoding="UTF8") for page in sorted((tmp_path / "output").glob("*.html"))
+    )
+
+
+@pytest.mark.parametrize("other_build", ["async", "sink"])
+def test_pages_written_by_other_paths_are_not_skipped(tmp_path, other_build):
+    first, second = _documents(tmp_path)
+    builder = _builder(tmp_path)
+    builder.build(first)
+    expected = _pages(tmp_path)
+
+    if other_build == "async":
+        asyncio.run(builder.abuild(second))
+    else:
+        builder.set_sink(FileSystemSink(tmp_path))
+        builder.build(second)
+        builder.set_sink(None)
+    assert "A changed talk" in _pages(tmp_path)
+
+    builder.build(first)
+    assert _pages(tmp_path) == expected
@@ -0,0 +1,97 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from cvbuilder import Builder, read_json_file
+from cvbuilder.contexts import Context
+from cvbuilder.contexts.html import HTMLContext
+from cvbuilder.contexts.latex import LaTeXContext
+from cvbuilder.contexts.markdown import MarkdownContext
+from cvbuilder.modules.contact import ContactModule
+from cvbuilder.modules.job import JobModule
+from cvbuilder.modules.language import LanguageModule
+from cvbuilder.modules.publication import PublicationModule
+from cvbuilder.modules.talk import TalkModule
+from cvbuilder.modules.teach import TeachModule
+
+EXAMPLES = Path(__file__).parent.parent / "json_example"
+DOCUMENTS = [
+    read_json_file(EXAMPLES / name)
+    for name in ("example.json", "summary.json", "publications.json")
+]
+THREADS = 16
+RENDERS = 64
+
+
+def _builder(tmp_path: Path) -> Builder:
+    builder = Builder()
+    html = HTMLContext(tmp_path / "html" / "index.html")
+    builder.register_context(html)
+    html.add_module("contact", ContactModule(), "sidebar")
+    html.add_module("languages", LanguageModule(), "sidebar")
+    html.add_module("jobs", JobModule())
+    talks = TalkModule()
+    html.add_module("talks", talks)
+    html.paginate(talks, page_size=2)
+
+    compact = HTMLContext(tmp_path / "html" / "publications.html", compact=True)
+    builder.register_context(compact)
+    compact.add_module("contact", ContactModule(), "sidebar")
+    compact.add_module("publications", PublicationModule())
+
+    latex = LaTeXContext(tmp_path / "latex" / "cv.tex")
+    builder.register_context(latex)
+    latex.add_module("jobs", JobModule())
+    latex.add_module("teaching", TeachModule())
+
+    markdown = MarkdownContext(tmp_path / "markdown" / "cv.md", "Academic CV")
+    builder.register_context(markdown)
+    markdown.add_module("jobs", JobModule())
+    markdown.add_module("publications", PublicationModule())
+    return builder
+
+
+@pytest.fixture(autouse=True)
+def _frequent_switches():
+    # Switches between the threads as often as possible, to interleave the renders
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+@pytest.mark.parametrize("share_fragments", [False, True])
+def test_concurrent_renders_match_the_serial_render(tmp_path, share_fragments):
+    builder = _builder(tmp_path)
+    if share_fragments:
+        builder.share_fragments()
+    personal = builder.load_documents(DOCUMENTS)
+    expected = {id(context): context.render_outputs(personal) for context in builder.contexts}
+
+    def render(context: Context) -> bool:
+        return context.render_outputs(personal) == expected[id(context)]
+
+    jobs = [context for context in builder.contexts for _ in range(RENDERS)]
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        results = list(executor.map(render, jobs))
+
+    assert all(results)
+    # The paginated context renders every page, each one with its own navigation
+    assert len(expected[id(builder.contexts[0])]) > 1
+
+
+def test_concurrent_builder_renders_match_the_serial_render(tmp_path):
+    builder = _builder(tmp_path)
+    documents = [DOCUMENTS, DOCUMENTS[:1], DOCUMENTS[1:]]
+    expected = [builder.render(json_documents) for json_documents in documents]
+
+    def render(index: int) -> bool:
+        return builder.render(documents[index]) == expected[index]
+
+    with ThreadPoolExecutor(max_workers=THREADS) as executor:
+        results = list(executor.map(render, [index % len(documents) for index in range(RENDERS)]))
+
+    assert all(results)
+    assert expected[1] != expected[2]
@@ -0,0 +1,66 @@
+import json
+
+from cvbuilder.contexts.search import SearchIndex
+
+
+def _entries(count: int, title_words: int = 2) -> list[tuple[str, dict]]:
+    return [
+        (
+            "publications.html",
+            {
+                "title": " ".join(f"word{index}x{word}" for word in range(title_words)),
+                "authors": "Jane Doe and Richard Roe et al.",
+                "venue": "Conference",
+                "year": 2000 + index,
+            },
+        )
+        for index in range(count)
+    ]
+
+
+def _terms(index: SearchIndex) -> dict[str, list[int]]:
+    return json.loads(index.to_json())["terms"]
+
+
+def test_pruning_keeps_the_frequent_names():
+    index = SearchIndex(max_terms=10)
+    index.update(_entries(8))
+    terms = _terms(index)
+
+    assert len(terms) == 10
+    assert {"jane", "doe", "richard", "roe"} <= terms.keys()
+    assert terms["doe"] == list(range(8))
+    # The most frequent other terms (the venue, and the words joining the names) are pruned first
+    assert not {"conference", "and", "et", "al"} & terms.keys()
+
+
+def test_long_titles_do_not_push_the_names_out():
+    index = SearchIndex(max_tokens_per_entry=8)
+    index.update(_entries(2, title_words=20))
+    terms = _terms(index)
+
+    assert {"jane", "doe", "richard", "roe"} <= terms.keys()
+
+
+def test_loading_a_pruned_index_keeps_every_token(tmp_path):
+    path = tmp_path / "index.search.json"
+    index = SearchIndex(max_terms=10)
+    index.update(_entries(8))
+    path.write_text(index.to_json(), encoding="UTF8")
+
+    loaded = SearchIndex(max_terms=10)
+    loaded.load(path)
+    assert not loaded.update(_entries(8))
+    loaded.max_terms = 1000
+    # The terms pruned by the previous index are indexed again
+    assert loaded.update(_entries(8))
+    assert {"conference", "word0x0"} <= _terms(loaded).keys()
+
+
+def test_changing_the_tokens_changes_the_index():
+    index = SearchIndex()
+    index.update(_entries(2))
+    index.min_token_length = 5
+
+    assert index.update(_entries(2))
+    assert "doe" not in _terms(index)
@@ -0,0 +1,51 @@
+import http.client
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from cvbuilder import Builder, read_json_file
+from cvbuilder.contexts.html import AssetPipeline, HTMLContext
+from cvbuilder.modules.contact import ContactModule
+from cvbuilder.server import RenderHTTPServer, RenderService
+
+ROOT = Path(__file__).parent.parent
+DOCUMENTS = [read_json_file(ROOT / "json_example" / "summary.json")]
+
+
+def _builder(tmp_path: Path) -> Builder:
+    builder = Builder()
+    context = HTMLContext(tmp_path / "html" / "index.html")
+    builder.register_context(context)
+    context.set_asset_pipeline(AssetPipeline(tmp_path / "html", source_root=ROOT))
+    context.add_css_file("resources/css/style.css")
+    context.add_module("contact", ContactModule(), "sidebar")
+    return builder
+
+
+def test_render_writes_nothing(tmp_path):
+    outputs = _builder(tmp_path).render(DOCUMENTS)
+
+    assert "assets/bundle." in outputs[str(tmp_path / "html" / "index.html")]
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = RenderHTTPServer(("127.0.0.1", 0), RenderService(_builder(tmp_path)), quiet=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("contexts", ["index.html", [1], {"index.html": True}])
+def test_invalid_contexts_are_rejected(server, contexts):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    connection.request("POST", "/render", json.dumps({"cv": DOCUMENTS, "contexts": contexts}))
+    response = connection.getresponse()
+
+    assert response.status == 400
+    assert "list of strings" in json.loads(response.read())["error"]
@@ -0,0 +1,54 @@
+import json
+from pathlib import Path
+
+from cvbuilder import Builder
+from cvbuilder.contexts.html import HTMLContext
+from cvbuilder.modules.statistics import StatisticsModule
+from cvbuilder.modules.talk import TalkModule
+
+EXAMPLE = Path(__file__).parent.parent / "json_example" / "example.json"
+
+
+def _builder(tmp_path: Path) -> Builder:
+    builder = Builder()
+    context = HTMLContext(tmp_path / "output" / "index.html")
+    builder.register_context(context)
+    context.add_module("talks", TalkModule())
+    statistics = StatisticsModule()
+    context.add_module(statistics.keys, statistics)
+    builder.set_snapshot_cache(tmp_path / "snapshots")
+    return builder
+
+
+def test_statistics_are_restored_from_snapshots(tmp_path):
+    builder = _builder(tmp_path)
+    outputs = []
+    for _ in range(3):
+        builder.build(EXAMPLE)
+        outputs.append((tmp_path / "output" / "index.html").read_text(encoding="UTF8"))
+
+    assert builder.snapshot_cache.hits == 2
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert "Talks per year" in outputs[0]
+
+
+def test_statistics_sum_the_documents(tmp_path):
+    document = json.loads(EXAMPLE.read_text(encoding="UTF8"))
+    statistics = StatisticsModule()
+    statistics.load({"talks": document["talks"]})
+    once = dict(statistics.data)["Talks per year"][0].rows
+    statistics.load({"talks": document["talks"]})
+    twice = dict(statistics.data)["Talks per year"][0].rows
+
+    assert [(year, 2 * count) for year, count in once] == twice
+
+
+def test_ranges_count_in_each_of_their_years():
+    document = json.loads(EXAMPLE.read_text(encoding="UTF8"))
+    statistics = StatisticsModule()
+    statistics.load({"teaching": document["teaching"] + [{"when": "2019/2020"}, {"when": "2015-2016"}]})
+    rows = dict(dict(statistics.data)["Teaching per year"][0].rows)
+
+    # "Academic years 2005 to 2010"
+    assert [rows.get(str(year)) for year in range(2005, 2011)] == [1] * 6
+    assert rows["2020"] == rows["2019"] == rows["2016"] == rows["2015"] == 1